@@ -0,0 +1,181 @@
+'''
+adaptive_limiter.py
+
+Description: An adaptive concurrency limit for the scraper. The number of requests in
+flight grows additively while the server answers quickly and shrinks multiplicatively
+on errors and timeouts, HTTP 429 and 5xx responses or rising latency (AIMD).
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+'''
+
+import threading
+import time
+from contextlib import contextmanager
+
+THROTTLE_STATUSES = (429, 503)
+# 408 Request Timeout and every 5xx mean the server is struggling, not that the request
+# was bad, so they are congestion signals as well.
+TIMEOUT_STATUS = 408
+# Latency increase, in seconds, ignored as jitter however small the baseline is.
+LATENCY_SLACK = 0.05
+
+
+def is_congestion_status(status):
+    '''
+    Return True if an HTTP status tells the client to send fewer requests.
+    '''
+    return status is not None and (status in THROTTLE_STATUSES or status == TIMEOUT_STATUS
+                                   or status >= 500)
+
+
+class Sample:
+    '''
+    Outcome of one request, filled in by the caller inside AdaptiveLimiter.slot().
+    '''
+    def __init__(self):
+        self.status = None
+        self.error = False
+
+
+class AdaptiveLimiter:
+    '''
+    AdaptiveLimiter gates how many requests may be in flight. Threads block in acquire()
+    while the limit is reached. Every release() reports latency and outcome, and the
+    limit is adjusted:
+
+    - success at normal latency: limit += increase / limit (about +increase per round trip)
+    - error or timeout, 408, 429 or 5xx: limit *= backoff, at most once per round trip
+    - latency above latency_tolerance x the baseline: limit *= 0.9, at most once per round trip
+    '''
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=200, increase=1.0,
+                 backoff=0.5, latency_tolerance=2.0):
+        '''
+        Initialize the AdaptiveLimiter class.
+        :param initial_limit: Starting number of requests in flight.
+        :param min_limit: Lowest limit the controller will back off to.
+        :param max_limit: Highest limit, e.g. calculate_thread_pool("io").
+        :param increase: Additive increase per round trip of successful requests.
+        :param backoff: Multiplier applied to the limit on errors and throttling.
+        :param latency_tolerance: Latency, as a multiple of the baseline, treated as
+                                  congestion.
+        '''
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._condition = threading.Condition()
+        self._last_decrease = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.baseline_latency = None
+        self.smoothed_latency = None
+        self.peak_limit = self._limit
+
+    @property
+    def limit(self):
+        '''Current number of requests allowed in flight.'''
+        return int(self._limit)
+
+    def acquire(self):
+        '''
+        Block until a request may start.
+        '''
+        with self._condition:
+            while self.in_flight >= int(self._limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency, status=None, error=False):
+        '''
+        Finish a request and adjust the limit from its outcome.
+        :param latency: Request duration in seconds.
+        :param status: HTTP status code, if a response arrived.
+        :param error: True if the request failed or timed out without a usable response.
+        '''
+        with self._condition:
+            # Only grow while the limit is actually being used, not when the caller
+            # has fewer requests to make than it is allowed.
+            utilised = self.in_flight * 2 > self._limit
+            self.in_flight -= 1
+            self.requests += 1
+            now = time.monotonic()
+            round_trip = self.smoothed_latency or latency
+            can_decrease = now - self._last_decrease >= round_trip
+
+            if error or is_congestion_status(status):
+                if status in THROTTLE_STATUSES:
+                    self.throttled += 1
+                else:
+                    self.errors += 1
+                if can_decrease:
+                    self._decrease(self.backoff, now)
+            else:
+                self._observe_latency(latency)
+                congested = max(self.baseline_latency * self.latency_tolerance,
+                                self.baseline_latency + LATENCY_SLACK)
+                if latency > congested:
+                    if can_decrease:
+                        self._decrease(0.9, now)
+                elif utilised:
+                    self._limit = min(self.max_limit,
+                                      self._limit + self.increase / self._limit)
+                    self.peak_limit = max(self.peak_limit, self._limit)
+            self._condition.notify_all()
+
+    def _decrease(self, factor, now):
+        self._limit = max(self.min_limit, self._limit * factor)
+        self._last_decrease = now
+
+    def _observe_latency(self, latency):
+        if self.smoothed_latency is None:
+            self.smoothed_latency = self.baseline_latency = latency
+            return
+        self.smoothed_latency = 0.8 * self.smoothed_latency + 0.2 * latency
+        if latency < self.baseline_latency:
+            self.baseline_latency = latency
+        else:
+            # Drift upward slowly so a permanently slower server resets the baseline.
+            self.baseline_latency = 0.99 * self.baseline_latency + 0.01 * latency
+
+    @contextmanager
+    def slot(self):
+        '''
+        Hold one request slot. Set sample.status inside the block; an exception
+        leaving the block, such as a socket timeout, counts as an error.
+
+            with limiter.slot() as sample:
+                response = pool.request(url)
+                sample.status = response.status
+        '''
+        self.acquire()
+        sample = Sample()
+        start = time.perf_counter()
+        try:
+            yield sample
+        except Exception:
+            sample.error = True
+            raise
+        finally:
+            self.release(time.perf_counter() - start, sample.status, sample.error)
+
+    def stats(self):
+        '''
+        Return the current limit and request counters.
+        '''
+        with self._condition:
+            return {
+                "limit": int(self._limit),
+                "peak_limit": int(self.peak_limit),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "baseline_latency": self.baseline_latency,
+                "smoothed_latency": self.smoothed_latency,
+            }
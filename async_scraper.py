@@ -0,0 +1,254 @@
+'''
+async_scraper.py
+
+Description: An asyncio scraping engine for the Government of Canada weather website.
+Fetches month pages over non-blocking keep-alive connections instead of one OS
+thread per request.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+'''
+
+import asyncio
+import http.client
+import io
+import ssl
+import urllib.error
+import zlib
+from urllib.parse import urlsplit
+from http_pool import DEFAULT_HEADERS, MAX_REDIRECTS, PooledResponse, decode_body, redirect_url
+from scrape_weather import BASE_URL, WeatherScraper, build_url, month_pages
+
+DEFAULT_CONCURRENCY = 50
+
+
+class AsyncHTTPClient:
+    '''
+    AsyncHTTPClient is a minimal HTTP/1.1 client on asyncio streams. Idle connections
+    are kept per (scheme, host, port) and reused by later requests.
+    '''
+    def __init__(self, timeout=30, ssl_context=None):
+        '''
+        Initialize the AsyncHTTPClient class.
+        :param timeout: Seconds allowed for connecting and for reading a response.
+        :param ssl_context: Optional SSL context for HTTPS connections.
+        '''
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle = {}
+        self.connections_created = 0
+        self.requests_made = 0
+
+    async def _open(self, scheme, host, port):
+        self.connections_created += 1
+        if scheme == "https":
+            return await asyncio.open_connection(host, port, ssl=self.ssl_context,
+                                                 server_hostname=host)
+        return await asyncio.open_connection(host, port)
+
+    @staticmethod
+    async def _read_response(reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        version, status, reason = (status_line.decode("iso-8859-1").rstrip("\r\n")
+                                   .split(" ", 2) + [""])[:3]
+        status = int(status)
+
+        raw_headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            raw_headers.append(line)
+        headers = http.client.parse_headers(io.BytesIO(b"".join(raw_headers) + b"\r\n"))
+
+        keep_alive = (version == "HTTP/1.1"
+                      and headers.get("Connection", "").lower() != "close")
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif headers.get("Content-Length") is not None:
+            body = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, reason, headers, body, keep_alive
+
+    async def request(self, url, headers=None, method="GET"):
+        '''
+        Send a request and read the whole response. Redirects are followed up to
+        MAX_REDIRECTS times; responses of any other status are returned and only
+        transport failures raise.
+
+        :param url: Absolute http:// or https:// URL.
+        :param headers: Optional extra request headers.
+        :param method: HTTP method (default: GET).
+        :return: PooledResponse with a decoded body.
+        :raises urllib.error.URLError: If the connection fails or times out.
+        '''
+        for _ in range(MAX_REDIRECTS):
+            response = await self._send(url, headers, method)
+            location = redirect_url(url, response)
+            if not location:
+                return response
+            url = location
+            if response.status == 303:
+                method = "GET"
+        return await self._send(url, headers, method)
+
+    async def _send(self, url, headers, method):
+        '''
+        Send one request and read its response, without following redirects.
+        '''
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        request_headers = dict(DEFAULT_HEADERS)
+        request_headers["Host"] = parts.netloc
+        if headers:
+            request_headers.update(headers)
+        request_bytes = (
+            f"{method} {path} HTTP/1.1\r\n"
+            + "".join(f"{name}: {value}\r\n" for name, value in request_headers.items())
+            + "\r\n"
+        ).encode("iso-8859-1")
+
+        idle = self._idle.setdefault(key, [])
+        while True:
+            reused = bool(idle)
+            try:
+                if reused:
+                    reader, writer = idle.pop()
+                else:
+                    reader, writer = await asyncio.wait_for(self._open(*key), self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise urllib.error.URLError(e) from e
+            try:
+                writer.write(request_bytes)
+                await writer.drain()
+                status, reason, response_headers, body, keep_alive = await asyncio.wait_for(
+                    self._read_response(reader, method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused:
+                    # The server dropped an idle connection; retry on a fresh one.
+                    continue
+                raise urllib.error.URLError(e) from e
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                writer.close()
+                raise urllib.error.URLError(e) from e
+            break
+
+        self.requests_made += 1
+        if keep_alive:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+        try:
+            body = decode_body(body, response_headers.get("Content-Encoding"))
+        except (OSError, zlib.error, EOFError, ValueError) as e:
+            raise ValueError(f"Could not decode response from {url}: {e}") from e
+        return PooledResponse(status, reason, response_headers, body)
+
+    async def close(self):
+        '''
+        Close every idle connection.
+        '''
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+async def fetch_month_async(client, year, month, station_id, debug=False, base_url=BASE_URL,
+                            cache=None):
+    '''
+    Fetch and parse one month page.
+    :return: Dictionary of weather data (date -> {Max, Min, Mean}); empty on error.
+    '''
+    url = build_url(base_url, station_id, year, month)
+    scraper = WeatherScraper(debug=debug, base_url=base_url, cache=cache)
+    page, entry = scraper.cached_page(year, month, station_id)
+    if page is not None:
+        scraper.parse_page(page, year, month)
+        return scraper.weather_data
+    if debug:
+        print(f"Fetching data from: {url}")
+    try:
+        headers = cache.conditional_headers(entry) if entry else None
+        response = await client.request(url, headers=headers)
+        content = scraper.page_from_response(url, response, entry, year, month, station_id)
+        scraper.parse_page(content, year, month)
+    except (urllib.error.URLError, urllib.error.HTTPError, ValueError) as e:
+        scraper.error = e
+        if debug:
+            print(f"Error fetching data from {url}: {e}")
+    return scraper.weather_data
+
+
+async def scrape_weather_data_async(start_year, end_year, station_id,
+                                    concurrency=DEFAULT_CONCURRENCY, debug=False,
+                                    base_url=BASE_URL, client=None, cache=None, months=None):
+    '''
+    Scrape weather data for a range of years and return it as a dictionary.
+    A semaphore bounds how many requests are in flight at once.
+
+    :param concurrency: Maximum number of requests in flight.
+    :param debug: If True, print debug information. Default is False.
+    :param base_url: Daily data page URL. Default is the Government of Canada site.
+    :param client: AsyncHTTPClient to share across calls. Default is a new client.
+    :param cache: Optional ResponseCache checked before fetching a page.
+    :param months: Optional list of (year, month) pages to fetch instead of every month
+                   from start_year to end_year.
+    :return: Dictionary of weather data (date -> {Max, Min, Mean}).
+    '''
+    semaphore = asyncio.Semaphore(concurrency)
+    own_client = client is None
+    client = client or AsyncHTTPClient()
+
+    async def bounded_fetch(year, month):
+        async with semaphore:
+            return await fetch_month_async(client, year, month, station_id,
+                                           debug=debug, base_url=base_url, cache=cache)
+
+    try:
+        results = await asyncio.gather(*(
+            bounded_fetch(year, month)
+            for year, month in month_pages(start_year, end_year, months)
+        ))
+    finally:
+        if own_client:
+            await client.close()
+
+    all_weather_data = {}
+    for weather_data in results:
+        all_weather_data.update(weather_data)
+    return all_weather_data
@@ -0,0 +1,140 @@
+'''
+backfill.py
+
+Description: Resumable, checkpointed historical backfill. Every (station, year, month)
+page is a row in the jobs table; workers claim jobs, and each month's rows are saved in
+the same transaction that marks its job done, through the database's shared DBWriter.
+A restarted run only fetches the jobs that are still pending or failed.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+'''
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date
+from adaptive_limiter import AdaptiveLimiter
+from db_writer import shared_writer
+from scrape_weather import BASE_URL, WeatherScraper, month_pages
+from thread_cal import calculate_thread_pool
+
+DEFAULT_MAX_ATTEMPTS = 3
+# Seconds between checks of the cancel event while waiting on fetches.
+CANCEL_POLL_INTERVAL = 0.2
+
+
+def open_months(today=None):
+    '''
+    Return the current and previous (year, month); their pages can still change.
+    '''
+    today = today or date.today()
+    previous = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    return {previous, (today.year, today.month)}
+
+
+def enqueue_backfill(db_ops, stations, start_year=None, end_year=None, today=None):
+    '''
+    Add jobs for every month in each station's active range. Jobs already in the table
+    keep their status, except finished jobs for months that can still change.
+
+    :param stations: (station_id, location, first_year, last_year) tuples.
+    :param start_year: Optional first year; each station starts no earlier than its
+                       first_year.
+    :param end_year: Optional last year. Default is the current year.
+    '''
+    today = today or date.today()
+    end_year = end_year or today.year
+    still_open = open_months(today)
+    for station_id, _, first_year, last_year in stations:
+        pages = [page for page in month_pages(max(first_year, start_year or first_year),
+                                               min(last_year or end_year, end_year))
+                 if page <= (today.year, today.month)]
+        db_ops.enqueue_jobs(station_id, [page for page in pages if page not in still_open])
+        db_ops.enqueue_jobs(station_id, [page for page in pages if page in still_open],
+                            refresh=True)
+
+
+def run_backfill(db_ops, stations=None, start_year=None, end_year=None,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, max_threads=None, debug=False, pool=None,
+                 base_url=BASE_URL, cache=None, limiter=None, progress=None,
+                 cancel_event=None):
+    '''
+    Enqueue and run a backfill for the given stations, resuming any earlier run.
+
+    :param db_ops: DBOperations instance holding the jobs and weather tables.
+    :param stations: (station_id, location, first_year, last_year) tuples. Default is
+                     the station registry.
+    :param start_year: Optional first year to backfill.
+    :param end_year: Optional last year to backfill. Default is the current year.
+    :param max_attempts: Attempts per job in this run before it stays failed.
+    :param max_threads: Number of fetch threads. Default is calculate_thread_pool("io").
+    :param limiter: AdaptiveLimiter for requests in flight. Default is a new limiter
+                    capped at max_threads.
+    :param progress: Optional callable run as progress(months_done, months_total, rows)
+                     each time a job finishes.
+    :param cancel_event: Optional threading.Event. Once set, no more jobs are claimed and
+                         queued jobs are dropped; jobs already fetching still finish.
+                         Dropped jobs stay claimed and are resumed by the next run.
+    :return: Dictionary with the jobs done and failed in this run, the rows fetched,
+             whether the run was cancelled and the job counts by status afterwards.
+    '''
+    stations = stations if stations is not None else db_ops.get_stations()
+    locations = {station[0]: station[1] for station in stations}
+    max_threads = max_threads or calculate_thread_pool(task_type="io")
+    limiter = limiter or AdaptiveLimiter(max_limit=max_threads)
+    db_writer = shared_writer(db_ops)
+
+    enqueue_backfill(db_ops, stations, start_year, end_year)
+    db_ops.reset_jobs()
+    total = 0
+    if progress:
+        for station_id in locations:
+            counts = db_ops.get_job_counts(station_id)
+            total += counts.get("pending", 0) + counts.get("failed", 0)
+
+    def process(job):
+        station_id, year, month = job
+        scraper = WeatherScraper(debug=debug, pool=pool, base_url=base_url, cache=cache,
+                                 limiter=limiter)
+        scraper.fetch_and_parse(year, month, station_id)
+        if scraper.error:
+            db_ops.fail_job(job, scraper.error)
+            return False, 0
+        db_writer.complete_job(job, scraper.weather_data, locations[station_id], db_ops=db_ops)
+        return True, len(scraper.weather_data)
+
+    done_count = failed_count = rows = 0
+    cancelled = False
+    poll_interval = CANCEL_POLL_INTERVAL if cancel_event is not None else None
+    with ThreadPoolExecutor(max_threads) as executor:
+        pending = set()
+        while True:
+            if cancel_event is not None and cancel_event.is_set() and not cancelled:
+                cancelled = True
+                pending = {future for future in pending if not future.cancel()}
+            free = 2 * max_threads - len(pending)
+            if free > 0 and not cancelled:
+                claimed = db_ops.claim_jobs(free, max_attempts, station_ids=list(locations))
+                pending.update(executor.submit(process, job) for job in claimed)
+            if not pending:
+                break
+            finished, pending = wait(pending, timeout=poll_interval,
+                                     return_when=FIRST_COMPLETED)
+            for future in finished:
+                ok, row_count = future.result()
+                if ok:
+                    done_count += 1
+                    rows += row_count
+                else:
+                    failed_count += 1
+                if progress:
+                    progress(done_count, total, rows)
+    if debug:
+        print(f"Backfill finished: {done_count} months done, {failed_count} failures.")
+    return {
+        "done": done_count,
+        "failed": failed_count,
+        "rows": rows,
+        "cancelled": cancelled,
+        "jobs": db_ops.get_job_counts(),
+    }
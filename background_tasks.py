@@ -0,0 +1,107 @@
+'''
+background_tasks.py
+
+Description: Runs long operations (downloads, updates) off the GUI thread. A task runs
+on a background executor and reports progress, completion and errors as events on a
+queue, which the Tk main loop drains with after(). A shared event lets the GUI cancel
+the running task.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+'''
+
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Milliseconds between polls of the event queue by the Tk main loop.
+POLL_INTERVAL_MS = 100
+
+Progress = namedtuple("Progress", ["months_done", "months_total", "rows", "rows_per_second"])
+TaskEvent = namedtuple("TaskEvent", ["kind", "name", "payload"])
+
+
+class TaskRunner:
+    '''
+    TaskRunner runs one task at a time on a background thread. Events are TaskEvent
+    tuples: ("progress", name, Progress), ("done", name, result) or ("error", name,
+    exception). Nothing here touches Tk, so events are handled on the thread that polls.
+    '''
+    def __init__(self):
+        '''
+        Initialize the TaskRunner class.
+        '''
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weather-task")
+        self._future = None
+
+    @property
+    def busy(self):
+        '''
+        True while a task is running.
+        '''
+        return self._future is not None and not self._future.done()
+
+    def submit(self, name, task):
+        '''
+        Start a task in the background.
+
+        :param name: Name the task's events are tagged with.
+        :param task: Callable run as task(progress, cancel_event). progress is called as
+                     progress(months_done, months_total, rows) and cancel_event is a
+                     threading.Event the task should stop at once it is set.
+        :raises RuntimeError: If a task is already running.
+        '''
+        if self.busy:
+            raise RuntimeError("A background task is already running.")
+        self.cancel_event.clear()
+        self._future = self._executor.submit(self._run, name, task)
+
+    def _run(self, name, task):
+        start = time.perf_counter()
+
+        def progress(months_done, months_total, rows):
+            elapsed = time.perf_counter() - start
+            self.events.put(TaskEvent("progress", name, Progress(
+                months_done, months_total, rows, rows / elapsed if elapsed > 0 else 0.0)))
+
+        try:
+            result = task(progress, self.cancel_event)
+        except Exception as e:  # pylint: disable=broad-except
+            # Errors are reported to the GUI instead of dying with the worker thread.
+            self.events.put(TaskEvent("error", name, e))
+        else:
+            self.events.put(TaskEvent("done", name, result))
+
+    def cancel(self):
+        '''
+        Ask the running task to stop.
+        '''
+        self.cancel_event.set()
+
+    def poll(self):
+        '''
+        Return the events queued since the last poll. Only the latest progress event is
+        kept, so a fast task cannot flood the GUI with redraws.
+        '''
+        events = []
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return events
+            if event.kind == "progress" and events and events[-1].kind == "progress":
+                events[-1] = event
+            else:
+                events.append(event)
+
+    def shutdown(self):
+        '''
+        Cancel the running task and release the worker thread without waiting for it.
+        '''
+        self.cancel()
+        self._executor.shutdown(wait=False)
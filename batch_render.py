@@ -0,0 +1,172 @@
+'''
+batch_render.py
+
+Description: Headless batch rendering of every monthly line plot and yearly box plot
+for every registered station, written as PNG and/or SVG files. Render jobs are spread
+over a process pool; each worker draws with the Agg canvas and reuses one figure.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+
+Usage: python batch_render.py charts/ --format png --format svg --workers 8
+'''
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from db_operations import DBOperations
+from plot_operations import PlotOperations
+
+DEFAULT_FORMATS = ("png",)
+DEFAULT_DPI = 100
+# Jobs handed to a worker at a time; amortises inter-process overhead.
+DEFAULT_CHUNKSIZE = 16
+
+# Per-process state, set up once by init_worker.
+_worker = {}
+
+
+def location_slug(location):
+    '''
+    Turn a location name into a directory name.
+    '''
+    return re.sub(r"[^A-Za-z0-9]+", "_", location).strip("_").lower() or "location"
+
+
+def chart_path(out_dir, job, file_format):
+    '''
+    Return the output file of a render job.
+    '''
+    kind, location, year, month = job
+    name = f"line_{year}_{month:02d}" if kind == "line" else f"box_{year}"
+    return os.path.join(out_dir, location_slug(location), f"{name}.{file_format}")
+
+
+def plan_render_jobs(db_ops, locations=None):
+    '''
+    List a ("line", location, year, month) job for every stored month and a
+    ("box", location, year, None) job for every stored year.
+
+    :param db_ops: DBOperations instance to read from.
+    :param locations: Optional location names. Default is every registered station.
+    :return: List of job tuples.
+    '''
+    if locations is None:
+        locations = [station[1] for station in db_ops.get_stations()]
+    jobs = []
+    for location in locations:
+        months = sorted(db_ops.get_month_counts(location=location))
+        jobs.extend(("line", location, year, month) for year, month in months)
+        jobs.extend(("box", location, year, None)
+                    for year in sorted({year for year, _ in months}))
+    return jobs
+
+
+def init_worker(db_name, out_dir, formats, dpi, figsize):
+    '''
+    Process pool initializer: open the database and create the reusable figure.
+    '''
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    _worker.update(db_ops=DBOperations(db_name), plot_ops=PlotOperations(), figure=figure,
+                   out_dir=out_dir, formats=formats, dpi=dpi)
+
+
+def render_job(job):
+    '''
+    Render one job in a worker.
+    :return: Tuple (job, files written, error message or None).
+    '''
+    kind, location, year, month = job
+    db_ops, plot_ops, figure = _worker["db_ops"], _worker["plot_ops"], _worker["figure"]
+    try:
+        figure.clear()
+        ax = figure.add_subplot()
+        if kind == "line":
+            rows = db_ops.fetch_data(filter_type="lineplot", year=year, month=month,
+                                     location=location)
+            days, temps = plot_ops.rows_to_arrays(rows or [])
+            plot_ops.draw_lineplot(ax, days, temps, year, month, location=location)
+        else:
+            summaries = db_ops.fetch_monthly_stats((year, year), location=location)
+            plot_ops.draw_boxplot(ax, plot_ops.prepare_summary_arrays(summaries),
+                                  (year, year), location=location)
+        files = 0
+        for file_format in _worker["formats"]:
+            path = chart_path(_worker["out_dir"], job, file_format)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            figure.savefig(path, format=file_format, dpi=_worker["dpi"])
+            files += 1
+        return job, files, None
+    except Exception as e:  # pylint: disable=broad-except
+        # One bad job is recorded in "failed" instead of aborting the whole map.
+        return job, 0, f"{type(e).__name__}: {e}"
+
+
+def render_all(db_ops, out_dir, jobs=None, formats=DEFAULT_FORMATS, workers=None,
+               dpi=DEFAULT_DPI, figsize=(10, 6), chunksize=DEFAULT_CHUNKSIZE, debug=False):
+    '''
+    Render charts across a process pool.
+
+    :param db_ops: DBOperations instance; workers open the same database file.
+    :param out_dir: Directory the charts are written to, one subdirectory per location.
+    :param jobs: Optional job list. Default is plan_render_jobs(db_ops).
+    :param formats: File formats to write, e.g. ("png", "svg").
+    :param workers: Number of worker processes. Default is os.cpu_count().
+    :param dpi: Resolution of raster formats.
+    :param figsize: Figure size in inches.
+    :param chunksize: Jobs sent to a worker at a time.
+    :return: Dictionary with the number of charts rendered, files written, failures
+             and elapsed seconds.
+    '''
+    jobs = plan_render_jobs(db_ops) if jobs is None else jobs
+    start = time.perf_counter()
+    rendered = files = 0
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=init_worker,
+                             initargs=(db_ops.db_name, out_dir, tuple(formats), dpi,
+                                       figsize)) as executor:
+        for job, written, error in executor.map(render_job, jobs, chunksize=chunksize):
+            if error:
+                failed.append((job, error))
+                if debug:
+                    print(f"Error rendering {job}: {error}")
+            else:
+                rendered += 1
+                files += written
+    return {"rendered": rendered, "files": files, "failed": failed,
+            "seconds": time.perf_counter() - start}
+
+
+def main():
+    '''
+    Command line entry point.
+    '''
+    parser = argparse.ArgumentParser(description="Render every station's charts to files.")
+    parser.add_argument("out_dir", help="Output directory.")
+    parser.add_argument("--db", default="weather_data.db", help="Database file name.")
+    parser.add_argument("--format", action="append", dest="formats",
+                        choices=("png", "svg"), help="Output format; repeat for more.")
+    parser.add_argument("--location", action="append", dest="locations",
+                        help="Location to render; repeat for more. Default is all stations.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores).")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="PNG resolution.")
+    args = parser.parse_args()
+
+    db_ops = DBOperations(args.db)
+    jobs = plan_render_jobs(db_ops, locations=args.locations)
+    print(f"Rendering {len(jobs)} charts...")
+    result = render_all(db_ops, args.out_dir, jobs=jobs,
+                        formats=args.formats or DEFAULT_FORMATS, workers=args.workers,
+                        dpi=args.dpi, debug=True)
+    print(f"Rendered {result['rendered']} charts ({result['files']} files) in "
+          f"{result['seconds']:.1f} s; {len(result['failed'])} failed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+'''
+benchmarks
+
+Description: Performance benchmarks for the weather application.
+Run from the repository root, e.g. ``python -m benchmarks.bench_http_pool``.
+'''
@@ -0,0 +1,58 @@
+'''
+bench_batch_render.py
+
+Description: Benchmark of batch_render.render_all: charts per second with one worker
+process against one worker per core.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_batch_render --stations 4 --years 5
+'''
+
+import argparse
+import os
+import tempfile
+from datetime import date, timedelta
+
+from batch_render import plan_render_jobs, render_all
+from db_operations import DBOperations
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Compare one and many render workers.")
+    parser.add_argument("--stations", type=int, default=4, help="Synthetic stations.")
+    parser.add_argument("--years", type=int, default=5, help="Years of data per station.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Workers for the parallel run.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_ops = DBOperations(os.path.join(tmp, "weather.db"))
+        db_ops.initialize_db()
+        first_day = date(2000, 1, 1)
+        days = (date(2000 + args.years, 1, 1) - first_day).days
+        locations = [f"Station {index}" for index in range(args.stations)]
+        for index, location in enumerate(locations):
+            db_ops.upsert_data({(first_day + timedelta(days=n)).isoformat():
+                                {"Min": -10.0 + index, "Max": 10.0 + index,
+                                 "Mean": (n * 7 % 40) - 20.0}
+                                for n in range(days)}, location)
+        jobs = plan_render_jobs(db_ops, locations=locations)
+
+        results = {}
+        for workers in (1, args.workers):
+            out_dir = os.path.join(tmp, f"charts_{workers}")
+            results[workers] = render_all(db_ops, out_dir, jobs=jobs, workers=workers)
+    print(f"{len(jobs)} charts")
+    for workers, result in results.items():
+        print(f"  {workers:3d} workers: {result['seconds']:7.2f} s "
+              f"({result['rendered'] / result['seconds']:6.1f} charts/s)")
+
+
+if __name__ == "__main__":
+    main()
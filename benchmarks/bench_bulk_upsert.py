@@ -0,0 +1,156 @@
+'''
+bench_bulk_upsert.py
+
+Description: Benchmark of bulk database writes. Loads synthetic weather rows through the
+original per-row INSERT loop and through DBOperations.upsert_data, then refreshes a
+partly changed copy: per-row save_data plus update_data against one upsert_data pass.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+
+Usage: python -m benchmarks.bench_bulk_upsert --rows 1000000 --batch-size 5000
+'''
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from db_operations import DBOperations, row_months
+from dbcm import DBCM
+
+DAYS_PER_LOCATION = 10000
+
+
+def iter_synthetic_data(rows):
+    '''
+    Yield (location, weather_data) with the given total number of rows, one location
+    of up to DAYS_PER_LOCATION rows at a time, so large tables fit in memory.
+    '''
+    first_day = date(1990, 1, 1)
+    for start in range(0, rows, DAYS_PER_LOCATION):
+        weather_data = {}
+        for index in range(start, min(start + DAYS_PER_LOCATION, rows)):
+            sample_date = (first_day + timedelta(days=index % DAYS_PER_LOCATION)).isoformat()
+            low = (index % 40) - 20.0
+            weather_data[sample_date] = {"Min": low, "Max": low + 10.0, "Mean": low + 5.0}
+        yield f"Station {start // DAYS_PER_LOCATION}", weather_data
+
+
+def synthetic_data(rows):
+    '''
+    Build {location: weather_data} with the given total number of rows.
+    '''
+    return dict(iter_synthetic_data(rows))
+
+
+def per_row_save(db_ops, weather_data, location):
+    '''
+    The save_data loop before bulk writes: one execute per row, one IntegrityError
+    per duplicate. Monthly summaries are refreshed as in DBOperations.
+    '''
+    with DBCM(db_ops.db_name) as cursor:
+        for sample_date, temps in weather_data.items():
+            try:
+                cursor.execute("""
+                    INSERT INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (sample_date, location, temps["Min"], temps["Max"], temps["Mean"]))
+            except sqlite3.IntegrityError:
+                continue
+        # pylint: disable=protected-access
+        DBOperations._refresh_monthly_stats(cursor, location, row_months(weather_data.items()))
+
+
+def per_row_update(db_ops, weather_data, location):
+    '''
+    The update_data loop before bulk writes: one UPDATE per row. Monthly summaries
+    are refreshed as in DBOperations.
+    '''
+    with DBCM(db_ops.db_name) as cursor:
+        for sample_date, temps in weather_data.items():
+            cursor.execute("""
+                UPDATE weather
+                SET min_temp = ?, max_temp = ?, avg_temp = ?
+                WHERE sample_date = ? AND location = ?
+            """, (temps["Min"], temps["Max"], temps["Mean"], sample_date, location))
+        # pylint: disable=protected-access
+        DBOperations._refresh_monthly_stats(cursor, location, row_months(weather_data.items()))
+
+
+def per_row_refresh(db_ops, weather_data, location):
+    '''
+    Insert-or-refresh before bulk writes: save_data for new dates, then update_data.
+    '''
+    per_row_save(db_ops, weather_data, location)
+    per_row_update(db_ops, weather_data, location)
+
+
+def timed(write, db_ops, data, **options):
+    '''
+    Write every location's rows and return (seconds, results).
+    '''
+    start = time.perf_counter()
+    results = [write(db_ops, weather_data, location, **options)
+               for location, weather_data in data.items()]
+    return time.perf_counter() - start, results
+
+
+def change_every_tenth_row(data):
+    '''
+    Raise the maximum temperature of every tenth row in place.
+    '''
+    for weather_data in data.values():
+        for index, temps in enumerate(weather_data.values()):
+            if index % 10 == 0:
+                temps["Max"] += 1.0
+
+
+def report(label, rows, legacy_seconds, bulk_seconds):
+    '''
+    Print one phase of the benchmark.
+    '''
+    print(label)
+    print(f"  per-row:     {legacy_seconds:8.2f} s ({rows / legacy_seconds:10.0f} rows/s)")
+    print(f"  bulk upsert: {bulk_seconds:8.2f} s ({rows / bulk_seconds:10.0f} rows/s)")
+    print(f"  speedup:     {legacy_seconds / bulk_seconds:8.2f}x")
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk writes.")
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic rows to write.")
+    parser.add_argument("--batch-size", type=int, default=5000,
+                        help="Rows per executemany call.")
+    args = parser.parse_args()
+
+    data = synthetic_data(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = DBOperations(os.path.join(tmp, "legacy.db"))
+        legacy_db.initialize_db()
+        bulk_db = DBOperations(os.path.join(tmp, "bulk.db"))
+        bulk_db.initialize_db()
+
+        legacy_load, _ = timed(per_row_save, legacy_db, data)
+        bulk_load, _ = timed(DBOperations.upsert_data, bulk_db, data,
+                             batch_size=args.batch_size)
+
+        change_every_tenth_row(data)
+        legacy_refresh, _ = timed(per_row_refresh, legacy_db, data)
+        bulk_refresh, results = timed(DBOperations.upsert_data, bulk_db, data,
+                                      batch_size=args.batch_size)
+    totals = {key: sum(result[key] for result in results) for key in results[0]}
+
+    print(f"{args.rows} rows in {len(data)} locations, batch size {args.batch_size}")
+    report("Initial load (empty table):", args.rows, legacy_load, bulk_load)
+    report("Refresh with 10% of rows changed:", args.rows, legacy_refresh, bulk_refresh)
+    print(f"  upsert counts: {totals}")
+
+
+if __name__ == "__main__":
+    main()
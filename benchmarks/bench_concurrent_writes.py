@@ -0,0 +1,170 @@
+'''
+bench_concurrent_writes.py
+
+Description: Benchmark of concurrent ingestion. Several producers write month-sized
+batches at the same time, either each through its own DBOperations.save_data call and
+connection, or all through one DBWriter that group-commits their batches. Producers
+are threads, or processes with --processes (WriterClient for the DBWriter side).
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_concurrent_writes --producers 1 2 4 8 --months 120
+'''
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from db_operations import DBOperations
+from db_writer import DBWriter, WriterClient, serve
+
+AUTHKEY = b"bench_concurrent_writes"
+# Seconds allowed for spawned producer processes to start before the clock starts.
+STARTUP_SECONDS = 2.0
+
+
+def month_batches(producer, months):
+    '''
+    Return the month-sized batches one producer writes, under its own location.
+    '''
+    first_day = date(1990, 1, 1)
+    batches = []
+    for month in range(months):
+        weather_data = {}
+        for day in range(30):
+            sample_date = (first_day + timedelta(days=month * 30 + day)).isoformat()
+            low = (day % 40) - 20.0
+            weather_data[sample_date] = {"Min": low, "Max": low + 10.0, "Mean": low + 5.0}
+        batches.append(weather_data)
+    return f"Producer {producer}", batches
+
+
+def produce(target, producer, months, start):
+    '''
+    Write one producer's batches through target.save_data, one call per batch, once
+    start is set.
+    '''
+    location, batches = month_batches(producer, months)
+    start.wait()
+    for weather_data in batches:
+        target.save_data(weather_data, location)
+
+
+def produce_direct(db_name, producer, months, start):
+    '''
+    Process entry point: write through a DBOperations of this process.
+    '''
+    produce(DBOperations(db_name), producer, months, start)
+
+
+def produce_client(address, producer, months, start):
+    '''
+    Process entry point: write through a WriterClient.
+    '''
+    client = WriterClient(address, AUTHKEY)
+    try:
+        produce(client, producer, months, start)
+    finally:
+        client.close()
+
+
+def run_producers(targets, months, processes):
+    '''
+    Start one producer per target and wait for all of them. Processes are spawned,
+    not forked, since the parent runs writer threads, and the clock starts once every
+    producer is ready.
+    :param targets: List of (function, first argument) pairs.
+    :return: Elapsed seconds.
+    '''
+    if processes:
+        context = multiprocessing.get_context("spawn")
+        start = context.Event()
+        workers = [context.Process(target=func, args=(arg, number, months, start))
+                   for number, (func, arg) in enumerate(targets)]
+    else:
+        start = threading.Event()
+        workers = [threading.Thread(target=func, args=(arg, number, months, start))
+                   for number, (func, arg) in enumerate(targets)]
+    for worker in workers:
+        worker.start()
+    # Give spawned interpreters time to import and reach start.wait().
+    time.sleep(STARTUP_SECONDS if processes else 0)
+    begin = time.perf_counter()
+    start.set()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - begin
+
+
+def bench_direct(db_name, producers, months, processes):
+    '''
+    Every producer writes through save_data on its own connection.
+    :return: Elapsed seconds.
+    '''
+    db_ops = DBOperations(db_name)
+    db_ops.initialize_db()
+    if processes:
+        return run_producers([(produce_direct, db_name)] * producers, months, True)
+    return run_producers([(produce, db_ops)] * producers, months, False)
+
+
+def bench_writer(db_name, producers, months, processes):
+    '''
+    Every producer writes through one DBWriter.
+    :return: Tuple (elapsed seconds, commits).
+    '''
+    db_ops = DBOperations(db_name)
+    db_ops.initialize_db()
+    writer = DBWriter(db_ops)
+    writer.start()
+    try:
+        if processes:
+            listener = serve(writer, ("127.0.0.1", 0), AUTHKEY)
+            try:
+                elapsed = run_producers([(produce_client, listener.address)] * producers,
+                                        months, True)
+            finally:
+                listener.close()
+        else:
+            elapsed = run_producers([(produce, writer)] * producers, months, False)
+    finally:
+        writer.close()
+    return elapsed, writer.commits
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Benchmark concurrent database writes.")
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Numbers of concurrent producers to test.")
+    parser.add_argument("--months", type=int, default=120,
+                        help="Month batches written by each producer.")
+    parser.add_argument("--processes", action="store_true",
+                        help="Run producers as processes instead of threads.")
+    args = parser.parse_args()
+
+    kind = "processes" if args.processes else "threads"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for producers in args.producers:
+            rows = producers * args.months * 30
+            direct = bench_direct(os.path.join(temp_dir, f"direct_{producers}.db"),
+                                  producers, args.months, args.processes)
+            grouped, commits = bench_writer(os.path.join(temp_dir, f"writer_{producers}.db"),
+                                            producers, args.months, args.processes)
+            print(f"{producers} {kind}, {rows} rows")
+            print(f"  save_data per producer: {rows / direct:10.0f} rows/s  "
+                  f"({producers * args.months} commits)")
+            print(f"  DBWriter group commit:  {rows / grouped:10.0f} rows/s  "
+                  f"({commits} commits, {direct / grouped:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
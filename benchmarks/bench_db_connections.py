@@ -0,0 +1,100 @@
+'''
+bench_db_connections.py
+
+Description: Benchmark of back-to-back database calls through pooled DBCM connections
+against opening a new sqlite3 connection per call, as DBCM did before pooling.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_db_connections --calls 2000
+'''
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from db_operations import DBOperations
+from dbcm import DBCM
+
+
+class UnpooledDBCM(DBCM):
+    '''
+    DBCM as it was before pooling: connect on enter, close on exit.
+    '''
+    def __enter__(self):
+        self.connection = sqlite3.connect(self.db_name)
+        self.cursor = self.connection.cursor()
+        return self.cursor
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.commit()
+        self.cursor.close()
+        self.connection.close()
+
+
+def lineplot_query(context, db_name, year, month):
+    '''
+    Run the query behind fetch_data(filter_type="lineplot").
+    '''
+    with context(db_name) as cursor:
+        cursor.execute("""
+            SELECT sample_date, avg_temp FROM weather
+            WHERE CAST(strftime('%Y', sample_date) AS INTEGER) = ?
+            AND CAST(strftime('%m', sample_date) AS INTEGER) = ?
+        """, (year, month))
+        return cursor.fetchall()
+
+
+def latest_date_query(context, db_name, year, month):  # pylint: disable=unused-argument
+    '''
+    Run the query behind get_latest_date().
+    '''
+    with context(db_name) as cursor:
+        cursor.execute("SELECT MAX(sample_date) FROM weather WHERE location = ?",
+                       ("Winnipeg",))
+        return cursor.fetchone()
+
+
+def calls_per_second(query, context, db_name, calls):
+    '''
+    Run the query the given number of times, cycling through the months of 2020.
+    '''
+    start = time.perf_counter()
+    for index in range(calls):
+        query(context, db_name, 2020, index % 12 + 1)
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Compare pooled and per-call connections.")
+    parser.add_argument("--calls", type=int, default=2000, help="Queries per variant.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_ops = DBOperations(os.path.join(tmp, "weather.db"))
+        db_ops.initialize_db()
+        first_day = date(2020, 1, 1)
+        db_ops.save_data({(first_day + timedelta(days=n)).isoformat():
+                          {"Min": -5.0, "Max": 5.0, "Mean": 0.0} for n in range(1500)})
+
+        for label, query in (("Line plot query", lineplot_query),
+                             ("Latest date query", latest_date_query)):
+            unpooled = calls_per_second(query, UnpooledDBCM, db_ops.db_name, args.calls)
+            pooled = calls_per_second(query, DBCM, db_ops.db_name, args.calls)
+            print(f"{label}, {args.calls} calls")
+            print(f"  connect per call: {unpooled:9.1f} calls/s")
+            print(f"  pooled DBCM:      {pooled:9.1f} calls/s")
+            print(f"  speedup:          {pooled / unpooled:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+'''
+bench_fetch_data.py
+
+Description: Benchmark of the plot queries as the weather table grows. Times
+fetch_data(filter_type="lineplot") on the (location, year, month) index against the
+strftime query it replaced and against the in-memory WeatherStore, at several table
+sizes.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+
+Usage: python -m benchmarks.bench_fetch_data --sizes 10000 100000 1000000
+'''
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_bulk_upsert import synthetic_data
+from db_operations import DBOperations
+from dbcm import DBCM
+from weather_store import WeatherStore
+
+STRFTIME_LINEPLOT_QUERY = """
+    SELECT strftime('%d', sample_date) AS day, avg_temp
+    FROM weather
+    WHERE CAST(strftime('%Y', sample_date) AS INTEGER) = ?
+    AND CAST(strftime('%m', sample_date) AS INTEGER) = ?
+"""
+
+
+def milliseconds_per_call(query, calls):
+    '''
+    Return the mean duration of query() in milliseconds.
+    '''
+    start = time.perf_counter()
+    for _ in range(calls):
+        query()
+    return (time.perf_counter() - start) * 1000 / calls
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Time plot queries at several table sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Table sizes in rows.")
+    parser.add_argument("--calls", type=int, default=20, help="Queries timed per size.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'indexed ms':>11} {'strftime ms':>12} {'store ms':>9} "
+          f"{'store load s':>13}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_ops = DBOperations(os.path.join(tmp, "weather.db"))
+            db_ops.initialize_db()
+            for location, weather_data in synthetic_data(size).items():
+                db_ops.upsert_data(weather_data, location)
+
+            indexed = milliseconds_per_call(
+                lambda db_ops=db_ops: db_ops.fetch_data(filter_type="lineplot", year=1995,
+                                                        month=6, location="Station 0"),
+                args.calls)
+
+            def strftime_query(db_name=db_ops.db_name):
+                with DBCM(db_name) as cursor:
+                    cursor.execute(STRFTIME_LINEPLOT_QUERY, (1995, 6))
+                    return cursor.fetchall()
+            unindexed = milliseconds_per_call(strftime_query, args.calls)
+
+            start = time.perf_counter()
+            store = WeatherStore(db_ops).load()
+            load_seconds = time.perf_counter() - start
+            in_memory = milliseconds_per_call(
+                lambda store=store: store.query(filter_type="lineplot", year=1995, month=6,
+                                                location="Station 0"), args.calls)
+        print(f"{size:>10} {indexed:>11.3f} {unindexed:>12.3f} {in_memory:>9.3f} "
+              f"{load_seconds:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
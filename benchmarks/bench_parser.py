@@ -0,0 +1,69 @@
+'''
+bench_parser.py
+
+Description: Micro-benchmark of the daily data page parsers over the saved fixture
+pages: the <tbody> fast path against the full HTMLParser pass.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_parser --seconds 2
+'''
+
+import argparse
+import glob
+import os
+import time
+
+from scrape_weather import WeatherScraper
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(pattern="daily_data_*.html"):
+    '''
+    Read the fixture pages into memory.
+    '''
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, pattern))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def pages_per_second(pages, fast_parse, seconds):
+    '''
+    Parse the pages round-robin for about the given number of seconds.
+    '''
+    parsed = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for content in pages:
+            scraper = WeatherScraper(fast_parse=fast_parse)
+            scraper.parse_page(content, 2024, 1)
+        parsed += len(pages)
+    return parsed / (time.perf_counter() - start)
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Compare page parser throughput.")
+    parser.add_argument("--seconds", type=float, default=2.0,
+                        help="Time spent on each parser.")
+    args = parser.parse_args()
+
+    pages = load_fixtures()
+    htmlparser_rate = pages_per_second(pages, False, args.seconds)
+    fast_rate = pages_per_second(pages, True, args.seconds)
+    print(f"{len(pages)} fixture pages")
+    print(f"  HTMLParser:      {htmlparser_rate:9.1f} pages/s")
+    print(f"  tbody fast path: {fast_rate:9.1f} pages/s")
+    print(f"  speedup:         {fast_rate / htmlparser_rate:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+'''
+bench_plot_prep.py
+
+Description: Benchmark of box plot data preparation: the per-record loop followed by
+matplotlib's own statistics, against the NumPy grouping and precomputed statistics
+that generate_boxplot hands to bxp.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_plot_prep --rows 550000
+'''
+
+import argparse
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np  # pylint: disable=wrong-import-position
+from matplotlib import cbook  # pylint: disable=wrong-import-position
+
+from plot_operations import PlotOperations  # pylint: disable=wrong-import-position
+
+
+def synthetic_rows(rows):
+    '''
+    Build (month, mean_temp) records as fetch_data(filter_type="boxplot") returns them.
+    '''
+    rng = np.random.default_rng(0)
+    months = rng.integers(1, 13, rows)
+    temps = np.round(rng.normal(0, 12, rows), 1)
+    return [(f"{month:02d}", temp) for month, temp in zip(months.tolist(), temps.tolist())]
+
+
+def record_loop(plot_ops, raw_data):
+    '''
+    Preparation before vectorisation: group per record, then cbook statistics.
+    '''
+    month_data = plot_ops.prepare_boxplot_data(raw_data)
+    return [cbook.boxplot_stats(month_data[month])[0] for month in sorted(month_data)]
+
+
+def vectorised(plot_ops, raw_data):
+    '''
+    The generate_boxplot preparation path.
+    '''
+    month_data = plot_ops.prepare_boxplot_arrays(*plot_ops.rows_to_arrays(raw_data))
+    return [plot_ops.boxplot_stats(month_data[month], label=str(month))
+            for month in sorted(month_data)]
+
+
+def seconds(prepare, plot_ops, raw_data, repeat=3):
+    '''
+    Return the best of repeat runs in seconds.
+    '''
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        prepare(plot_ops, raw_data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Compare box plot preparation paths.")
+    parser.add_argument("--rows", type=int, default=550000,
+                        help="Daily records (about 150 years for 10 stations by default).")
+    args = parser.parse_args()
+
+    plot_ops = PlotOperations()
+    raw_data = synthetic_rows(args.rows)
+    loop = seconds(record_loop, plot_ops, raw_data)
+    arrays = seconds(vectorised, plot_ops, raw_data)
+    print(f"{args.rows} records")
+    print(f"  record loop + cbook: {loop * 1000:8.1f} ms")
+    print(f"  NumPy arrays + bxp:  {arrays * 1000:8.1f} ms")
+    print(f"  speedup:             {loop / arrays:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
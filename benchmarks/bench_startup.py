@@ -0,0 +1,114 @@
+'''
+bench_startup.py
+
+Description: Startup time benchmark of the GUI. Imports weather_processor in a fresh
+interpreter under python -X importtime, reports its cumulative import time and the
+slowest modules it pulls in, and checks the result against STARTUP_BUDGET_MS. With a
+display, it also times how long the window takes to appear.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_startup --runs 5
+'''
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cumulative import time allowed for weather_processor; enforced by test_startup.py.
+STARTUP_BUDGET_MS = 250
+# Modules that must stay out of startup; they load when a plot or scrape is requested.
+DEFERRED_MODULES = ("matplotlib", "numpy", "asyncio", "ssl", "scrape_weather",
+                    "plot_operations", "weather_store")
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+from weather_processor import WeatherProcessor
+root = tk.Tk()
+WeatherProcessor(root)
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+
+def import_times(module="weather_processor"):
+    '''
+    Import a module in a fresh interpreter with -X importtime.
+    :return: Dictionary mapping every imported module to its cumulative import time
+             in milliseconds.
+    '''
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2)) / 1000
+    return times
+
+
+def measure_startup(runs=5, module="weather_processor"):
+    '''
+    Import the module runs times.
+    :return: Tuple (median cumulative milliseconds, import times of the median run).
+    '''
+    samples = sorted((import_times(module) for _ in range(runs)), key=lambda t: t[module])
+    median = samples[len(samples) // 2]
+    return median[module], median
+
+
+def deferred_imports(times):
+    '''
+    Return the DEFERRED_MODULES packages found in an import_times() result.
+    '''
+    return sorted({name.split(".")[0] for name in times
+                   if name.split(".")[0] in DEFERRED_MODULES})
+
+
+def window_seconds():
+    '''
+    Time from interpreter start to the first drawn window, or None without a display.
+    '''
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=REPO_DIR,
+                            capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Measure weather_processor startup time.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list.")
+    args = parser.parse_args()
+
+    total, times = measure_startup(args.runs)
+    print(f"import weather_processor: {total:.1f} ms (median of {args.runs}, "
+          f"budget {STARTUP_BUDGET_MS} ms)")
+    slowest = sorted((item for item in times.items() if item[0] != "weather_processor"),
+                     key=lambda item: -item[1])
+    for name, milliseconds in slowest[:args.top]:
+        print(f"  {milliseconds:8.1f} ms  {name}")
+    loaded = deferred_imports(times)
+    if loaded:
+        print(f"Deferred modules imported at startup: {', '.join(loaded)}")
+    seconds = window_seconds()
+    print(f"Window shown after {seconds:.3f} s" if seconds is not None
+          else "No display; window time not measured.")
+    if total > STARTUP_BUDGET_MS or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
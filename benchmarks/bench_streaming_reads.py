@@ -0,0 +1,72 @@
+'''
+bench_streaming_reads.py
+
+Description: Benchmark of a full pass over the weather table: fetch_all_data against
+iter_all_data. Reports time and the peak Python memory of each pass.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage: python -m benchmarks.bench_streaming_reads --rows 1000000 --arraysize 1000
+'''
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_bulk_upsert import synthetic_data
+from db_operations import DBOperations
+
+
+def mean_temperature(rows):
+    '''
+    A stand-in analytics pass: the mean of the avg_temp column.
+    '''
+    total = count = 0
+    for row in rows:
+        if row[5] is not None:
+            total += row[5]
+            count += 1
+    return total / count if count else None
+
+
+def measure(read):
+    '''
+    Run one pass and return (seconds, peak MiB allocated during it).
+    '''
+    tracemalloc.start()
+    start = time.perf_counter()
+    mean_temperature(read())
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def main():
+    '''
+    Run the benchmark and print the results.
+    '''
+    parser = argparse.ArgumentParser(description="Compare full and streamed table reads.")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows in the table.")
+    parser.add_argument("--arraysize", type=int, default=1000, help="Rows per fetchmany.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_ops = DBOperations(os.path.join(tmp, "weather.db"))
+        db_ops.initialize_db()
+        for location, weather_data in synthetic_data(args.rows).items():
+            db_ops.upsert_data(weather_data, location)
+
+        full = measure(db_ops.fetch_all_data)
+        streamed = measure(lambda: db_ops.iter_all_data(arraysize=args.arraysize))
+    print(f"{args.rows} rows, arraysize {args.arraysize}")
+    print(f"  fetch_all_data: {full[0]:7.2f} s, peak {full[1]:8.1f} MiB")
+    print(f"  iter_all_data:  {streamed[0]:7.2f} s, peak {streamed[1]:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
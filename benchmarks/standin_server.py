@@ -0,0 +1,191 @@
+'''
+standin_server.py
+
+Description: A local stand-in for the Environment Canada daily data page.
+Serves synthetic month pages over keep-alive HTTP/1.1 so the scraper can be
+benchmarked and tested without touching climate.weather.gc.ca.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+'''
+
+import calendar
+import gzip
+import hashlib
+import random
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+PAGE_PATH = "/climate_data/daily_data_e.html"
+# Redirects to PAGE_PATH with the same query, and to itself.
+MOVED_PATH = "/moved" + PAGE_PATH
+LOOP_PATH = "/loop" + PAGE_PATH
+LAST_MODIFIED = "Fri, 22 Nov 2024 00:00:00 GMT"
+
+
+def build_month_page(station_id, year, month):
+    '''
+    Build a synthetic daily data page for one station and month.
+    The markup mirrors the layout of the real page: navigation chrome, a header
+    row in <thead>, one row per day in <tbody> and summary rows at the end.
+
+    :return: The page as a string.
+    '''
+    rng = random.Random(f"{station_id}-{year}-{month}")
+    month_name = calendar.month_name[month]
+    days = calendar.monthrange(year, month)[1]
+    base = -20 + 35 * abs(6.5 - abs(month - 7)) / 6.5
+    nav = "".join(
+        f'<li><a href="/page{i}.html" class="nav-link">Menu item {i}</a></li>\n'
+        for i in range(60)
+    )
+    rows = []
+    for day in range(1, days + 1):
+        max_temp = round(base + rng.uniform(0, 8), 1)
+        min_temp = round(base - rng.uniform(0, 8), 1)
+        mean_temp = round((max_temp + min_temp) / 2, 1)
+        rows.append(
+            f'<tr>\n<th scope="row"><abbr title="{month_name} {day}, {year}">'
+            f'{day:02d}</abbr></th>\n'
+            f'<td>{max_temp}</td>\n<td>{min_temp}</td>\n<td>{mean_temp}</td>\n'
+            f'<td>{max(0.0, round(18 - mean_temp, 1))}</td>\n'
+            f'<td>{max(0.0, round(mean_temp - 18, 1))}</td>\n'
+            f'<td>{round(rng.uniform(0, 5), 1)}</td>\n<td>0.0</td>\n'
+            f'<td>{round(rng.uniform(0, 5), 1)}</td>\n<td>{rng.randint(0, 30)}</td>\n'
+            f'<td>{rng.randint(1, 36)}</td>\n<td>{rng.randint(31, 80)}</td>\n</tr>\n'
+        )
+    rows.append('<tr>\n<th scope="row">Sum</th>\n<td></td>\n<td></td>\n<td></td>\n</tr>\n')
+    rows.append('<tr>\n<th scope="row">Avg</th>\n'
+                f'<td>{round(base + 4, 1)}</td>\n<td>{round(base - 4, 1)}</td>\n'
+                f'<td>{round(base, 1)}</td>\n</tr>\n')
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n"
+        f"<title>Daily Data Report for {month_name} {year} - Climate</title>\n"
+        "<meta charset=\"utf-8\">\n"
+        "<script>var wb = {\"mode\": \"min\"};</script>\n</head>\n<body>\n"
+        f"<nav><ul>\n{nav}</ul></nav>\n<main>\n"
+        f"<h1>Daily Data Report for {month_name} {year}</h1>\n"
+        "<div class=\"table-responsive\">\n"
+        "<table class=\"table table-striped table-hover table-condensed\">\n"
+        f"<caption>Daily Data Report for {month_name} {year}</caption>\n"
+        "<thead>\n<tr>\n<th>DAY</th>\n<th>Max Temp &deg;C</th>\n"
+        "<th>Min Temp &deg;C</th>\n<th>Mean Temp &deg;C</th>\n"
+        "<th>Heat Deg Days</th>\n<th>Cool Deg Days</th>\n<th>Total Rain mm</th>\n"
+        "<th>Total Snow cm</th>\n<th>Total Precip mm</th>\n<th>Snow on Grnd cm</th>\n"
+        "<th>Dir of Max Gust 10s deg</th>\n<th>Spd of Max Gust km/h</th>\n</tr>\n"
+        "</thead>\n<tbody>\n"
+        + "".join(rows)
+        + "</tbody>\n</table>\n</div>\n</main>\n"
+        "<footer><p>Date modified: 2024-11-22</p></footer>\n</body>\n</html>\n"
+    )
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    '''
+    Request handler serving synthetic month pages with optional latency and errors.
+    '''
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY a kept-alive
+    # connection stalls on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        '''
+        Serve one month page, honouring Accept-Encoding: gzip and If-None-Match.
+        '''
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+        parts = urlsplit(self.path)
+        if parts.path in (MOVED_PATH, LOOP_PATH):
+            target = PAGE_PATH if parts.path == MOVED_PATH else LOOP_PATH
+            self._send(302, b"Found", location=f"{target}?{parts.query}")
+            return
+        if parts.path != PAGE_PATH:
+            self._send(404, b"Not Found")
+            return
+        if server.error_rate and server.rng.random() < server.error_rate:
+            self._send(server.error_status, b"Service Unavailable")
+            return
+        query = parse_qs(parts.query)
+        try:
+            station_id = int(query["StationID"][0])
+            year = int(query["Year"][0])
+            month = int(query["Month"][0])
+            body = build_month_page(station_id, year, month).encode("utf-8")
+        except (KeyError, ValueError, calendar.IllegalMonthError):
+            self._send(400, b"Bad Request")
+            return
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag=etag)
+            return
+        self._send(200, body, "text/html; charset=utf-8", etag=etag)
+
+    def _send(self, status, body, content_type="text/plain", etag=None, location=None):
+        headers = {"Content-Type": content_type}
+        if location:
+            headers["Location"] = location
+        if etag:
+            headers["ETag"] = etag
+            headers["Last-Modified"] = LAST_MODIFIED
+        if status == 200 and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        '''Silence per-request logging.'''
+
+
+class StandinServer(ThreadingHTTPServer):
+    '''
+    Threaded HTTP server with the knobs used by benchmarks and tests.
+    '''
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0, error_status=503, seed=0):
+        super().__init__(address, StandinHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.request_count = 0
+        self.scheme = "http"
+
+    @property
+    def base_url(self):
+        '''URL of the daily data page, for WeatherScraper(base_url=...).'''
+        host, port = self.server_address[:2]
+        return f"{self.scheme}://{host}:{port}{PAGE_PATH}"
+
+
+def start_standin_server(host="127.0.0.1", port=0, certfile=None, keyfile=None, **options):
+    '''
+    Start a StandinServer on a background thread.
+    :param certfile: Optional certificate to serve HTTPS instead of HTTP.
+    :param keyfile: Optional private key for certfile.
+    :param options: latency, error_rate, error_status and seed for StandinServer.
+    :return: The running server; call shutdown() and server_close() when done.
+    '''
+    server = StandinServer((host, port), **options)
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        server.scheme = "https"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
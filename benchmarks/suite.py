@@ -0,0 +1,327 @@
+'''
+suite.py
+
+Description: Reproducible performance benchmark suite. Each scenario runs against the
+local stand-in server or synthetic data, never the live site, and the results are
+written as machine-readable JSON so runs can be compared and regressions caught.
+
+Scenarios:
+    scrape     end-to-end scrape throughput through the ingest pipeline (months/s, rows/s)
+    parse      page parse throughput of the scraper (pages/s)
+    insert     bulk insert throughput of DBOperations.save_data (rows/s)
+    fetch      fetch_data box plot and line plot latency at several table sizes
+    plot_prep  box plot data preparation time
+
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --output new.json --compare results.json
+'''
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.bench_bulk_upsert import DAYS_PER_LOCATION, iter_synthetic_data, synthetic_data
+from benchmarks.bench_parser import load_fixtures, pages_per_second
+from benchmarks.bench_plot_prep import synthetic_rows, vectorised
+from benchmarks.standin_server import start_standin_server
+from db_operations import DBOperations
+from http_pool import HTTPConnectionPool
+from ingest_pipeline import stream_weather_data
+from plot_operations import PlotOperations
+
+RESULTS_VERSION = 1
+# Relative change of a metric, in its worse direction, reported as a regression.
+DEFAULT_TOLERANCE = 0.10
+
+FULL_CONFIG = {
+    "scrape_years": 5,
+    "scrape_threads": 8,
+    "latency": 0.02,
+    "error_rate": 0.0,
+    "parse_seconds": 2.0,
+    "insert_rows": 1000000,
+    "fetch_sizes": [10000, 1000000, 10000000],
+    "fetch_calls": 50,
+    "plot_rows": 550000,
+}
+QUICK_CONFIG = dict(FULL_CONFIG, scrape_years=1, latency=0.0, parse_seconds=0.5,
+                    insert_rows=50000, fetch_sizes=[10000, 100000], fetch_calls=20,
+                    plot_rows=50000)
+
+
+def metric(scenario, name, value, unit, better="higher", **labels):
+    '''
+    Build one result entry.
+    :param better: "higher" or "lower", the direction in which the value improves.
+    :param labels: Extra identifying fields, e.g. rows=1000000.
+    '''
+    return {"scenario": scenario, "name": name, "value": value, "unit": unit,
+            "better": better, **labels}
+
+
+def environment():
+    '''
+    Describe the machine and code the suite ran on.
+    '''
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "numpy": np.__version__,
+        "commit": commit,
+    }
+
+
+def percentile_ms(durations, percent):
+    '''
+    Return a percentile of durations in seconds, in milliseconds.
+    '''
+    return float(np.percentile(np.array(durations) * 1000, percent))
+
+
+def scenario_scrape(config, work_dir):
+    '''
+    Scrape scrape_years of one station from the stand-in server into a fresh database.
+    '''
+    server = start_standin_server(latency=config["latency"], error_rate=config["error_rate"],
+                                  seed=0)
+    pool = HTTPConnectionPool()
+    try:
+        db_ops = DBOperations(os.path.join(work_dir, "scrape.db"))
+        db_ops.initialize_db()
+        start = time.perf_counter()
+        stats = stream_weather_data(2000, 2000 + config["scrape_years"] - 1, 27174, db_ops,
+                                    pool=pool, base_url=server.base_url,
+                                    max_threads=config["scrape_threads"])
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+    return [
+        metric("scrape", "months_per_second", stats["months"] / elapsed, "months/s"),
+        metric("scrape", "rows_per_second", stats["rows"] / elapsed, "rows/s"),
+        metric("scrape", "requests", server.request_count, "requests", better="lower"),
+    ]
+
+
+def scenario_parse(config, work_dir):  # pylint: disable=unused-argument
+    '''
+    Parse the fixture pages for parse_seconds.
+    '''
+    rate = pages_per_second(load_fixtures(), True, config["parse_seconds"])
+    return [metric("parse", "pages_per_second", rate, "pages/s")]
+
+
+def scenario_insert(config, work_dir):
+    '''
+    Insert insert_rows synthetic rows into an empty table.
+    '''
+    rows = config["insert_rows"]
+    data = synthetic_data(rows)
+    db_ops = DBOperations(os.path.join(work_dir, "insert.db"))
+    db_ops.initialize_db()
+    start = time.perf_counter()
+    for location, weather_data in data.items():
+        db_ops.save_data(weather_data, location)
+    elapsed = time.perf_counter() - start
+    return [metric("insert", "rows_per_second", rows / elapsed, "rows/s", rows=rows)]
+
+
+def scenario_fetch(config, work_dir):
+    '''
+    Time the box plot and line plot queries of fetch_data at each of fetch_sizes.
+    The table is grown in place from one size to the next.
+    '''
+    results = []
+    db_ops = DBOperations(os.path.join(work_dir, "fetch.db"))
+    db_ops.initialize_db()
+    loaded = 0
+    for size in sorted(config["fetch_sizes"]):
+        for number, (location, weather_data) in enumerate(iter_synthetic_data(size)):
+            # Locations filled by the previous size are already stored.
+            if number >= loaded // DAYS_PER_LOCATION:
+                db_ops.save_data(weather_data, location)
+        loaded = size
+        queries = {
+            "lineplot": lambda: db_ops.fetch_data(filter_type="lineplot", year=1995, month=6,
+                                                  location="Station 0"),
+            "boxplot": lambda: db_ops.fetch_data(filter_type="boxplot",
+                                                 year_range=(1990, 2010),
+                                                 location="Station 0"),
+        }
+        for name, query in queries.items():
+            durations = []
+            for _ in range(config["fetch_calls"]):
+                start = time.perf_counter()
+                query()
+                durations.append(time.perf_counter() - start)
+            for percent in (50, 95):
+                results.append(metric("fetch", f"{name}_p{percent}_ms",
+                                      percentile_ms(durations, percent), "ms",
+                                      better="lower", rows=size))
+    return results
+
+
+def scenario_plot_prep(config, work_dir):  # pylint: disable=unused-argument
+    '''
+    Prepare box plot statistics from plot_rows (month, mean) records, best of three.
+    '''
+    rows = config["plot_rows"]
+    raw_data = synthetic_rows(rows)
+    plot_ops = PlotOperations()
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        vectorised(plot_ops, raw_data)
+        best = min(best, time.perf_counter() - start)
+    return [metric("plot_prep", "boxplot_ms", best * 1000, "ms", better="lower", rows=rows)]
+
+
+SCENARIOS = {
+    "scrape": scenario_scrape,
+    "parse": scenario_parse,
+    "insert": scenario_insert,
+    "fetch": scenario_fetch,
+    "plot_prep": scenario_plot_prep,
+}
+
+
+def run_suite(config=None, scenarios=None, progress=print):
+    '''
+    Run benchmark scenarios.
+
+    :param config: Settings like FULL_CONFIG. Default is FULL_CONFIG.
+    :param scenarios: Names of the scenarios to run. Default is every scenario.
+    :param progress: Callable given a line of text as each scenario starts, or None.
+    :return: Results dictionary: version, created, environment, config and metrics.
+    '''
+    config = dict(FULL_CONFIG, **(config or {}))
+    names = list(scenarios or SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    metrics = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in names:
+            if progress:
+                progress(f"Running {name}...")
+            metrics.extend(SCENARIOS[name](config, work_dir))
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": config,
+        "metrics": metrics,
+    }
+
+
+def metric_key(entry):
+    '''
+    Return what identifies a metric across runs: its scenario, name and labels.
+    '''
+    return tuple(sorted((key, value) for key, value in entry.items()
+                        if key not in ("value", "unit", "better")))
+
+
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    '''
+    Compare two results dictionaries metric by metric.
+
+    :param tolerance: Relative change in the worse direction that counts as a regression.
+    :return: List of (entry, baseline value, relative change, regressed) for every metric
+             present in both runs. A positive change is an improvement.
+    '''
+    previous = {metric_key(entry): entry["value"] for entry in baseline["metrics"]}
+    comparison = []
+    for entry in current["metrics"]:
+        old = previous.get(metric_key(entry))
+        if old is None or old == 0:
+            continue
+        change = (entry["value"] - old) / abs(old)
+        if entry["better"] == "lower":
+            change = -change
+        comparison.append((entry, old, change, change < -tolerance))
+    return comparison
+
+
+def describe(entry):
+    '''
+    Return a one-line label of a metric.
+    '''
+    labels = "".join(f" {key}={value}" for key, value in entry.items()
+                     if key not in ("scenario", "name", "value", "unit", "better"))
+    return f"{entry['scenario']}.{entry['name']}{labels}"
+
+
+def main():
+    '''
+    Command line entry point. Exits with status 1 if --compare finds a regression.
+    '''
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite.")
+    parser.add_argument("--output", help="Write the results JSON to this file.")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown reported as a regression (default: 0.10).")
+    parser.add_argument("--quick", action="store_true",
+                        help="Small sizes for a fast smoke run.")
+    parser.add_argument("--scenario", action="append", dest="scenarios",
+                        choices=list(SCENARIOS), help="Scenario to run; repeat for more.")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Table sizes for fetch.")
+    parser.add_argument("--latency", type=float, help="Stand-in server latency in seconds.")
+    parser.add_argument("--error-rate", type=float, help="Stand-in server error rate.")
+    args = parser.parse_args()
+
+    config = dict(QUICK_CONFIG if args.quick else FULL_CONFIG)
+    for key, value in (("fetch_sizes", args.sizes), ("latency", args.latency),
+                       ("error_rate", args.error_rate)):
+        if value is not None:
+            config[key] = value
+    results = run_suite(config, args.scenarios)
+
+    for entry in results["metrics"]:
+        print(f"  {describe(entry):<45} {entry['value']:>14.3f} {entry['unit']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = 0
+        for entry, old, change, regressed in compare_results(baseline, results,
+                                                             args.tolerance):
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"  {describe(entry):<45} {old:>12.3f} -> {entry['value']:>12.3f} "
+                  f"({change:+.1%}){flag}")
+        if regressions:
+            print(f"{regressions} regression(s) beyond {args.tolerance:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
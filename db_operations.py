@@ -4,18 +4,73 @@ db_operations.py
 Description: Handles all database operations for the weather application.
 Author: Phillip Bridgeman
 Date: November 17, 2024
-Last Modified: December 3, 2024
-Version: 1.3
+Last Modified: October 17, 2026
+Version: 1.15
 '''
 
+import itertools
+import json
 import sqlite3
 import os
 from dbcm import DBCM
+import metrics
 
+# (station_id, location, first_year) registered by initialize_db.
+DEFAULT_STATION = (27174, "Winnipeg", 2020)
+# Rows per executemany call in the bulk write methods.
+DEFAULT_BATCH_SIZE = 5000
+# Rows per fetchmany call in the iter_* generators.
+DEFAULT_ARRAYSIZE = 1000
+# Generated columns of the weather table: (name, substr start, substr length).
+DATE_COLUMNS = (("year", 1, 4), ("month", 6, 2), ("day", 9, 2))
+# Stored columns of the weather table; SELECT * would include the generated ones.
+WEATHER_COLUMNS = "id, sample_date, location, min_temp, max_temp, avg_temp"
+BOXPLOT_QUERY = """
+    SELECT substr(sample_date, 6, 2) AS month, avg_temp
+    FROM weather
+    WHERE location = ? AND year BETWEEN ? AND ?
+"""
+LINEPLOT_QUERY = """
+    SELECT substr(sample_date, 9, 2) AS day, avg_temp
+    FROM weather
+    WHERE location = ? AND year = ? AND month = ?
+    ORDER BY day
+"""
 
+
+def weather_rows(weather_data, location):
+    """
+    Turn a weather data dictionary into (sample_date, location, min, max, mean) rows.
+    """
+    return ((sample_date, location, temps["Min"], temps["Max"], temps["Mean"])
+            for sample_date, temps in weather_data.items())
+
+
+def row_months(rows):
+    """
+    Return the set of (year, month) pairs of (sample_date, ...) rows.
+    """
+    year_months = {row[0][:7] for row in rows}
+    return {(int(year_month[:4]), int(year_month[5:7])) for year_month in year_months}
+
+
+def batched(iterable, size):
+    """
+    Yield lists of up to size items from iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+@metrics.instrument_methods("db")
 class DBOperations:
     """
     DBOperations class to handle all database operations.
+    Every public method is timed as db_<method>_seconds while metrics are recorded.
     """
 
     def __init__(self, db_name="weather_data.db"):
@@ -25,13 +80,35 @@ class DBOperations:
         """
         app_data_dir = os.getenv("LOCALAPPDATA", os.getcwd())
         self.db_name = os.path.join(app_data_dir, db_name)
+        self._write_listeners = []
 
         if not os.path.exists(app_data_dir):
             os.makedirs(app_data_dir)
 
+    def add_write_listener(self, listener):
+        """
+        Register a callable run after every committed write to the weather table.
+        It is called as listener(location, months), where months is the set of
+        (year, month) pairs written. purge_data calls it with (None, None).
+        """
+        self._write_listeners.append(listener)
+
+    def remove_write_listener(self, listener):
+        """
+        Unregister a callable added with add_write_listener.
+        """
+        self._write_listeners.remove(listener)
+
+    def _notify_write(self, location, weather_data):
+        if self._write_listeners:
+            months = row_months(weather_data.items()) if weather_data is not None else None
+            for listener in list(self._write_listeners):
+                listener(location, months)
+
     def initialize_db(self):
         """
-        Initialize the database and create the table if it doesn't exist.
+        Initialize the database and create the tables if they don't exist.
+        The station registry is seeded with the default Winnipeg station.
         """
         print(f"Initializing database at: {self.db_name}")
         with DBCM(self.db_name) as cursor:
@@ -46,93 +123,422 @@ class DBOperations:
                     UNIQUE(sample_date, location)
                 )
             """)
+            self._migrate_date_columns(cursor)
+            cursor.execute("""
+                SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_stats'
+            """)
+            stats_exist = cursor.fetchone() is not None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS monthly_stats (
+                    location TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    means TEXT NOT NULL,
+                    PRIMARY KEY (location, year, month)
+                ) WITHOUT ROWID
+            """)
+            if not stats_exist:
+                self._rebuild_monthly_stats(cursor)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stations (
+                    station_id INTEGER PRIMARY KEY,
+                    location TEXT NOT NULL UNIQUE,
+                    first_year INTEGER NOT NULL,
+                    last_year INTEGER
+                )
+            """)
+            cursor.execute("""
+                INSERT OR IGNORE INTO stations (station_id, location, first_year, last_year)
+                VALUES (?, ?, ?, NULL)
+            """, DEFAULT_STATION)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    station_id INTEGER NOT NULL,
+                    year INTEGER NOT NULL,
+                    month INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (station_id, year, month)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, attempts)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
 
-    def save_data(self, weather_data, location="Winnipeg"):
+    @staticmethod
+    def _migrate_date_columns(cursor):
+        """
+        Add the generated year/month/day columns and their index to the weather table.
+        Virtual columns are computed from sample_date, so existing rows need no rewrite.
+        """
+        cursor.execute("PRAGMA table_xinfo(weather)")
+        columns = {row[1] for row in cursor.fetchall()}
+        for name, start, length in DATE_COLUMNS:
+            if name not in columns:
+                cursor.execute(f"""
+                    ALTER TABLE weather ADD COLUMN {name} INTEGER GENERATED ALWAYS AS
+                        (CAST(substr(sample_date, {start}, {length}) AS INTEGER)) VIRTUAL
+                """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_weather_location_year_month
+            ON weather (location, year, month)
+        """)
+
+    @staticmethod
+    def _bump_data_version(cursor):
+        """
+        Increment the data version in the transaction that changed the weather table.
+        """
+        cursor.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def get_data_version(self):
+        """
+        Return the data version, a counter bumped by every committed change to the
+        weather table, including changes made by other processes.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("SELECT value FROM meta WHERE key = 'data_version'")
+            row = cursor.fetchone()
+            return row[0] if row else 0
+
+    @staticmethod
+    def _store_monthly_stats(cursor, location, year, month, means):
+        """
+        Write one month's summary from its sorted daily means, or drop it if empty.
+        """
+        if not means:
+            cursor.execute("""
+                DELETE FROM monthly_stats WHERE location = ? AND year = ? AND month = ?
+            """, (location, year, month))
+            return
+        cursor.execute("""
+            INSERT INTO monthly_stats (location, year, month, count, sum, min, max, means)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(location, year, month) DO UPDATE SET
+                count = excluded.count,
+                sum = excluded.sum,
+                min = excluded.min,
+                max = excluded.max,
+                means = excluded.means
+        """, (location, year, month, len(means), sum(means), means[0], means[-1],
+              json.dumps(means)))
+
+    @classmethod
+    def _refresh_monthly_stats(cls, cursor, location, months):
+        """
+        Recompute the summaries of the given (year, month) pairs of one location,
+        reading their daily means in one range scan of the (location, year, month) index.
+        """
+        if not months:
+            return
+        years = [year for year, _ in months]
+        cursor.execute("""
+            SELECT year, month, avg_temp FROM weather
+            WHERE location = ? AND year BETWEEN ? AND ? AND avg_temp IS NOT NULL
+            ORDER BY year, month, avg_temp
+        """, (location, min(years), max(years)))
+        means = {key: [row[2] for row in group]
+                 for key, group in itertools.groupby(cursor.fetchall(),
+                                                     key=lambda row: row[:2])
+                 if key in months}
+        for year, month in sorted(months):
+            cls._store_monthly_stats(cursor, location, year, month,
+                                     means.get((year, month), []))
+
+    @classmethod
+    def _rebuild_monthly_stats(cls, cursor):
+        """
+        Recompute every monthly summary from the weather table in one pass.
+        """
+        cursor.execute("DELETE FROM monthly_stats")
+        cursor.execute("""
+            SELECT location, year, month, avg_temp FROM weather
+            WHERE avg_temp IS NOT NULL
+            ORDER BY location, year, month, avg_temp
+        """)
+        rows = cursor.fetchall()
+        for (location, year, month), group in itertools.groupby(rows,
+                                                               key=lambda row: row[:3]):
+            cls._store_monthly_stats(cursor, location, year, month,
+                                     [row[3] for row in group])
+
+    def save_data(self, weather_data, location="Winnipeg", batch_size=DEFAULT_BATCH_SIZE):
         """
         Save weather data to the database.
         Prevents duplication using UNIQUE constraints.
 
         :param weather_data: Dictionary of weather data (date -> {Max, Min, Mean})
         :param location: Location name (default: Winnipeg)
+        :param batch_size: Number of rows sent per executemany call.
+        :return: Number of rows inserted.
         """
         with DBCM(self.db_name) as cursor:
-            for sample_date, temps in weather_data.items():
-                try:
-                    cursor.execute("""
-                        INSERT INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (sample_date, location, temps["Min"], temps["Max"], temps["Mean"]))
-                except sqlite3.IntegrityError:
-                    continue
+            inserted = self._insert_rows(cursor, weather_data, location, batch_size)
+        if inserted:
+            self._notify_write(location, weather_data)
+        return inserted
+
+    @classmethod
+    def _insert_rows(cls, cursor, weather_data, location, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Insert weather rows with the given cursor, skipping dates already stored.
+        :return: Number of rows inserted.
+        """
+        inserted = 0
+        for batch in batched(weather_rows(weather_data, location), batch_size):
+            cursor.executemany("""
+                INSERT INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(sample_date, location) DO NOTHING
+            """, batch)
+            if cursor.rowcount:
+                inserted += cursor.rowcount
+                cls._refresh_monthly_stats(cursor, location, row_months(batch))
+        if inserted:
+            cls._bump_data_version(cursor)
+            metrics.increment("db_rows_inserted", inserted)
+        return inserted
 
-    def update_data(self, weather_data, location="Winnipeg"):
+    def update_data(self, weather_data, location="Winnipeg", batch_size=DEFAULT_BATCH_SIZE):
         """
         Update weather data in the database.
         :param weather_data: Dictionary of weather data (date -> {Max, Min, Mean})
         :param location: Location name (default: Winnipeg)
+        :param batch_size: Number of rows sent per executemany call.
+        :return: Number of rows updated.
         """
+        updated = 0
         with DBCM(self.db_name) as cursor:
-            for sample_date, temps in weather_data.items():
-                try:
-                    cursor.execute("""
-                        UPDATE weather
-                        SET min_temp = ?, max_temp = ?, avg_temp = ?
-                        WHERE sample_date = ? AND location = ?
-                    """, (temps["Min"], temps["Max"], temps["Mean"], sample_date, location))
-                except sqlite3.IntegrityError:
-                    continue
+            for batch in batched(weather_data.items(), batch_size):
+                cursor.executemany("""
+                    UPDATE weather
+                    SET min_temp = ?, max_temp = ?, avg_temp = ?
+                    WHERE sample_date = ? AND location = ?
+                """, [(temps["Min"], temps["Max"], temps["Mean"], sample_date, location)
+                      for sample_date, temps in batch])
+                if cursor.rowcount:
+                    updated += cursor.rowcount
+                    self._refresh_monthly_stats(cursor, location, row_months(batch))
+            if updated:
+                self._bump_data_version(cursor)
+                metrics.increment("db_rows_updated", updated)
+        if updated:
+            self._notify_write(location, weather_data)
+        return updated
 
-    def fetch_data(self, filter_type="raw", year_range=None, year=None, month=None):
+    def upsert_data(self, weather_data, location="Winnipeg", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Insert new rows and refresh changed rows in one pass and one transaction.
+
+        :param weather_data: Dictionary of weather data (date -> {Max, Min, Mean})
+        :param location: Location name (default: Winnipeg)
+        :param batch_size: Number of rows sent per executemany call.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        """
+        with DBCM(self.db_name) as cursor:
+            counts = self._upsert_rows(cursor, weather_data, location, batch_size)
+        if counts["inserted"] or counts["updated"]:
+            self._notify_write(location, weather_data)
+        return counts
+
+    @classmethod
+    def _upsert_rows(cls, cursor, weather_data, location, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Upsert weather rows with the given cursor.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for batch in batched(weather_rows(weather_data, location), batch_size):
+            # New rows get ids above the current maximum; updated rows keep theirs.
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM weather")
+            max_id = cursor.fetchone()[0]
+            cursor.executemany("""
+                INSERT INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(sample_date, location) DO UPDATE SET
+                    min_temp = excluded.min_temp,
+                    max_temp = excluded.max_temp,
+                    avg_temp = excluded.avg_temp
+                WHERE weather.min_temp IS NOT excluded.min_temp
+                   OR weather.max_temp IS NOT excluded.max_temp
+                   OR weather.avg_temp IS NOT excluded.avg_temp
+            """, batch)
+            changed = cursor.rowcount
+            cursor.execute("SELECT COUNT(*) FROM weather WHERE id > ?", (max_id,))
+            inserted = cursor.fetchone()[0]
+            counts["inserted"] += inserted
+            counts["updated"] += changed - inserted
+            counts["unchanged"] += len(batch) - changed
+            if changed:
+                cls._refresh_monthly_stats(cursor, location, row_months(batch))
+        if counts["inserted"] or counts["updated"]:
+            cls._bump_data_version(cursor)
+            metrics.increment("db_rows_inserted", counts["inserted"])
+            metrics.increment("db_rows_updated", counts["updated"])
+        return counts
+
+    @staticmethod
+    def _filter_query(filter_type, year_range, year, month, location):
+        """
+        Return the (query, params) of a fetch_data filter, or None if it is invalid.
+        """
+        if filter_type == "raw":
+            return f"SELECT {WEATHER_COLUMNS} FROM weather", ()
+        if filter_type == "boxplot" and year_range:
+            start_year, end_year = year_range
+            return BOXPLOT_QUERY, (location, int(start_year), int(end_year))
+        if filter_type == "lineplot" and year and month:
+            return LINEPLOT_QUERY, (location, int(year), int(month))
+        return None
+
+    def fetch_data(self, filter_type="raw", year_range=None, year=None, month=None,
+                   location="Winnipeg"):
         """
         Fetch weather data from the database based on the filter type and parameters.
+        The boxplot and lineplot filters are served by the (location, year, month) index.
+
+        :param location: Location of the boxplot and lineplot rows (default: Winnipeg)
         """
+        query = self._filter_query(filter_type, year_range, year, month, location)
+        if query is None:
+            print("Invalid filter type or missing parameters.")
+            return None
         try:
-            if filter_type == "raw":
-                with DBCM(self.db_name) as cursor:
-                    cursor.execute("SELECT * FROM weather")
-                    return cursor.fetchall()
-            elif filter_type == "boxplot" and year_range:
-                start_year, end_year = year_range
-                with DBCM(self.db_name) as cursor:
-                    query = """
-                        SELECT strftime('%m', sample_date) AS month, avg_temp
-                        FROM weather
-                        WHERE CAST(strftime('%Y', sample_date) AS INTEGER) BETWEEN ? AND ?
-                    """
-                    cursor.execute(query, (start_year, end_year))
-                    return cursor.fetchall()
-            elif filter_type == "lineplot" and year and month:
-                with DBCM(self.db_name) as cursor:
-                    query = """
-                        SELECT strftime('%d', sample_date) AS day, avg_temp
-                        FROM weather
-                        WHERE CAST(strftime('%Y', sample_date) AS INTEGER) = ? 
-                        AND CAST(strftime('%m', sample_date) AS INTEGER) = ?
-                    """
-                    cursor.execute(query, (year, month))
-                    return cursor.fetchall()
-            else:
-                print("Invalid filter type or missing parameters.")
-                return None
+            with DBCM(self.db_name) as cursor:
+                cursor.execute(*query)
+                return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Error fetching data: {e}")
             return None
 
+    def iter_data(self, filter_type="raw", year_range=None, year=None, month=None,
+                  location="Winnipeg", arraysize=DEFAULT_ARRAYSIZE, batches=False):
+        """
+        Generator version of fetch_data. Rows are read from the cursor arraysize at a
+        time, so memory stays bounded however many rows match. The connection is held
+        only while the caller iterates and goes back to the pool when the generator
+        finishes or is closed.
+
+        :param arraysize: Number of rows fetched from SQLite per fetchmany call.
+        :param batches: If True, yield lists of up to arraysize rows instead of rows.
+        :raises ValueError: If the filter type is invalid or parameters are missing.
+        """
+        query = self._filter_query(filter_type, year_range, year, month, location)
+        if query is None:
+            raise ValueError("Invalid filter type or missing parameters.")
+        return self._iter_query(*query, arraysize=arraysize, batches=batches)
+
     def fetch_all_data(self):
         """
         Fetch all data from the database.
         :return: Rows tuple containing all records.
         """
         with DBCM(self.db_name) as cursor:
-            cursor.execute("SELECT * FROM weather")
+            cursor.execute(f"SELECT {WEATHER_COLUMNS} FROM weather")
             return cursor.fetchall()
 
+    def iter_all_data(self, arraysize=DEFAULT_ARRAYSIZE, batches=False):
+        """
+        Generator version of fetch_all_data; see iter_data.
+
+        :param arraysize: Number of rows fetched from SQLite per fetchmany call.
+        :param batches: If True, yield lists of up to arraysize rows instead of rows.
+        """
+        return self._iter_query(f"SELECT {WEATHER_COLUMNS} FROM weather", (),
+                                arraysize=arraysize, batches=batches)
+
+    def iter_rows(self, locations=None, year_range=None, arraysize=DEFAULT_ARRAYSIZE,
+                  batches=False):
+        """
+        Generator over the stored rows, optionally limited to some locations and a year
+        range; see iter_data.
+
+        :param locations: Optional list of location names.
+        :param year_range: Optional tuple (start_year, end_year).
+        :return: Generator of (id, sample_date, location, min_temp, max_temp, avg_temp)
+                 rows, or lists of them if batches is True.
+        """
+        conditions, params = [], []
+        if locations is not None:
+            conditions.append(f"location IN ({', '.join('?' * len(locations))})")
+            params.extend(locations)
+        if year_range:
+            conditions.append("year BETWEEN ? AND ?")
+            params.extend(int(year) for year in year_range)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._iter_query(f"SELECT {WEATHER_COLUMNS} FROM weather{where}", params,
+                                arraysize=arraysize, batches=batches)
+
+    def _iter_query(self, query, params, arraysize=DEFAULT_ARRAYSIZE, batches=False):
+        with DBCM(self.db_name) as cursor:
+            cursor.arraysize = arraysize
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+
+    def fetch_rows(self, location, year_range):
+        """
+        Fetch the stored rows of one location in a year range, using the
+        (location, year, month) index.
+
+        :param location: Location name.
+        :param year_range: Tuple (start_year, end_year).
+        :return: List of (id, sample_date, location, min_temp, max_temp, avg_temp) tuples.
+        """
+        start_year, end_year = year_range
+        with DBCM(self.db_name) as cursor:
+            cursor.execute(f"""
+                SELECT {WEATHER_COLUMNS} FROM weather
+                WHERE location = ? AND year BETWEEN ? AND ?
+            """, (location, int(start_year), int(end_year)))
+            return cursor.fetchall()
+
+    def fetch_monthly_stats(self, year_range, location="Winnipeg"):
+        """
+        Fetch the monthly summaries of a year range, kept up to date by every write.
+
+        :param year_range: Tuple (start_year, end_year).
+        :param location: Location name (default: Winnipeg)
+        :return: List of (year, month, count, sum, min, max, sorted daily means) tuples.
+        """
+        start_year, end_year = year_range
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                SELECT year, month, count, sum, min, max, means
+                FROM monthly_stats
+                WHERE location = ? AND year BETWEEN ? AND ?
+                ORDER BY year, month
+            """, (location, int(start_year), int(end_year)))
+            return [row[:6] + (json.loads(row[6]),) for row in cursor.fetchall()]
+
     def purge_data(self):
         """
         Delete all weather data from the database without dropping the table.
         """
         with DBCM(self.db_name) as cursor:
             cursor.execute("DELETE FROM weather")
+            cursor.execute("DELETE FROM monthly_stats")
+            self._bump_data_version(cursor)
+        self._notify_write(None, None)
 
     def get_latest_date(self, location="Winnipeg"):
         """
@@ -150,6 +556,200 @@ class DBOperations:
             result = cursor.fetchone()
             return result[0] if result and result[0] else None
 
+    def get_month_counts(self, location="Winnipeg", since=None):
+        """
+        Count the stored rows per month for the given location.
+
+        :param location: Location name (default: Winnipeg)
+        :param since: Optional date string (YYYY-MM-DD); months before it are skipped.
+        :return: Dictionary mapping (year, month) to the number of stored days.
+        """
+        since = since[:7] + "-01" if since else "0000-01-01"
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                SELECT substr(sample_date, 1, 7) AS year_month, COUNT(*)
+                FROM weather
+                WHERE location = ? AND sample_date >= ?
+                GROUP BY year_month
+            """, (location, since))
+            return {(int(year_month[:4]), int(year_month[5:7])): count
+                    for year_month, count in cursor.fetchall()}
+
+    def add_station(self, station_id, location, first_year, last_year=None):
+        """
+        Add a station to the registry, or update it if the station ID is already there.
+
+        :param station_id: Environment Canada station ID.
+        :param location: Location name stored with the station's rows.
+        :param first_year: First year with data.
+        :param last_year: Last year with data, or None if the station is still active.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                INSERT INTO stations (station_id, location, first_year, last_year)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(station_id) DO UPDATE SET
+                    location = excluded.location,
+                    first_year = excluded.first_year,
+                    last_year = excluded.last_year
+            """, (station_id, location, first_year, last_year))
+
+    def remove_station(self, station_id):
+        """
+        Remove a station from the registry. Its weather rows are kept.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("DELETE FROM stations WHERE station_id = ?", (station_id,))
+
+    def get_stations(self):
+        """
+        Fetch the station registry.
+        :return: List of (station_id, location, first_year, last_year) tuples.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                SELECT station_id, location, first_year, last_year
+                FROM stations
+                ORDER BY station_id
+            """)
+            return cursor.fetchall()
+
+    def get_station(self, station_id):
+        """
+        Fetch one station from the registry.
+        :return: Tuple (station_id, location, first_year, last_year) or None.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                SELECT station_id, location, first_year, last_year
+                FROM stations
+                WHERE station_id = ?
+            """, (station_id,))
+            return cursor.fetchone()
+
+    def enqueue_jobs(self, station_id, pages, refresh=False):
+        """
+        Add (year, month) scrape jobs for a station. Jobs that already exist keep their
+        status, so a restarted backfill resumes where it stopped.
+
+        :param station_id: Station ID the jobs belong to.
+        :param pages: Iterable of (year, month) tuples.
+        :param refresh: If True, jobs already done are set back to pending, e.g. for
+                        months that may still change.
+        """
+        conflict = ("DO UPDATE SET status = 'pending', attempts = 0, "
+                    "updated_at = CURRENT_TIMESTAMP WHERE status = 'done'"
+                    if refresh else "DO NOTHING")
+        with DBCM(self.db_name) as cursor:
+            cursor.executemany(f"""
+                INSERT INTO jobs (station_id, year, month) VALUES (?, ?, ?)
+                ON CONFLICT(station_id, year, month) {conflict}
+            """, [(station_id, year, month) for year, month in pages])
+
+    def reset_jobs(self):
+        """
+        Prepare the job table for a new run: jobs left running by a process that died
+        go back to pending, and failed jobs get a fresh set of attempts.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                UPDATE jobs SET status = 'pending', updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'running'
+            """)
+            cursor.execute("""
+                UPDATE jobs SET attempts = 0, updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'failed'
+            """)
+
+    def claim_jobs(self, limit, max_attempts=3, station_ids=None):
+        """
+        Atomically mark up to limit pending or failed jobs as running.
+
+        :param limit: Maximum number of jobs to claim.
+        :param max_attempts: Jobs that already failed this many times are skipped.
+        :param station_ids: Optional list of stations to claim jobs for.
+        :return: List of (station_id, year, month) tuples.
+        """
+        station_filter = ""
+        params = [max_attempts]
+        if station_ids is not None:
+            station_filter = f"AND station_id IN ({', '.join('?' * len(station_ids))})"
+            params.extend(station_ids)
+        params.append(limit)
+        with DBCM(self.db_name) as cursor:
+            cursor.execute(f"""
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE rowid IN (
+                    SELECT rowid FROM jobs
+                    WHERE status IN ('pending', 'failed') AND attempts < ? {station_filter}
+                    ORDER BY year, month, station_id
+                    LIMIT ?
+                )
+                RETURNING station_id, year, month
+            """, params)
+            return cursor.fetchall()
+
+    def complete_job(self, job, weather_data, location):
+        """
+        Save a job's rows and mark it done in the same transaction.
+
+        :param job: Tuple (station_id, year, month).
+        :param weather_data: Dictionary of weather data (date -> {Max, Min, Mean})
+        :param location: Location name stored with the rows.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        """
+        with DBCM(self.db_name) as cursor:
+            counts = self._complete_job_rows(cursor, job, weather_data, location)
+        if counts["inserted"] or counts["updated"]:
+            self._notify_write(location, weather_data)
+        return counts
+
+    @classmethod
+    def _complete_job_rows(cls, cursor, job, weather_data, location):
+        """
+        Upsert a job's rows and mark it done with the given cursor. Rows are upserted,
+        not inserted, so a refreshed job stores revised values for days already saved.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        """
+        counts = cls._upsert_rows(cursor, weather_data, location)
+        cursor.execute("""
+            UPDATE jobs
+            SET status = 'done', last_error = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE station_id = ? AND year = ? AND month = ?
+        """, job)
+        return counts
+
+    def fail_job(self, job, error):
+        """
+        Mark a job as failed and record the error.
+
+        :param job: Tuple (station_id, year, month).
+        :param error: Error message or exception.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'failed', last_error = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE station_id = ? AND year = ? AND month = ?
+            """, (str(error), *job))
+
+    def get_job_counts(self, station_id=None):
+        """
+        Count jobs by status.
+
+        :param station_id: Optional station to count; default is every station.
+        :return: Dictionary mapping status to the number of jobs.
+        """
+        with DBCM(self.db_name) as cursor:
+            cursor.execute("""
+                SELECT status, COUNT(*) FROM jobs
+                WHERE ? IS NULL OR station_id = ?
+                GROUP BY status
+            """, (station_id, station_id))
+            return dict(cursor.fetchall())
+
 
 if __name__ == "__main__":
     db = DBOperations()
@@ -0,0 +1,412 @@
+'''
+db_writer.py
+
+Description: A single-writer service for concurrent ingestion. One DBWriter thread holds
+its own write connection to the database; producer threads queue row batches and get
+futures back, and the writer commits whatever has queued up as one transaction (group
+commit). The ingest pipeline and the backfill save their weather rows through
+shared_writer(), one writer per database file. Other writes, such as job bookkeeping
+(enqueue_jobs, claim_jobs, fail_job), purge_data and direct DBOperations calls, still
+use their own connections. Producers in other processes connect through serve() and
+WriterClient.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.5
+'''
+
+import atexit
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from db_operations import DBOperations, DEFAULT_BATCH_SIZE
+from dbcm import ConnectionPool
+
+# Rows committed together at most; a larger backlog is split over several commits.
+DEFAULT_GROUP_ROWS = 50000
+DEFAULT_QUEUE_SIZE = 256
+MODES = ("insert", "upsert", "complete_job")
+
+# One queued write. job is the (station_id, year, month) of a complete_job write, and
+# db_ops the DBOperations whose write listeners are notified after the commit.
+WriteRequest = namedtuple("WriteRequest", ["future", "mode", "weather_data", "location",
+                                           "batch_size", "job", "db_ops"])
+
+
+class DBWriter(threading.Thread):  # pylint: disable=too-many-instance-attributes
+    '''
+    DBWriter applies queued row writes through DBOperations' bulk insert and upsert
+    paths, on one connection. Writes made directly through DBOperations bypass it.
+    Every request runs in its own savepoint, so a failing request is rolled back
+    without affecting the others committed with it. save_data, upsert_data and
+    complete_job take the same arguments as the DBOperations methods. Write listeners
+    run on the writer thread and must not write through the same writer.
+    '''
+    def __init__(self, db_ops, group_rows=DEFAULT_GROUP_ROWS, queue_size=DEFAULT_QUEUE_SIZE):
+        '''
+        Initialize the DBWriter class.
+        :param db_ops: DBOperations instance of the database; its write listeners are
+                       notified after each commit unless a request names another.
+        :param group_rows: Maximum rows committed in one transaction.
+        :param queue_size: Number of requests that may wait; producers block beyond it.
+        '''
+        super().__init__(name="weather-db-writer", daemon=True)
+        self.db_ops = db_ops
+        self.group_rows = group_rows
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.rows_written = 0
+        self.commits = 0
+        self.error = None
+        self._closed = False
+        # Held while checking _closed and queueing, so nothing is queued after the
+        # writer has closed and drained its queue.
+        self._lock = threading.Lock()
+
+    def submit(self, weather_data, location="Winnipeg", mode="insert",
+               batch_size=DEFAULT_BATCH_SIZE, *, job=None, db_ops=None):
+        '''
+        Queue a write.
+
+        :param weather_data: Dictionary of weather data (date -> {Max, Min, Mean})
+        :param location: Location name (default: Winnipeg)
+        :param mode: "insert" skips stored dates like save_data; "upsert" refreshes
+                     changed rows like upsert_data; "complete_job" upserts and
+                     marks job done, like complete_job.
+        :param batch_size: Number of rows sent per executemany call.
+        :param job: Tuple (station_id, year, month) of a complete_job write.
+        :param db_ops: DBOperations whose write listeners are notified. Default is the
+                       writer's.
+        :return: Future resolved after the commit with the number of rows inserted, or
+                 the upsert counts dictionary.
+        :raises ValueError: If the mode is unknown.
+        :raises RuntimeError: If the writer is not running.
+        '''
+        if mode not in MODES:
+            raise ValueError(f"Unknown write mode: {mode}")
+        if (mode == "complete_job") != (job is not None):
+            raise ValueError("A job is given with the complete_job mode only.")
+        request = WriteRequest(Future(), mode, weather_data, location, batch_size, job,
+                               db_ops or self.db_ops)
+        with self._lock:
+            if not self.running:
+                raise RuntimeError("The writer is not running.")
+            self.queue.put(request)
+        return request.future
+
+    @property
+    def running(self):
+        '''True while the writer accepts writes.'''
+        return not self._closed and self.is_alive()
+
+    def save_data(self, weather_data, location="Winnipeg", batch_size=DEFAULT_BATCH_SIZE,
+                  db_ops=None):
+        '''
+        Insert rows through the writer and wait for the commit, like
+        DBOperations.save_data.
+        :return: Number of rows inserted.
+        '''
+        return self.submit(weather_data, location, "insert", batch_size,
+                           db_ops=db_ops).result()
+
+    def upsert_data(self, weather_data, location="Winnipeg", batch_size=DEFAULT_BATCH_SIZE,
+                    db_ops=None):
+        '''
+        Upsert rows through the writer and wait for the commit, like
+        DBOperations.upsert_data.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        '''
+        return self.submit(weather_data, location, "upsert", batch_size,
+                           db_ops=db_ops).result()
+
+    def complete_job(self, job, weather_data, location, db_ops=None):
+        '''
+        Save a job's rows and mark it done in the same transaction, like
+        DBOperations.complete_job, and wait for the commit.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        '''
+        return self.submit(weather_data, location, "complete_job", job=job,
+                           db_ops=db_ops).result()
+
+    def close(self):
+        '''
+        Commit everything queued so far and stop the writer thread.
+        '''
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                # The writer drains the queue, so this put cannot block for good.
+                self.queue.put(None)
+        if self.is_alive():
+            self.join()
+
+    def _next_group(self):
+        '''
+        Block for one request, then take whatever else is queued up to group_rows.
+        :return: Tuple (requests, stop).
+        '''
+        item = self.queue.get()
+        if item is None:
+            return [], True
+        group, rows = [item], len(item.weather_data)
+        while rows < self.group_rows:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return group, True
+            group.append(item)
+            rows += len(item.weather_data)
+        return group, False
+
+    def _apply(self, cursor, group):
+        '''
+        Run each request of a group in its own savepoint.
+        :return: List of (request, result, error) tuples.
+        '''
+        outcomes = []
+        for request in group:
+            cursor.execute("SAVEPOINT request")
+            try:
+                # The cursor-level helpers behind save_data, upsert_data and complete_job.
+                # pylint: disable=protected-access
+                if request.mode == "insert":
+                    result = DBOperations._insert_rows(cursor, request.weather_data,
+                                                       request.location, request.batch_size)
+                elif request.mode == "upsert":
+                    result = DBOperations._upsert_rows(cursor, request.weather_data,
+                                                       request.location, request.batch_size)
+                else:
+                    result = DBOperations._complete_job_rows(cursor, request.job,
+                                                             request.weather_data,
+                                                             request.location)
+                cursor.execute("RELEASE request")
+                outcomes.append((request, result, None))
+            except Exception as e:  # pylint: disable=broad-except
+                # The error belongs to this request; its future re-raises it.
+                cursor.execute("ROLLBACK TO request")
+                cursor.execute("RELEASE request")
+                outcomes.append((request, None, e))
+        return outcomes
+
+    def run(self):
+        group = []
+        try:
+            # Autocommit mode: transactions and savepoints are managed explicitly here.
+            connection = ConnectionPool(self.db_ops.db_name, maxsize=1).get()
+            connection.isolation_level = None
+            try:
+                stop = False
+                while not stop:
+                    group, stop = self._next_group()
+                    if group:
+                        self._write_group(connection, group)
+                    group = []
+            finally:
+                connection.close()
+        except Exception as e:  # pylint: disable=broad-except
+            # Anything escaping here is a bug or a lost connection; fail every write
+            # still waiting instead of leaving producers blocked on their futures.
+            self.error = e
+            print(f"Database writer stopped: {e}")
+            for request in group:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._shut_down()
+
+    def _write_group(self, connection, group):
+        '''
+        Apply a group of requests in one transaction and settle their futures.
+        '''
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            outcomes = self._apply(cursor, group)
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.rollback()
+            outcomes = [(request, None, e) for request in group]
+        else:
+            self.commits += 1
+        finally:
+            cursor.close()
+        self._settle(outcomes)
+
+    def _settle(self, outcomes):
+        '''
+        Resolve the futures of a committed (or failed) group, then notify listeners.
+        A failing listener is reported and skipped; the rows are already committed.
+        '''
+        written = []
+        for request, result, error in outcomes:
+            if error is not None:
+                request.future.set_exception(error)
+                continue
+            changed = result if request.mode == "insert" \
+                else result["inserted"] + result["updated"]
+            self.rows_written += changed
+            request.future.set_result(result)
+            if changed:
+                written.append(request)
+        for request in written:
+            try:
+                # pylint: disable=protected-access
+                request.db_ops._notify_write(request.location, request.weather_data)
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"Write listener failed for {request.location}: {e}")
+
+    def _shut_down(self):
+        '''
+        Mark the writer closed and fail every write still queued.
+        '''
+        self._closed = True
+        # A producer may hold the lock while blocked on a full queue; draining first
+        # lets its put finish, and the second drain under the lock settles that write.
+        self._fail_pending()
+        with self._lock:
+            self._fail_pending()
+
+    def _fail_pending(self):
+        error = RuntimeError(f"The writer stopped: {self.error}" if self.error
+                             else "The writer is closed.")
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item.future.set_exception(error)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def shared_writer(db_ops):
+    '''
+    Return the running writer of db_ops' database file, starting one on first use or
+    after the previous one stopped. Writes from every producer of the process then share
+    one write connection instead of contending for SQLite's write lock.
+    '''
+    with _writers_lock:
+        writer = _writers.get(db_ops.db_name)
+        if writer is None or not writer.running:
+            writer = _writers[db_ops.db_name] = DBWriter(db_ops)
+            writer.start()
+        return writer
+
+
+def close_writer(db_name):
+    '''
+    Commit what is queued and stop the shared writer of a database file, if any.
+    '''
+    with _writers_lock:
+        writer = _writers.pop(db_name, None)
+    if writer is not None:
+        writer.close()
+
+
+def close_all_writers():
+    '''
+    Stop every shared writer. Registered to run at interpreter exit.
+    '''
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all_writers)
+
+
+def serve(writer, address, authkey):
+    '''
+    Accept writes from other processes. Each client connection gets a thread that
+    forwards (mode, weather_data, location) messages to the writer and sends back
+    ("ok", result) or ("error", message) once the write is committed.
+
+    :param writer: Running DBWriter.
+    :param address: Listener address, e.g. ("127.0.0.1", 0) or a socket path.
+    :param authkey: Shared secret bytes clients must present.
+    :return: The Listener; its address attribute is the bound address. Close it to stop
+             accepting clients.
+    '''
+    listener = Listener(address, authkey=authkey)
+
+    def handle(connection):
+        # Only this thread uses the connection, and it waits for each write here, so a
+        # slow client never holds up the writer thread.
+        with connection:
+            while True:
+                try:
+                    mode, weather_data, location = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", writer.submit(weather_data, location, mode).result())
+                except Exception as e:  # pylint: disable=broad-except
+                    # The write's own error, re-raised by its future, goes to the client.
+                    reply = ("error", f"{type(e).__name__}: {e}")
+                try:
+                    connection.send(reply)
+                except OSError:
+                    return
+
+    def accept():
+        while True:
+            try:
+                connection = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=accept, name="weather-db-writer-listener", daemon=True).start()
+    return listener
+
+
+class WriterClient:
+    '''
+    WriterClient sends writes from another process to a DBWriter started with serve().
+    It offers save_data and upsert_data like DBOperations. A client connection is used
+    by one thread at a time.
+    '''
+    def __init__(self, address, authkey):
+        '''
+        Initialize the WriterClient class.
+        :param address: Address returned by serve() as listener.address.
+        :param authkey: The writer's shared secret.
+        '''
+        self.connection = Client(address, authkey=authkey)
+
+    def _write(self, mode, weather_data, location):
+        self.connection.send((mode, weather_data, location))
+        status, result = self.connection.recv()
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
+    def save_data(self, weather_data, location="Winnipeg"):
+        '''
+        Insert rows and wait for the writer's commit.
+        :return: Number of rows inserted.
+        '''
+        return self._write("insert", weather_data, location)
+
+    def upsert_data(self, weather_data, location="Winnipeg"):
+        '''
+        Upsert rows and wait for the writer's commit.
+        :return: Dictionary with the number of rows inserted, updated and unchanged.
+        '''
+        return self._write("upsert", weather_data, location)
+
+    def close(self):
+        '''
+        Close the connection to the writer.
+        '''
+        self.connection.close()
@@ -2,33 +2,169 @@
 dbcm.py
 
 Description: A context manager module to manage SQLite database connections.
+Connections come from a per-database pool and are tuned once when opened.
 Author: Phillip Bridgeman
 Date: November 17, 2024
-Last Modified: November 22, 2024
-Version: 1.2
+Last Modified: October 17, 2026
+Version: 1.5
 '''
 
+import atexit
+import os
+import queue
 import sqlite3
+import threading
+
+DEFAULT_POOL_SIZE = 8
+# Seconds a connection waits on a locked database before raising.
+BUSY_TIMEOUT = 30.0
+# Page cache per connection in KiB, passed to SQLite as a negative cache_size.
+CACHE_SIZE_KIB = 32768
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+class ConnectionPool:
+    """
+    ConnectionPool keeps idle connections to one database file. A connection is used
+    by one thread at a time, but may be handed to a different thread on its next use.
+    """
+    def __init__(self, db_name, maxsize=DEFAULT_POOL_SIZE, busy_timeout=BUSY_TIMEOUT,
+                 cache_size_kib=CACHE_SIZE_KIB, mmap_size=MMAP_SIZE):
+        """
+        Initialize the ConnectionPool class.
+        :param db_name: Path of the SQLite database file.
+        :param maxsize: Number of idle connections kept open.
+        :param busy_timeout: Seconds to wait for a lock held by another connection.
+        :param cache_size_kib: Page cache size of each connection in KiB.
+        :param mmap_size: Bytes of the database file read through memory mapping.
+        """
+        self.db_name = db_name
+        self.busy_timeout = busy_timeout
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self._idle = queue.LifoQueue(maxsize=maxsize)
+        self._closed = False
+        self.connections_created = 0
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_name, timeout=self.busy_timeout,
+                                     check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA cache_size = {-int(self.cache_size_kib)}")
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        self.connections_created += 1
+        return connection
+
+    def get(self):
+        """
+        Take an idle connection, or open a new one if none is idle.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def put(self, connection):
+        """
+        Return a connection. It is closed instead if the pool is full or closed.
+        """
+        if self._closed:
+            connection.close()
+            return
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        """
+        Close every idle connection. Connections still in use are closed when returned.
+        """
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(db_name):
+    """
+    Return the connection pool of a database file, creating it on first use.
+    A forked child process starts with fresh pools instead of its parent's connections.
+    """
+    global _pools_pid  # pylint: disable=global-statement
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = _pools[db_name] = ConnectionPool(db_name)
+        return pool
+
+
+def close_pool(db_name):
+    """
+    Close and drop the pool of one database file, e.g. before the file is deleted.
+    The next get_pool call for the file starts a new pool.
+    """
+    with _pools_lock:
+        pool = _pools.pop(db_name, None) if _pools_pid == os.getpid() else None
+    if pool is not None:
+        pool.close()
+
+
+def close_all():
+    """
+    Close every pooled connection. Registered to run at interpreter exit.
+    """
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all)
+
 
 class DBCM:
     """
     Context manager for SQLite database connections.
     Returns a cursor for executing SQL commands.
     """
-    def __init__(self, db_name):
+    def __init__(self, db_name, pool=None):
         self.db_name = db_name
+        self.pool = pool
         self.connection = None
         self.cursor = None
 
     def __enter__(self):
-        self.connection = sqlite3.connect(self.db_name)
+        self.pool = self.pool or get_pool(self.db_name)
+        self.connection = self.pool.get()
         self.cursor = self.connection.cursor()
         return self.cursor
 
     def __exit__(self, exc_type, exc_value, traceback):
-        if exc_type is None:
-            self.connection.commit()
-        else:
-            print(f"Database error: {exc_value}")
         self.cursor.close()
-        self.connection.close()
+        try:
+            if exc_type is None:
+                self.connection.commit()
+            elif issubclass(exc_type, GeneratorExit):
+                # A generator reading through this cursor was closed early.
+                self.connection.rollback()
+            else:
+                print(f"Database error: {exc_value}")
+                self.connection.rollback()
+        except sqlite3.Error:
+            # Never pool a connection left in an unknown state.
+            self.connection.close()
+            raise
+        self.pool.put(self.connection)
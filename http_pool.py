@@ -0,0 +1,219 @@
+'''
+http_pool.py
+
+Description: A thread-safe pool of persistent (keep-alive) HTTP/HTTPS connections.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+'''
+
+import gzip
+import http.client
+import queue
+import ssl
+import threading
+import urllib.error
+import zlib
+from collections import namedtuple
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "User-Agent": "WeatherInsight/1.0",
+}
+
+PooledResponse = namedtuple("PooledResponse", ["status", "reason", "headers", "body"])
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Redirects followed per request before the redirect response itself is returned.
+MAX_REDIRECTS = 5
+
+# Errors raised when a kept-alive connection was closed by the server while idle.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+def decode_body(body, content_encoding):
+    '''
+    Decode a response body according to its Content-Encoding header.
+    :param body: Raw response bytes.
+    :param content_encoding: Value of the Content-Encoding header (may be None).
+    :return: Decoded bytes.
+    '''
+    encoding = (content_encoding or "").strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send a raw deflate stream without the zlib header.
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def redirect_url(url, response):
+    '''
+    Return the absolute URL a redirect response points to, or None if the response is
+    not a redirect or has no Location header.
+    '''
+    location = response.headers.get("Location") if response.status in REDIRECT_STATUSES else None
+    return urljoin(url, location) if location else None
+
+
+class HTTPConnectionPool:
+    '''
+    HTTPConnectionPool keeps idle connections per (scheme, host, port) and hands them
+    out to any thread that needs one. Connections are returned to the pool after the
+    response body has been read, so consecutive requests skip the TCP/TLS handshake.
+    '''
+    def __init__(self, maxsize=10, timeout=30, ssl_context=None):
+        '''
+        Initialize the HTTPConnectionPool class.
+        :param maxsize: Maximum number of idle connections kept per host.
+        :param timeout: Socket timeout in seconds for new connections.
+        :param ssl_context: Optional SSL context for HTTPS connections.
+        '''
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.requests_made = 0
+
+    def _get_queue(self, key):
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = queue.LifoQueue(self.maxsize)
+            return self._pools[key]
+
+    def _new_connection(self, scheme, host, port):
+        with self._lock:
+            self.connections_created += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout,
+                                               context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _checkout(self, key):
+        try:
+            return self._get_queue(key).get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(*key), False
+
+    def _checkin(self, key, connection):
+        try:
+            self._get_queue(key).put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, url, headers=None, method="GET"):
+        '''
+        Send a request over a pooled connection and read the whole response.
+        Redirects are followed up to MAX_REDIRECTS times; responses of any other
+        status are returned and only transport failures raise.
+
+        :param url: Absolute http:// or https:// URL.
+        :param headers: Optional extra request headers.
+        :param method: HTTP method (default: GET).
+        :return: PooledResponse with a decoded body.
+        :raises urllib.error.URLError: If the connection fails.
+        '''
+        for _ in range(MAX_REDIRECTS):
+            response = self._send(url, headers, method)
+            location = redirect_url(url, response)
+            if not location:
+                return response
+            url = location
+            if response.status == 303:
+                method = "GET"
+        return self._send(url, headers, method)
+
+    def _send(self, url, headers, method):
+        '''
+        Send one request and read its response, without following redirects.
+        '''
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        request_headers = dict(DEFAULT_HEADERS)
+        if headers:
+            request_headers.update(headers)
+
+        while True:
+            connection, reused = self._checkout(key)
+            try:
+                connection.request(method, path, headers=request_headers)
+                response = connection.getresponse()
+                body = response.read()
+            except STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if reused:
+                    # The server dropped an idle connection; retry on a fresh one.
+                    continue
+                raise urllib.error.URLError(e) from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise urllib.error.URLError(e) from e
+            break
+
+        with self._lock:
+            self.requests_made += 1
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(key, connection)
+        try:
+            body = decode_body(body, response.getheader("Content-Encoding"))
+        except (OSError, zlib.error, EOFError) as e:
+            raise ValueError(f"Could not decode response from {url}: {e}") from e
+        return PooledResponse(response.status, response.reason, response.headers, body)
+
+    def close(self):
+        '''
+        Close every idle connection held by the pool.
+        '''
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for idle in pools:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_pool():
+    '''
+    Return the process-wide HTTPConnectionPool, creating it on first use.
+    '''
+    with _shared_lock:
+        pool = _shared_pools.get("process")
+        if pool is None:
+            pool = _shared_pools["process"] = HTTPConnectionPool(maxsize=32)
+        return pool
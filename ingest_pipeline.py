@@ -0,0 +1,260 @@
+'''
+ingest_pipeline.py
+
+Description: Streams scraped month pages into the database while the scrape is running.
+Worker threads fetch and parse months, completed results go through a bounded queue,
+and a single writer thread hands them in batches to the database's shared DBWriter,
+which group-commits them with every other producer's writes.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.4
+'''
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date
+from db_writer import shared_writer
+from scrape_weather import BASE_URL, WeatherScraper, month_pages
+from thread_cal import calculate_thread_pool
+from adaptive_limiter import AdaptiveLimiter
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_SIZE = 64
+# Seconds between checks of the cancel event while waiting on fetches.
+CANCEL_POLL_INTERVAL = 0.2
+
+
+class BatchWriter(threading.Thread):
+    '''
+    BatchWriter owns all database writes of a pipeline run. It takes month results off
+    a bounded queue and saves them in batches through a DBWriter.
+    '''
+    def __init__(self, db_ops, location="Winnipeg", batch_size=DEFAULT_BATCH_SIZE,
+                 queue_size=DEFAULT_QUEUE_SIZE, db_writer=None):
+        '''
+        Initialize the BatchWriter class.
+        :param db_ops: DBOperations instance of the database; its write listeners are
+                       notified of every batch.
+        :param location: Location name for results queued without one.
+        :param batch_size: Number of rows committed per batch.
+        :param queue_size: Number of month results that may wait for the writer.
+        :param db_writer: DBWriter saving the batches. Default is the database's
+                          shared_writer().
+        '''
+        super().__init__(name="weather-batch-writer", daemon=True)
+        self.db_ops = db_ops
+        self.db_writer = db_writer or shared_writer(db_ops)
+        self.location = location
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.rows_written = 0
+        self.batches_committed = 0
+        self.error = None
+
+    def put(self, weather_data, location=None):
+        '''
+        Queue one month of weather data, blocking while the queue is full.
+        :param location: Location name stored with the rows. Default is the writer's.
+        '''
+        self.queue.put((location or self.location, weather_data))
+
+    def close(self):
+        '''
+        Flush the remaining rows and wait for the writer to finish.
+        :raises: The first error raised while writing, if any.
+        '''
+        self.queue.put(None)
+        self.join()
+        if self.error:
+            raise self.error
+
+    def _commit(self, batches):
+        if self.error is None:
+            try:
+                for location, batch in batches.items():
+                    self.db_writer.save_data(batch, location, db_ops=self.db_ops)
+                    self.rows_written += len(batch)
+                if batches:
+                    self.batches_committed += 1
+            except Exception as e:  # pylint: disable=broad-except
+                # Keep draining so producers never block on a dead writer.
+                self.error = e
+
+    def run(self):
+        batches = {}
+        pending_rows = 0
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            location, weather_data = item
+            batches.setdefault(location, {}).update(weather_data)
+            pending_rows += len(weather_data)
+            if pending_rows >= self.batch_size:
+                self._commit(batches)
+                batches = {}
+                pending_rows = 0
+        self._commit(batches)
+
+
+def interleave(*job_lists):
+    '''
+    Yield jobs round-robin from several lists, so every station gets its turn in the
+    shared worker pool instead of waiting for the stations ahead of it.
+    '''
+    iterators = [iter(jobs) for jobs in job_lists]
+    while iterators:
+        for iterator in list(iterators):
+            job = next(iterator, None)
+            if job is None:
+                iterators.remove(iterator)
+            else:
+                yield job
+
+
+def run_jobs(jobs, writer, max_threads, debug=False, pool=None, base_url=BASE_URL,
+             cache=None, limiter=None, progress=None, total=None, cancel_event=None):
+    '''
+    Fetch (station_id, location, year, month) jobs on a thread pool and hand each
+    result to the writer as it completes. At most 2 * max_threads jobs are queued
+    at once; the limiter decides how many requests are actually in flight.
+    :param progress: Optional callable run as progress(months_done, total, rows_written)
+                     each time a month is handed to the writer.
+    :param total: Number of jobs, reported to progress.
+    :param cancel_event: Optional threading.Event. Once set, no more jobs are started;
+                         months already fetching still finish and are written.
+    :return: Number of months fetched.
+    '''
+    def fetch(station_id, location, year, month):
+        scraper = WeatherScraper(debug=debug, pool=pool, base_url=base_url, cache=cache,
+                                 limiter=limiter)
+        scraper.fetch_and_parse(year, month, station_id)
+        return location, scraper.weather_data
+
+    jobs = iter(jobs)
+    months_fetched = 0
+    poll_interval = CANCEL_POLL_INTERVAL if cancel_event is not None else None
+    with ThreadPoolExecutor(max_threads) as executor:
+        pending = set()
+
+        def submit_next():
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            job = next(jobs, None)
+            if job:
+                pending.add(executor.submit(fetch, *job))
+
+        for _ in range(2 * max_threads):
+            submit_next()
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                pending = {future for future in pending if not future.cancel()}
+                if not pending:
+                    break
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                location, weather_data = future.result()
+                writer.put(weather_data, location)
+                months_fetched += 1
+                if progress:
+                    progress(months_fetched, total, writer.rows_written)
+                submit_next()
+    return months_fetched
+
+
+def _run_pipeline(jobs, db_ops, batch_size, queue_size, max_threads, limiter=None,
+                  progress=None, total=None, **fetch_options):
+    limiter = limiter or AdaptiveLimiter(max_limit=max_threads)
+    writer = BatchWriter(db_ops, batch_size=batch_size, queue_size=queue_size)
+    writer.start()
+    try:
+        months_fetched = run_jobs(jobs, writer, max_threads, limiter=limiter,
+                                  progress=progress, total=total, **fetch_options)
+    finally:
+        writer.close()
+    if progress:
+        # The last batch is committed by close(); report the final row count.
+        progress(months_fetched, total, writer.rows_written)
+    cancel_event = fetch_options.get("cancel_event")
+    return {
+        "months": months_fetched,
+        "rows": writer.rows_written,
+        "batches": writer.batches_committed,
+        "cancelled": cancel_event is not None and cancel_event.is_set(),
+        "concurrency": limiter.stats(),
+    }
+
+
+def stream_weather_data(start_year, end_year, station_id, db_ops, location="Winnipeg",
+                        batch_size=DEFAULT_BATCH_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                        debug=False, pool=None, base_url=BASE_URL, cache=None, months=None,
+                        max_threads=None, limiter=None, progress=None, cancel_event=None):
+    '''
+    Scrape weather data for a range of years and save it to the database as months
+    complete, instead of collecting the whole range in memory first.
+
+    :param db_ops: DBOperations instance to write through.
+    :param location: Location name stored with every row (default: Winnipeg)
+    :param batch_size: Number of rows committed per batch.
+    :param queue_size: Number of month results that may wait for the writer.
+    :param max_threads: Number of fetch threads. Default is calculate_thread_pool("io").
+    :param limiter: AdaptiveLimiter for requests in flight. Default is a new limiter
+                    capped at max_threads.
+    :param progress: Optional callable run as progress(months_done, months_total, rows)
+                     as months are written.
+    :param cancel_event: Optional threading.Event that stops the scrape once set.
+    :return: Dictionary with the number of months fetched, rows written, batches,
+             whether the run was cancelled and the limiter's stats.
+    '''
+    max_threads = max_threads or calculate_thread_pool(task_type="io")
+    if debug:
+        print(f"Using {max_threads} threads for streaming scrape.")
+    jobs = [(station_id, location, year, month)
+            for year, month in month_pages(start_year, end_year, months)]
+    return _run_pipeline(jobs, db_ops, batch_size, queue_size, max_threads, limiter=limiter,
+                         progress=progress, total=len(jobs), cancel_event=cancel_event,
+                         debug=debug, pool=pool, base_url=base_url, cache=cache)
+
+
+def scrape_stations(stations, db_ops, start_year=None, end_year=None, months=None,
+                    batch_size=DEFAULT_BATCH_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                    debug=False, pool=None, base_url=BASE_URL, cache=None, max_threads=None,
+                    limiter=None, progress=None, cancel_event=None):
+    '''
+    Scrape many stations on one shared worker pool and save their rows under each
+    station's location. Work is interleaved station by station for fairness.
+
+    :param stations: (station_id, location, first_year, last_year) tuples, e.g. from
+                     DBOperations.get_stations().
+    :param start_year: Optional first year; each station starts no earlier than its
+                       first_year.
+    :param end_year: Optional last year; each station ends no later than its last_year.
+                     Default is the current year.
+    :param months: Optional dictionary mapping station_id to the (year, month) pages to
+                   fetch; stations missing from it are skipped.
+    :param limiter: AdaptiveLimiter for requests in flight. Default is a new limiter
+                    capped at max_threads.
+    :param progress: Optional callable run as progress(months_done, months_total, rows)
+                     as months are written.
+    :param cancel_event: Optional threading.Event that stops the scrape once set.
+    :return: Dictionary with the number of months fetched, rows written, batches,
+             whether the run was cancelled and the limiter's stats.
+    '''
+    max_threads = max_threads or calculate_thread_pool(task_type="io")
+    end_year = end_year or date.today().year
+    job_lists = []
+    for station_id, location, first_year, last_year in stations:
+        if months is not None:
+            pages = months.get(station_id, [])
+        else:
+            pages = month_pages(max(first_year, start_year or first_year),
+                                min(last_year or end_year, end_year))
+        job_lists.append([(station_id, location, year, month) for year, month in pages])
+    if debug:
+        print(f"Scraping {len(job_lists)} stations on {max_threads} threads.")
+    return _run_pipeline(interleave(*job_lists), db_ops, batch_size, queue_size, max_threads,
+                         limiter=limiter, progress=progress,
+                         total=sum(len(jobs) for jobs in job_lists), cancel_event=cancel_event,
+                         debug=debug, pool=pool, base_url=base_url, cache=cache)
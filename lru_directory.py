@@ -0,0 +1,99 @@
+'''
+lru_directory.py
+
+Description: Size accounting and least recently used eviction for the on-disk caches.
+An entry is a file ending in the entry suffix, optionally with sidecar files sharing
+its base name; the entry file's modification time records when it was last used.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.0
+'''
+
+import os
+
+# Eviction stops below this share of max_bytes, so a full cache does not evict per put.
+EVICT_TARGET = 0.9
+
+
+class LRUDirectory:
+    '''
+    LRUDirectory tracks the bytes stored in a cache directory and deletes the least
+    recently used entries once it grows past max_bytes. It does no locking of its
+    own; the owning cache calls it under its lock.
+    '''
+    def __init__(self, directory, max_bytes, suffix, sidecars=()):
+        '''
+        Initialize the LRUDirectory class.
+        :param directory: Cache directory, created if it does not exist.
+        :param max_bytes: Size limit of the cache on disk.
+        :param suffix: File name suffix of an entry.
+        :param sidecars: Suffixes of the files deleted along with an entry.
+        '''
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.sidecars = tuple(sidecars)
+        os.makedirs(self.directory, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self.files())
+
+    def files(self):
+        '''
+        Return (path, size, mtime_ns) of every entry and sidecar file.
+        '''
+        suffixes = (self.suffix,) + self.sidecars
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(suffixes):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((path, stat.st_size, stat.st_mtime_ns))
+        return files
+
+    def added(self, size, keep=None):
+        '''
+        Account for bytes written to the directory, evicting if it is now over max_bytes.
+        :param size: Change in bytes on disk; negative if an entry shrank.
+        :param keep: Entry path never evicted, normally the entry just stored.
+        '''
+        self.total_bytes += size
+        if self.total_bytes > self.max_bytes:
+            self.evict(keep)
+
+    def evict(self, keep=None):
+        '''
+        Delete least recently used entries until the cache is back under max_bytes.
+        :param keep: Entry path never evicted.
+        '''
+        files = self.files()
+        self.total_bytes = sum(size for _, size, _ in files)
+        entries = sorted((f for f in files if f[0].endswith(self.suffix)), key=lambda f: f[2])
+        target = self.max_bytes * EVICT_TARGET
+        for entry_path, _, _ in entries:
+            if self.total_bytes <= target:
+                break
+            if entry_path == keep:
+                continue
+            base = entry_path[:-len(self.suffix)]
+            for path in [entry_path] + [base + sidecar for sidecar in self.sidecars]:
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    self.total_bytes -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        '''
+        Delete every entry and sidecar file.
+        '''
+        for path, _, _ in self.files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.total_bytes = 0
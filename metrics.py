@@ -0,0 +1,305 @@
+'''
+metrics.py
+
+Description: Lightweight instrumentation for the scrape, database and plot layers.
+Counters, timers and histograms are kept in one process-wide registry and exported as
+a Prometheus text file or a JSON summary. Recording is off by default; while it is off
+an instrumented call costs one flag check. Set WEATHER_METRICS_DIR to record a whole
+run and write metrics.prom and metrics.json there at exit.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+
+Usage:
+    WEATHER_METRICS_DIR=run_metrics python weather_processor.py
+'''
+
+import atexit
+import bisect
+import cProfile
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds of the timer histogram buckets; +Inf is implied.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+METRIC_PREFIX = "weatherinsight_"
+
+
+class Histogram:
+    '''
+    Histogram counts observations into fixed buckets and tracks their sum, min and max.
+    '''
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value):
+        '''
+        Add one observation.
+        '''
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def summary(self):
+        '''
+        Return count, sum, mean, min and max.
+        '''
+        if not self.count:
+            return {"count": 0, "sum": 0.0}
+        return {"count": self.count, "sum": self.sum, "mean": self.sum / self.count,
+                "min": self.min, "max": self.max}
+
+
+class Registry:
+    '''
+    Registry holds every counter and histogram of the process. All updates go through
+    one lock, so instrumented code may run on any thread.
+    '''
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1):
+        '''
+        Add value to a counter.
+        '''
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        '''
+        Record a value in a histogram.
+        '''
+        if self.enabled:
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram()
+                histogram.observe(value)
+
+    def reset(self):
+        '''
+        Drop every recorded value.
+        '''
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def summary(self):
+        '''
+        Return the recorded values as a JSON-serialisable dictionary.
+        '''
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: histogram.summary()
+                               for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def prometheus_text(self):
+        '''
+        Return the recorded values in the Prometheus text exposition format.
+        '''
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}{name}"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{METRIC_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines += [f"{metric}_sum {histogram.sum}", f"{metric}_count {histogram.count}"]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def enable():
+    '''
+    Start recording metrics.
+    '''
+    REGISTRY.enabled = True
+
+
+def disable():
+    '''
+    Stop recording metrics. Values recorded so far are kept.
+    '''
+    REGISTRY.enabled = False
+
+
+def increment(name, value=1):
+    '''
+    Add value to a counter, if recording.
+    '''
+    if REGISTRY.enabled:
+        REGISTRY.increment(name, value)
+
+
+def observe(name, value):
+    '''
+    Record a value in a histogram, if recording.
+    '''
+    if REGISTRY.enabled:
+        REGISTRY.observe(name, value)
+
+
+@contextmanager
+def timer(name):
+    '''
+    Time the enclosed block into the histogram name, if recording.
+    '''
+    if not REGISTRY.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - start)
+
+
+def _timed_generator(name, generator, start):
+    '''
+    Yield from generator and record the time from start until it is exhausted or closed.
+    '''
+    try:
+        return (yield from generator)
+    except Exception:
+        REGISTRY.increment(f"{name}_errors")
+        raise
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - start)
+
+
+def timed(name):
+    '''
+    Decorator timing every call of a function into the histogram name and counting
+    the calls that raise in name_errors. A call that returns a generator, from a
+    generator function or not, is timed until the generator is exhausted or closed.
+    '''
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                REGISTRY.increment(f"{name}_errors")
+                REGISTRY.observe(name, time.perf_counter() - start)
+                raise
+            if inspect.isgenerator(result):
+                # The work happens while the caller iterates, so time that too.
+                return _timed_generator(name, result, start)
+            REGISTRY.observe(name, time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_methods(prefix):
+    '''
+    Class decorator applying timed() to every public method defined on the class,
+    as the histogram "<prefix>_<method>_seconds".
+    '''
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith("_") and inspect.isfunction(value):
+                setattr(cls, attr, timed(f"{prefix}_{attr}_seconds")(value))
+        return cls
+    return decorator
+
+
+def summary():
+    '''
+    Return the recorded metrics as a dictionary of counters and histogram summaries.
+    '''
+    return REGISTRY.summary()
+
+
+def reset():
+    '''
+    Drop every recorded value.
+    '''
+    REGISTRY.reset()
+
+
+def write_prometheus(path):
+    '''
+    Write the recorded metrics as a Prometheus text file, e.g. for the node exporter's
+    textfile collector.
+    '''
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.prometheus_text())
+    os.replace(temp_path, path)
+
+
+def write_json(path):
+    '''
+    Write the recorded metrics as a JSON summary.
+    '''
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary(), f, indent=2)
+
+
+def write_reports(directory):
+    '''
+    Write metrics.prom and metrics.json to a directory.
+    '''
+    os.makedirs(directory, exist_ok=True)
+    write_prometheus(os.path.join(directory, "metrics.prom"))
+    write_json(os.path.join(directory, "metrics.json"))
+
+
+@contextmanager
+def profile(path):
+    '''
+    Capture a cProfile of the enclosed block and write it to path, for
+    python -m pstats or snakeviz.
+
+    Example:
+        with metrics.profile("update.prof"):
+            processor.update_data()
+    '''
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def _enable_from_environment():
+    directory = os.getenv("WEATHER_METRICS_DIR")
+    if directory:
+        enable()
+        atexit.register(write_reports, directory)
+
+
+_enable_from_environment()
@@ -0,0 +1,112 @@
+'''
+plot_cache.py
+
+Description: An on-disk cache of rendered plot images. Each image is stored under a
+content address: the SHA-256 of its plot type, parameters, location and the database
+data version. Any write to the weather table bumps the data version, so stale images
+are never looked up again and age out through least recently used eviction.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+'''
+
+import hashlib
+import json
+import os
+import threading
+import time
+from lru_directory import LRUDirectory
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+IMAGE_SUFFIX = ".png"
+
+
+def default_cache_dir():
+    '''
+    Return the plot cache directory in the local application data folder.
+    '''
+    return os.path.join(os.getenv("LOCALAPPDATA", os.getcwd()), "plot_cache")
+
+
+def plot_key(plot_type, params, location, data_version):
+    '''
+    Return the content address of a plot.
+
+    :param plot_type: Plot type, e.g. "box" or "line".
+    :param params: JSON-serialisable dictionary of the plot parameters.
+    :param location: Location name the plot is drawn for.
+    :param data_version: DBOperations.get_data_version() when the plot is drawn.
+    :return: Hexadecimal SHA-256 digest.
+    '''
+    identity = json.dumps([plot_type, params, location, data_version], sort_keys=True,
+                          separators=(",", ":"))
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class PlotCache:
+    '''
+    PlotCache stores each rendered plot as one image file named after its key. The
+    least recently used images are evicted once the cache grows past max_bytes.
+    '''
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        '''
+        Initialize the PlotCache class.
+        :param directory: Cache directory. Default is default_cache_dir().
+        :param max_bytes: Size limit of the cache on disk.
+        '''
+        self.directory = directory or default_cache_dir()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._store = LRUDirectory(self.directory, max_bytes, IMAGE_SUFFIX)
+
+    @property
+    def total_bytes(self):
+        '''
+        Bytes of images currently on disk.
+        '''
+        return self._store.total_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{IMAGE_SUFFIX}")
+
+    def get(self, key):
+        '''
+        Return the path of a cached image, or None if it is not cached.
+        '''
+        path = self._path(key)
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key, image):
+        '''
+        Store a rendered image.
+        :param key: Key from plot_key().
+        :param image: Image file contents.
+        :return: Path of the cached image.
+        '''
+        path = self._path(key)
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(image)
+            os.replace(temp_path, path)
+            self._store.added(len(image) - previous, keep=path)
+        return path
+
+    def clear(self):
+        '''
+        Delete every cached image.
+        '''
+        with self._lock:
+            self._store.clear()
@@ -4,12 +4,35 @@ plot_operations.py
 Description: Handles all plotting operations for the weather application.
 Author: Phillip Bridgeman
 Date: November 17, 2024
-Last Modified: December 1, 2024
-Version: 1.2
+Last Modified: October 17, 2026
+Version: 1.8
 Copyright: (c) 2024 Phillip Bridgeman
 '''
 from collections import defaultdict
+from operator import itemgetter
+import numpy as np
 import matplotlib.pyplot as plt
+import metrics
+
+def label_numbers(labels):
+    '''
+    Convert zero-padded number labels ('01', '12', ...) to integers in one pass.
+    :raises ValueError: If a label is not a non-negative integer.
+    '''
+    labels = np.asarray(labels)
+    if labels.dtype.kind != "U":
+        return labels.astype(np.int64)
+    # Each character is a UCS-4 code point; unused trailing slots are 0.
+    chars = np.ascontiguousarray(labels).view(np.uint32).reshape(len(labels), -1)
+    numbers = np.zeros(len(labels), dtype=np.int64)
+    for column in chars.T:
+        used = column != 0
+        digits = column.astype(np.int64) - ord("0")
+        if (used & ((digits < 0) | (digits > 9))).any():
+            raise ValueError("Labels must be non-negative integers.")
+        numbers = np.where(used, numbers * 10 + digits, numbers)
+    return numbers
+
 
 class PlotOperations:
     '''
@@ -34,6 +57,79 @@ class PlotOperations:
             data[month].append(record[1])  # Add mean temp to the respective month
         return data
 
+    def rows_to_arrays(self, raw_data):
+        """
+        Converts (label, mean_temp) records to arrays in one pass.
+        :param raw_data: List of tuples (e.g., [('01', -7.9), ('02', -7.1), ...])
+        :return: Two arrays: integer labels (months or days) and float mean temperatures,
+                 with NaN where a temperature is missing.
+        """
+        if not raw_data:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return (label_numbers(list(map(itemgetter(0), raw_data))),
+                np.array(list(map(itemgetter(1), raw_data)), dtype=np.float64))
+
+    def prepare_boxplot_arrays(self, months, temps):
+        """
+        Groups mean temperatures by month with one sort instead of a per-record loop.
+        :param months: Array of months (1-12).
+        :param temps: Array of mean temperatures; NaN values are dropped.
+        :return: Dictionary where keys are months and values are sorted temperature arrays.
+        """
+        months = np.asarray(months, dtype=np.int64)
+        temps = np.asarray(temps, dtype=np.float64)
+        present = ~np.isnan(temps)
+        months, temps = months[present], temps[present]
+        order = np.lexsort((temps, months))
+        months, temps = months[order], temps[order]
+        starts = np.flatnonzero(np.diff(months)) + 1
+        return {int(group[0]): values
+                for group, values in zip(np.split(months, starts), np.split(temps, starts))
+                if len(group)}
+
+    def prepare_summary_arrays(self, summaries):
+        """
+        Prepares box plot arrays from precomputed monthly summaries.
+        :param summaries: List of (year, month, count, sum, min, max, sorted means) tuples,
+                          as returned by DBOperations.fetch_monthly_stats.
+        :return: Dictionary where keys are months and values are sorted temperature arrays.
+        """
+        by_month = defaultdict(list)
+        for summary in summaries:
+            by_month[summary[1]].append(summary[6])
+        # A single year's means are already sorted. Several years are joined with one
+        # vectorised sort, which is faster here than merging the sorted runs in Python.
+        return {month: np.asarray(means[0], dtype=np.float64) if len(means) == 1
+                else np.sort(np.concatenate(means))
+                for month, means in by_month.items()}
+
+    def boxplot_stats(self, sorted_temps, label="", whis=1.5):
+        """
+        Computes the statistics matplotlib's bxp draws, as cbook.boxplot_stats would.
+        :param sorted_temps: Sorted array of temperatures for one box.
+        :param label: Tick label of the box.
+        :param whis: Whisker reach as a multiple of the interquartile range.
+        :return: Dictionary with med, q1, q3, whislo, whishi, fliers, mean and label.
+        """
+        q1, med, q3 = np.percentile(sorted_temps, [25, 50, 75])
+        iqr = q3 - q1
+        # Whiskers end at the furthest data points within whis * IQR of the box.
+        low = sorted_temps[np.searchsorted(sorted_temps, q1 - whis * iqr, side="left")]
+        high = sorted_temps[np.searchsorted(sorted_temps, q3 + whis * iqr, side="right") - 1]
+        whislo, whishi = min(low, q1), max(high, q3)
+        return {
+            "label": label,
+            "mean": float(np.mean(sorted_temps)),
+            "med": med,
+            "q1": q1,
+            "q3": q3,
+            "iqr": iqr,
+            "whislo": whislo,
+            "whishi": whishi,
+            "fliers": np.concatenate((sorted_temps[sorted_temps < whislo],
+                                      sorted_temps[sorted_temps > whishi])),
+        }
+
     def prepare_lineplot_data(self, raw_data):
         """
         Prepares data for a line plot from the raw database records.
@@ -44,41 +140,99 @@ class PlotOperations:
         temps = [record[1] for record in raw_data]
         return days, temps
 
-    def generate_boxplot(self, raw_data, year_range):
+    @metrics.timed("plot_draw_boxplot_seconds")
+    def draw_boxplot(self, ax, month_data, year_range, location=None):
         """
-        Generate a boxplot for mean temperatures grouped by month.
+        Draw a monthly box plot on the given axes.
 
-        :param raw_data: List of tuples fetched from the database (month, mean_temp).
+        :param ax: Matplotlib axes to draw on.
+        :param month_data: Dictionary of month -> sorted temperature array.
         :param year_range: Tuple indicating the start and end years.
+        :param location: Optional location name added to the title.
         """
-        # Prepare data using helper method
-        month_data = self.prepare_boxplot_data(raw_data)
+        stats = [self.boxplot_stats(month_data[month], label=str(month))
+                 for month in sorted(month_data)]
+        if stats:
+            ax.bxp(stats)
+        title = f"Monthly Temperature Distribution for {year_range[0]} to {year_range[1]}"
+        ax.set_title(f"{title} ({location})" if location else title)
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Mean Temperature (°C)")
+        ax.grid(self.grid)
 
-        # Convert dictionary values to lists for plotting
-        sorted_months = sorted(month_data.keys())  # Ensure months are in order
-        plot_data = [month_data[month] for month in sorted_months]
+    @metrics.timed("plot_draw_lineplot_seconds")
+    def draw_lineplot(self, ax, days, temps, year, month, location=None):
+        """
+        Draw a daily line plot on the given axes.
 
-        # Plot the data
-        plt.figure(figsize=(10, 6))
-        plt.boxplot(plot_data, labels=[str(month) for month in sorted_months])
-        plt.title(f"Monthly Temperature Distribution for {year_range[0]} to {year_range[1]}")
-        plt.xlabel("Month")
-        plt.ylabel("Mean Temperature (°C)")
-        plt.grid(True)
-        plt.show()
+        :param ax: Matplotlib axes to draw on.
+        :param days: Days of the month.
+        :param temps: Daily mean temperatures.
+        :param year: Year of the data.
+        :param month: Month of the data (1-12).
+        :param location: Optional location name added to the title.
+        """
+        ax.plot(days, temps, marker='o', linestyle='-')
+        title = f"Daily Mean Temperatures for {year}-{month:02d}"
+        ax.set_title(f"{title} ({location})" if location else title)
+        ax.set_xlabel("Day")
+        ax.set_ylabel("Temperature (°C)")
+        ax.grid(self.grid)
 
-    def generate_lineplot(self, raw_data, year, month):
+    @metrics.timed("plot_generate_boxplot_seconds")
+    def generate_boxplot(self, raw_data, year_range, summaries=None, save_to=None):
+        """
+        Generate a boxplot for mean temperatures grouped by month.
+
+        :param raw_data: List of tuples fetched from the database (month, mean_temp).
+                         Ignored when summaries are given.
+        :param year_range: Tuple indicating the start and end years.
+        :param summaries: Optional monthly summaries from DBOperations.fetch_monthly_stats.
+        :param save_to: Optional path or file object the figure is saved to as PNG
+                        before it is shown.
+        """
+        # Prepare sorted arrays per month; draw_boxplot computes the box statistics
+        if summaries is not None:
+            month_data = self.prepare_summary_arrays(summaries)
+        else:
+            month_data = self.prepare_boxplot_arrays(*self.rows_to_arrays(raw_data))
+        _, ax = plt.subplots(figsize=self.figsize)
+        self.draw_boxplot(ax, month_data, year_range)
+        self.show_figure(save_to)
+
+    @metrics.timed("plot_generate_lineplot_seconds")
+    def generate_lineplot(self, raw_data, year, month, save_to=None):
         """
         Generates a line plot for daily mean temperatures in a specific month and year.
         :param raw_data: List of tuples (e.g., [(1, -7.9), (2, -7.1), ...]).
         :param year: Year of the data.
         :param month: Month of the data (1-12).
+        :param save_to: Optional path or file object the figure is saved to as PNG
+                        before it is shown.
+        """
+        days, temps = self.rows_to_arrays(raw_data)
+        _, ax = plt.subplots(figsize=self.figsize)
+        self.draw_lineplot(ax, days, temps, year, month)
+        self.show_figure(save_to)
+
+    @staticmethod
+    def show_figure(save_to=None):
+        """
+        Show the current figure, saving it as PNG first if save_to is given.
+        """
+        if save_to is not None:
+            plt.savefig(save_to, format="png")
+        plt.show()
+
+    @metrics.timed("plot_show_image_seconds")
+    def show_image(self, path):
+        """
+        Show a previously rendered plot image in a figure window without redrawing it.
+        :param path: Path of a PNG file, e.g. from PlotCache.get.
         """
-        days, temps = self.prepare_lineplot_data(raw_data)
-        plt.figure(figsize=(10, 6))
-        plt.plot(days, temps, marker='o', linestyle='-')
-        plt.title(f"Daily Mean Temperatures for {year}-{month:02d}")
-        plt.xlabel("Day")
-        plt.ylabel("Temperature (°C)")
-        plt.grid(True)
+        image = plt.imread(path)
+        fig = plt.figure(figsize=self.figsize)
+        ax = fig.add_axes((0, 0, 1, 1))
+        ax.imshow(image)
+        ax.set_axis_off()
         plt.show()
@@ -0,0 +1,333 @@
+'''
+query_service.py
+
+Description: Headless query service. Serves the raw, box plot and line plot queries of
+DBOperations over a local HTTP/JSON API so dashboards and other tools can read the
+weather data without the GUI or direct access to the SQLite file. Requests are served
+on threads that share the database's connection pool; small results are cached in
+process until the data version changes, and raw rows are streamed in chunks.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+
+Usage: python query_service.py --port 8080 --db weather_data.db
+
+Endpoints:
+    GET /stations
+    GET /raw?location=Winnipeg&start_year=2020&end_year=2024
+    GET /boxplot?location=Winnipeg&start_year=2020&end_year=2024
+    GET /lineplot?location=Winnipeg&year=2024&month=1
+'''
+
+import argparse
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from db_operations import DBOperations
+from plot_operations import PlotOperations
+
+DEFAULT_PORT = 8080
+# Cached responses kept in memory.
+DEFAULT_CACHE_ENTRIES = 256
+# Rows per chunk of a streamed /raw response.
+STREAM_BATCH_SIZE = 5000
+
+
+class ResultCache:
+    '''
+    ResultCache keeps encoded responses for the current data version, dropping the
+    least recently used beyond max_entries. A new data version empties it.
+    '''
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        '''
+        Initialize the ResultCache class.
+        :param max_entries: Number of responses kept.
+        '''
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        '''
+        Return the cached response body for key at the given data version, or None.
+        '''
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, version, body):
+        '''
+        Store a response body computed at the given data version.
+        '''
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def int_param(params, name, default=None):
+    '''
+    Read an integer query parameter.
+    :raises ValueError: If it is missing without a default, or not an integer.
+    '''
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise ValueError(f"Missing parameter: {name}")
+        return default
+    try:
+        return int(values[0])
+    except ValueError as e:
+        raise ValueError(f"Parameter {name} must be an integer.") from e
+
+
+def boxplot_summary(plot_ops, summaries):
+    '''
+    Turn monthly summaries into one box per month, with the statistics the GUI draws.
+    '''
+    months = []
+    for month, temps in sorted(plot_ops.prepare_summary_arrays(summaries).items()):
+        if temps.size == 0:
+            continue
+        stats = plot_ops.boxplot_stats(temps)
+        months.append({
+            "month": month,
+            "count": len(temps),
+            "min": float(temps[0]),
+            "max": float(temps[-1]),
+            **{key: float(stats[key]) for key in ("mean", "med", "q1", "q3", "whislo",
+                                                   "whishi")},
+            "fliers": stats["fliers"].tolist(),
+        })
+    return months
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    '''
+    Request handler of the query service.
+    '''
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        '''
+        Route a GET request to its query.
+        '''
+        parts = urlsplit(self.path)
+        params = parse_qs(parts.query)
+        routes = {
+            "/stations": self.stations,
+            "/boxplot": self.boxplot,
+            "/lineplot": self.lineplot,
+        }
+        try:
+            if parts.path == "/raw":
+                self.stream_raw(params)
+            elif parts.path in routes:
+                self.cached(parts.path, params, routes[parts.path])
+            else:
+                self.send_json(404, {"error": f"Unknown endpoint: {parts.path}"})
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+        except sqlite3.Error as e:
+            self.send_json(500, {"error": f"Database error: {e}"})
+
+    def cached(self, path, params, query):
+        '''
+        Answer a small query from the result cache, computing it on a miss.
+        '''
+        service = self.server
+        version = service.db_ops.get_data_version()
+        key = (path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        body = service.cache.get(key, version)
+        if body is None:
+            body = json.dumps(query(params)).encode("utf-8")
+            service.cache.put(key, version, body)
+        self.send_body(200, body, {"X-Data-Version": str(version)})
+
+    def stations(self, params):  # pylint: disable=unused-argument
+        '''
+        List the registered stations.
+        '''
+        return [{"station_id": station_id, "location": location, "first_year": first_year,
+                 "last_year": last_year}
+                for station_id, location, first_year, last_year
+                in self.server.db_ops.get_stations()]
+
+    def boxplot(self, params):
+        '''
+        Monthly box statistics of daily mean temperatures over a year range.
+        '''
+        location = params.get("location", ["Winnipeg"])[0]
+        year_range = (int_param(params, "start_year"), int_param(params, "end_year"))
+        summaries = self.server.db_ops.fetch_monthly_stats(year_range, location=location)
+        return {"location": location, "year_range": list(year_range),
+                "months": boxplot_summary(self.server.plot_ops, summaries)}
+
+    def lineplot(self, params):
+        '''
+        Daily mean temperatures of one month.
+        '''
+        location = params.get("location", ["Winnipeg"])[0]
+        year, month = int_param(params, "year"), int_param(params, "month")
+        if not 1 <= month <= 12:
+            raise ValueError("Parameter month must be between 1 and 12.")
+        # iter_data lets database errors through to do_GET, so they are not cached.
+        rows = list(self.server.db_ops.iter_data(filter_type="lineplot", year=year,
+                                                 month=month, location=location))
+        return {"location": location, "year": year, "month": month,
+                "days": [int(day) for day, _ in rows], "mean": [temp for _, temp in rows]}
+
+    def stream_raw(self, params):
+        '''
+        Stream weather rows as a JSON array, one chunk per batch read from SQLite.
+        '''
+        locations = params.get("location")
+        year_range = None
+        if "start_year" in params or "end_year" in params:
+            year_range = (int_param(params, "start_year", 1), int_param(params, "end_year", 9999))
+        rows = self.server.db_ops.iter_rows(locations=locations, year_range=year_range,
+                                            arraysize=STREAM_BATCH_SIZE, batches=True)
+        # Run the query before the headers go out, so its errors still get a clean
+        # error response from do_GET.
+        batch = next(rows, None)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        separator = "["
+        try:
+            while batch is not None:
+                chunk = separator + ",".join(json.dumps(
+                    {"id": row_id, "sample_date": sample_date, "location": location,
+                     "min_temp": low, "max_temp": high, "avg_temp": mean})
+                    for row_id, sample_date, location, low, high, mean in batch)
+                separator = ","
+                self.write_chunk(chunk.encode("utf-8"))
+                batch = next(rows, None)
+            self.write_chunk(b"[]" if separator == "[" else b"]")
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; stop reading and drop the connection.
+            self.close_connection = True
+        except sqlite3.Error as e:
+            # The 200 status is already sent; end the connection mid-body so the client
+            # sees a truncated response instead of a second status line.
+            self.log_error("Streaming /raw failed: %s", e)
+            self.close_connection = True
+        finally:
+            rows.close()
+
+    def write_chunk(self, data):
+        '''
+        Write one chunk of a chunked response; an empty chunk ends the response.
+        '''
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def send_json(self, status, payload):
+        '''
+        Send a JSON response.
+        '''
+        self.send_body(status, json.dumps(payload).encode("utf-8"))
+
+    def send_body(self, status, body, headers=None):
+        '''
+        Send a complete JSON response body.
+        '''
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        '''Log requests only in debug mode.'''
+        if self.server.debug:
+            super().log_message(format, *args)
+
+
+class QueryService(ThreadingHTTPServer):
+    '''
+    Threaded HTTP server holding the shared DBOperations, plotting helpers and cache.
+    '''
+    daemon_threads = True
+
+    def __init__(self, address, db_ops, cache_entries=DEFAULT_CACHE_ENTRIES, debug=False):
+        '''
+        Initialize the QueryService class.
+        :param address: (host, port) to listen on; port 0 picks a free port.
+        :param db_ops: DBOperations instance all requests read through.
+        :param cache_entries: Number of responses kept in the result cache.
+        :param debug: If True, log every request.
+        '''
+        super().__init__(address, QueryHandler)
+        self.db_ops = db_ops
+        self.plot_ops = PlotOperations()
+        self.cache = ResultCache(cache_entries)
+        self.debug = debug
+
+    @property
+    def base_url(self):
+        '''URL of the service root.'''
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_query_service(db_ops, host="127.0.0.1", port=0, **options):
+    '''
+    Start a QueryService on a background thread.
+    :return: The running service; call shutdown() and server_close() when done.
+    '''
+    service = QueryService((host, port), db_ops, **options)
+    threading.Thread(target=service.serve_forever, daemon=True).start()
+    return service
+
+
+def main():
+    '''
+    Command line entry point.
+    '''
+    parser = argparse.ArgumentParser(description="Serve weather queries over HTTP/JSON.")
+    parser.add_argument("--db", default="weather_data.db", help="Database file name.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument("--cache-entries", type=int, default=DEFAULT_CACHE_ENTRIES,
+                        help="Responses kept in the result cache.")
+    parser.add_argument("--debug", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+
+    db_ops = DBOperations(args.db)
+    db_ops.initialize_db()
+    service = QueryService((args.host, args.port), db_ops, cache_entries=args.cache_entries,
+                           debug=args.debug)
+    print(f"Serving weather queries on {service.base_url}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+'''
+response_cache.py
+
+Description: An on-disk cache of daily data pages keyed by (station_id, year, month).
+Closed months are served from disk without a request once their page was stored after
+the month was final; the current and previous months, and pages stored while their
+month was still open, are revalidated with ETag/Last-Modified conditional requests.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+'''
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from lru_directory import LRUDirectory
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Days after a month ends during which its page may still be revised.
+FINAL_GRACE_DAYS = 31
+PAGE_SUFFIX = ".html.gz"
+META_SUFFIX = ".json"
+
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "last_modified", "stored_at"])
+
+
+def default_cache_dir():
+    '''
+    Return the cache directory next to the database in the local application data folder.
+    '''
+    return os.path.join(os.getenv("LOCALAPPDATA", os.getcwd()), "weather_cache")
+
+
+class ResponseCache:
+    '''
+    ResponseCache stores each month page as a gzip file with a JSON sidecar holding
+    its validators. The least recently used pages are evicted once the cache grows
+    past max_bytes.
+    '''
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, today=None):
+        '''
+        Initialize the ResponseCache class.
+        :param directory: Cache directory. Default is default_cache_dir().
+        :param max_bytes: Size limit of the cache on disk.
+        :param today: Callable returning today's date, for testing. Default is date.today.
+        '''
+        self.directory = directory or default_cache_dir()
+        self.today = today or date.today
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._store = LRUDirectory(self.directory, max_bytes, PAGE_SUFFIX, (META_SUFFIX,))
+
+    @property
+    def total_bytes(self):
+        '''
+        Bytes of pages and sidecars currently on disk.
+        '''
+        return self._store.total_bytes
+
+    def _paths(self, station_id, year, month):
+        base = os.path.join(self.directory, f"{station_id}-{year:04d}-{month:02d}")
+        return f"{base}{PAGE_SUFFIX}", f"{base}{META_SUFFIX}"
+
+    def is_closed(self, year, month):
+        '''
+        Return True if the month ended before the previous month, so its page is final.
+        '''
+        today = self.today()
+        previous = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+        return (year, month) < previous
+
+    def is_final(self, entry, year, month):
+        '''
+        Return True if a cached page can be served without a request: its month is
+        closed and the page was stored at least FINAL_GRACE_DAYS after the month ended.
+        A page stored while the month was open may hold provisional data.
+        '''
+        if not self.is_closed(year, month):
+            return False
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        final_at = datetime.combine(next_month, datetime.min.time()) \
+            + timedelta(days=FINAL_GRACE_DAYS)
+        return entry.stored_at >= final_at.timestamp()
+
+    def get(self, station_id, year, month):
+        '''
+        Return the cached page for a month, or None if it is not cached.
+        '''
+        body_path, meta_path = self._paths(station_id, year, month)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = gzip.decompress(f.read()).decode("utf-8")
+            now = time.time()
+            os.utime(body_path, (now, now))
+        except (OSError, ValueError, EOFError):
+            return None
+        return CacheEntry(body, meta.get("etag"), meta.get("last_modified"), meta["stored_at"])
+
+    def touch(self, station_id, year, month):
+        '''
+        Record that a cached page was confirmed unchanged now, after a 304 Not Modified.
+        '''
+        _, meta_path = self._paths(station_id, year, month)
+        with self._lock:
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                meta["stored_at"] = time.time()
+                temp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                os.replace(temp_path, meta_path)
+            except (OSError, ValueError):
+                pass
+
+    def put(self, station_id, year, month, body, headers=None):
+        '''
+        Store a month page and its ETag/Last-Modified validators.
+        :param body: Decoded page text.
+        :param headers: Response headers the page was served with.
+        '''
+        headers = headers or {}
+        body_path, meta_path = self._paths(station_id, year, month)
+        data = gzip.compress(body.encode("utf-8"))
+        meta = json.dumps({
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        })
+        with self._lock:
+            previous = sum(os.path.getsize(p) for p in (body_path, meta_path)
+                           if os.path.exists(p))
+            for path, content in ((body_path, data), (meta_path, meta.encode("utf-8"))):
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+            self._store.added(len(data) + len(meta.encode("utf-8")) - previous, keep=body_path)
+
+    @staticmethod
+    def conditional_headers(entry):
+        '''
+        Build If-None-Match/If-Modified-Since headers to revalidate a cached page.
+        '''
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def record(self, outcome):
+        '''
+        Count a lookup outcome: "hit", "revalidated" or "miss".
+        '''
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        '''
+        Delete every cached page.
+        '''
+        with self._lock:
+            self._store.clear()
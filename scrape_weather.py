@@ -4,26 +4,99 @@ scrape_weather.py
 Description: A script to scrape weather data from the Government of Canada website.
 Author: Phillip Bridgeman
 Date: October 30, 2024
-Last Modified: November 22, 2024
-Version: 1.11
+Last Modified: October 17, 2026
+Version: 1.18
 '''
 
+import asyncio
+import html
+import re
 from html.parser import HTMLParser
-import urllib.request
+import time
+import urllib.error
 import json
 from concurrent.futures import ThreadPoolExecutor
 from thread_cal import calculate_thread_pool
+from http_pool import get_shared_pool
+import metrics
+from adaptive_limiter import AdaptiveLimiter, THROTTLE_STATUSES
+
+BASE_URL = "https://climate.weather.gc.ca/climate_data/daily_data_e.html"
+THROTTLE_RETRIES = 3
+
+# Used by the fast path in WeatherScraper.parse_page to find and tokenize <tbody> regions.
+TBODY_START_RE = re.compile(r"<tbody(?:[\s/][^>]*)?>", re.IGNORECASE)
+TBODY_END_RE = re.compile(r"</tbody\s*>", re.IGNORECASE)
+TAG_RE = re.compile(r"<(/?)([a-zA-Z][^\t\n\r\f />\x00]*)[^>]*>")
+# Openers of markup whose content HTMLParser does not parse as tags, and the
+# terminators HTMLParser looks for.
+HIDDEN_START_RE = re.compile(r"<!--|<!\[|<(script|style)(?=[\s/>])", re.IGNORECASE)
+COMMENT_END_RE = re.compile(r"--\s*>")
+MARKED_SECTION_END_RE = re.compile(r"\]\s*\]\s*>")
+
+
+def hides_tbody(content):
+    '''
+    Return True if a comment, <![CDATA[ section, script or style block could hide a
+    <tbody> from HTMLParser, or is left open so the rest of the page is hidden.
+    '''
+    position = 0
+    while True:
+        start = HIDDEN_START_RE.search(content, position)
+        if not start:
+            return False
+        if start.group(1):
+            end_re = re.compile(rf"</\s*{start.group(1)}\s*>", re.IGNORECASE)
+        elif start.group() == "<!--":
+            end_re = COMMENT_END_RE
+        else:
+            end_re = MARKED_SECTION_END_RE
+        end = end_re.search(content, start.end())
+        if not end or "tbody" in content[start.end():end.start()].lower():
+            return True
+        position = end.end()
+
+
+def build_url(base_url, station_id, year, month):
+    '''
+    Build the daily data page URL for one station and month.
+    '''
+    return (
+        f"{base_url}?"
+        f"StationID={station_id}&timeframe=2&StartYear=1840&EndYear=2020&Day=1"
+        f"&Year={year}&Month={month}"
+    )
+
+
+def month_pages(start_year, end_year, months=None):
+    '''
+    Return the (year, month) pages to fetch: months if given, otherwise every month
+    from start_year to end_year.
+    '''
+    if months is not None:
+        return list(months)
+    return [(year, month) for year in range(start_year, end_year + 1) for month in range(1, 13)]
+
 
 class WeatherScraper(HTMLParser):
     '''
     WeatherScraper class to scrape weather data from the Government of Canada website.
     '''
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, pool=None, base_url=BASE_URL, cache=None, fast_parse=True,
+                 limiter=None):
         '''
         Initialize the WeatherScraper class.
         :param debug: If True, print debug information. Default is False.
+        :param pool: HTTPConnectionPool to fetch pages with. Default is the shared pool.
+        :param base_url: Daily data page URL. Default is the Government of Canada site.
+        :param cache: Optional ResponseCache checked before fetching a page.
+        :param fast_parse: If True, extract the <tbody> rows directly when possible.
+        :param limiter: Optional AdaptiveLimiter gating requests in flight.
         '''
         super().__init__()
+        self.pool = pool or get_shared_pool()
+        self.base_url = base_url
+        self.cache = cache
         self.current_year = None
         self.current_month = None
         self.current_date = None
@@ -31,6 +104,9 @@ class WeatherScraper(HTMLParser):
         self.weather_data = {}
         self.in_tbody = False
         self.debug = debug
+        self.fast_parse = fast_parse
+        self.limiter = limiter
+        self.error = None
 
     def handle_starttag(self, tag, attrs):
         '''
@@ -76,49 +152,210 @@ class WeatherScraper(HTMLParser):
             if self.debug:
                 print(f"Error parsing data: {e}")
 
-    def fetch_and_parse(self, year, month, station_id):
+    @metrics.timed("scraper_parse_seconds")
+    def parse_page(self, content, year, month):
         '''
-        Fetch and parse the weather data for a given year and month.
+        Parse an already downloaded daily data page for the given year and month.
+        The <tbody> rows are extracted directly when the page has the expected layout;
+        otherwise the whole page goes through HTMLParser.
         '''
         self.current_year = year
         self.current_month = month
-        url = (
-            f"https://climate.weather.gc.ca/climate_data/daily_data_e.html?"
-            f"StationID={station_id}&timeframe=2&StartYear=1840&EndYear=2020&Day=1"
-            f"&Year={year}&Month={month}"
-        )
+        if not (self.fast_parse and self.parse_tbody(content)):
+            self.feed(content)
+
+    def parse_tbody(self, content):
+        '''
+        Fast path for parse_page: tokenize only the <tbody> regions of the page and
+        apply the same row logic as handle_data/handle_endtag, skipping the navigation
+        chrome around the table.
+        :return: True if the page was parsed, False if it needs HTMLParser. Nothing
+                 is changed when False is returned.
+        '''
+        regions = []
+        position = 0
+        while True:
+            start = TBODY_START_RE.search(content, position)
+            if not start:
+                break
+            end = TBODY_END_RE.search(content, start.end())
+            if not end or start.group().endswith("/>"):
+                return False
+            regions.append(content[start.end():end.start()])
+            position = end.end()
+        if not regions:
+            return False
+        # A <tbody> inside a comment or script would be ignored by HTMLParser.
+        if hides_tbody(content):
+            return False
+
+        current_date = self.current_date
+        current_row = list(self.current_row)
+        weather_data = {}
+        for region in regions:
+            position = 0
+            for tag in TAG_RE.finditer(region):
+                text = region[position:tag.start()]
+                position = tag.end()
+                if text:
+                    if "<" in text or ">" in text:
+                        return False
+                    clean_data = (html.unescape(text) if "&" in text else text).strip()
+                    if not current_date and clean_data.isdigit():
+                        try:
+                            current_date = (f"{self.current_year}-{self.current_month:02d}"
+                                            f"-{int(clean_data):02d}")
+                        except ValueError:
+                            pass
+                    elif clean_data:
+                        current_row.append(clean_data)
+                if tag.group(1) and tag.group(2).lower() == "tr" and current_date:
+                    if len(current_row) >= 3:
+                        try:
+                            weather_data[current_date] = {
+                                "Max": float(current_row[0]),
+                                "Min": float(current_row[1]),
+                                "Mean": float(current_row[2]),
+                            }
+                        except ValueError:
+                            pass
+                    current_date = None
+                    current_row = []
+            text = region[position:]
+            if "<" in text or ">" in text or text.strip() or current_date:
+                return False
+
+        self.current_date = current_date
+        self.current_row = current_row
+        self.weather_data.update(weather_data)
+        return True
+
+    def cached_page(self, year, month, station_id):
+        '''
+        Look up a month page in the cache.
+        :return: Tuple (page, entry). page is the cached text when it is final (see
+                 ResponseCache.is_final) and can be used without a request; entry is
+                 the cached entry to revalidate otherwise (or None).
+        '''
+        if not self.cache:
+            return None, None
+        entry = self.cache.get(station_id, year, month)
+        if entry and self.cache.is_final(entry, year, month):
+            self.cache.record("hit")
+            return entry.body, entry
+        return None, entry
+
+    def page_from_response(self, url, response, entry, year, month, station_id):
+        '''
+        Turn a fetch response into page text, using the cached entry on 304 Not Modified
+        and storing fresh pages in the cache.
+        '''
+        if response.status == 304 and entry:
+            self.cache.record("revalidated")
+            self.cache.touch(station_id, year, month)
+            return entry.body
+        if response.status >= 300:
+            # Redirects are followed by the pool; one left over means too many hops.
+            raise urllib.error.HTTPError(url, response.status, response.reason,
+                                         response.headers, None)
+        content = response.body.decode("utf-8")
+        if self.cache:
+            self.cache.record("miss")
+            # Only a full 200 page may be cached, and possibly marked final.
+            if response.status == 200:
+                self.cache.put(station_id, year, month, content, response.headers)
+        return content
+
+    @metrics.timed("scraper_request_seconds")
+    def request(self, url, headers=None):
+        '''
+        Fetch a URL through the pool. With a limiter, the request waits for a slot and
+        reports its latency and status; throttled (429/503) requests are retried after
+        a pause.
+        '''
+        if not self.limiter:
+            return self.pool.request(url, headers=headers)
+        for attempt in range(THROTTLE_RETRIES + 1):
+            with self.limiter.slot() as slot:
+                response = self.pool.request(url, headers=headers)
+                slot.status = response.status
+            if response.status not in THROTTLE_STATUSES or attempt == THROTTLE_RETRIES:
+                break
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+            if self.debug:
+                print(f"Throttled ({response.status}) on {url}; retrying in {delay}s")
+            time.sleep(min(delay, 30))
+        return response
+
+    @metrics.timed("scraper_fetch_and_parse_seconds")
+    def fetch_and_parse(self, year, month, station_id):
+        '''
+        Fetch and parse the weather data for a given year and month.
+        '''
+        url = build_url(self.base_url, station_id, year, month)
+        page, entry = self.cached_page(year, month, station_id)
+        if page is not None:
+            self.parse_page(page, year, month)
+            return
         if self.debug:
             print(f"Fetching data from: {url}")
         try:
-            with urllib.request.urlopen(url) as response:
-                content = response.read().decode("utf-8")
-                self.feed(content)
+            headers = self.cache.conditional_headers(entry) if entry else None
+            response = self.request(url, headers)
+            content = self.page_from_response(url, response, entry, year, month, station_id)
+            self.parse_page(content, year, month)
+            metrics.increment("scraper_pages_fetched")
         except (urllib.error.URLError, urllib.error.HTTPError, ValueError) as e:
+            self.error = e
+            metrics.increment("scraper_errors")
             if self.debug:
                 print(f"Error fetching data from {url}: {e}")
 
 
-def scrape_weather_data(start_year, end_year, station_id, debug=False):
+def scrape_weather_data(start_year, end_year, station_id, debug=False, pool=None,
+                        base_url=BASE_URL, engine="threads", concurrency=None, cache=None,
+                        months=None, limiter=None):
     '''
     Scrape weather data for a range of years and return it as a dictionary.
     :param debug: If True, print debug information. Default is False.
+    :param pool: HTTPConnectionPool shared by all workers. Default is the shared pool.
+    :param base_url: Daily data page URL. Default is the Government of Canada site.
+    :param engine: "threads" for a thread pool or "asyncio" for the asyncio engine.
+    :param concurrency: Requests in flight for the asyncio engine.
+    :param cache: Optional ResponseCache shared by all workers.
+    :param months: Optional list of (year, month) pages to fetch instead of every month
+                   from start_year to end_year.
+    :param limiter: AdaptiveLimiter shared by all workers. Default is a new limiter
+                    capped at calculate_thread_pool("io").
     '''
+    if engine == "asyncio":
+        # Imported here because async_scraper builds on this module.
+        from async_scraper import scrape_weather_data_async, DEFAULT_CONCURRENCY
+        return asyncio.run(scrape_weather_data_async(
+            start_year, end_year, station_id,
+            concurrency=concurrency or DEFAULT_CONCURRENCY,
+            debug=debug, base_url=base_url, cache=cache, months=months))
+    if engine != "threads":
+        raise ValueError("Unknown engine. Use 'threads' or 'asyncio'.")
+
     max_threads = calculate_thread_pool(task_type="io")
+    limiter = limiter or AdaptiveLimiter(max_limit=max_threads)
     if debug:
-        print(f"Using {max_threads} threads for scraping.")
+        print(f"Using up to {max_threads} threads for scraping, "
+              f"starting with {limiter.limit} requests in flight.")
 
     def fetch_for_year_month(year, month):
-        scraper = WeatherScraper(debug=debug)
+        scraper = WeatherScraper(debug=debug, pool=pool, base_url=base_url, cache=cache,
+                                 limiter=limiter)
         scraper.fetch_and_parse(year, month, station_id)
         return scraper.weather_data
 
     all_weather_data = {}
 
     with ThreadPoolExecutor(max_threads) as executor:
-        futures = []
-        for year in range(start_year, end_year + 1):
-            for month in range(1, 13):
-                futures.append(executor.submit(fetch_for_year_month, year, month))
+        futures = [executor.submit(fetch_for_year_month, year, month)
+                   for year, month in month_pages(start_year, end_year, months)]
 
         for future in futures:
             try:
@@ -0,0 +1,196 @@
+'''
+snapshot.py
+
+Description: Export and import of the weather table as a compressed columnar snapshot.
+The default format is a NumPy .npz archive; a .parquet path is written through pandas
+when a Parquet engine (pyarrow or fastparquet) is installed. Imports go through
+DBOperations.upsert_data.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+
+Usage:
+    python snapshot.py export weather.npz --station 27174 --start-year 2000 --end-year 2024
+    python snapshot.py import weather.npz
+'''
+
+import argparse
+import numpy as np
+from db_operations import DBOperations
+
+FORMAT_VERSION = 1
+# Rows read from SQLite per batch while exporting.
+EXPORT_BATCH_SIZE = 50000
+VALUE_COLUMNS = ("min_temp", "max_temp", "avg_temp")
+
+
+def is_parquet(path):
+    '''
+    Return True if the path names a Parquet snapshot.
+    '''
+    return str(path).lower().endswith(".parquet")
+
+
+def read_columns(db_ops, locations=None, year_range=None, batch_size=EXPORT_BATCH_SIZE):
+    '''
+    Read weather rows into columns: sample_date (datetime64[D]), location (str) and
+    min_temp, max_temp and avg_temp (float64, NaN where NULL).
+    '''
+    parts = []
+    for rows in db_ops.iter_rows(locations=locations, year_range=year_range,
+                                 arraysize=batch_size, batches=True):
+        _, sample_dates, names, mins, maxes, means = zip(*rows)
+        parts.append({
+            "sample_date": np.array(sample_dates, dtype="datetime64[D]"),
+            "location": np.array(names, dtype=str),
+            "min_temp": np.array(mins, dtype=np.float64),
+            "max_temp": np.array(maxes, dtype=np.float64),
+            "avg_temp": np.array(means, dtype=np.float64),
+        })
+    if not parts:
+        return {"sample_date": np.empty(0, dtype="datetime64[D]"),
+                "location": np.empty(0, dtype=str),
+                **{name: np.empty(0, dtype=np.float64) for name in VALUE_COLUMNS}}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def write_snapshot(columns, path, compress=True):
+    '''
+    Write snapshot columns to a .npz archive or, for a .parquet path, a Parquet file.
+    :param compress: If False, store the .npz arrays uncompressed for faster loading.
+    '''
+    if is_parquet(path):
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+        frame = pd.DataFrame(columns)
+        frame["location"] = frame["location"].astype("category")
+        frame.to_parquet(path, index=False, compression="zstd" if compress else None)
+        return
+    names, codes = np.unique(columns["location"], return_inverse=True)
+    save = np.savez_compressed if compress else np.savez
+    # Open the file ourselves so numpy does not append .npz to other extensions.
+    with open(path, "wb") as f:
+        save(f, format_version=np.array(FORMAT_VERSION),
+             sample_date=columns["sample_date"], location_code=codes.astype(np.int32),
+             locations=names, **{name: columns[name] for name in VALUE_COLUMNS})
+
+
+def load_snapshot(path):
+    '''
+    Load a snapshot as NumPy columns, without parsing any rows.
+    :return: Dictionary with sample_date, location, min_temp, max_temp and avg_temp
+             arrays.
+    :raises ValueError: If the file is not a snapshot this version can read.
+    '''
+    if is_parquet(path):
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+        frame = pd.read_parquet(path)
+        columns = {"sample_date": frame["sample_date"].to_numpy().astype("datetime64[D]"),
+                   "location": frame["location"].astype(str).to_numpy(dtype=str)}
+        columns.update({name: frame[name].to_numpy(dtype=np.float64)
+                        for name in VALUE_COLUMNS})
+        return columns
+    with np.load(path, allow_pickle=False) as archive:
+        if int(archive["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version in {path}")
+        # np.load returns an NpzFile whose arrays pylint cannot infer.
+        # pylint: disable-next=unsubscriptable-object
+        locations = archive["locations"][archive["location_code"]]
+        columns = {"sample_date": archive["sample_date"], "location": locations}
+        columns.update({name: archive[name] for name in VALUE_COLUMNS})
+        return columns
+
+
+def export_snapshot(db_ops, path, station_ids=None, year_range=None, compress=True):
+    '''
+    Export the weather table, or part of it, to a snapshot file.
+
+    :param db_ops: DBOperations instance to read from.
+    :param path: Output path; .parquet writes Parquet, anything else a .npz archive.
+    :param station_ids: Optional list of registered station IDs to export.
+    :param year_range: Optional tuple (start_year, end_year).
+    :param compress: If False, write an uncompressed .npz archive.
+    :return: Number of rows exported.
+    :raises ValueError: If a station ID is not registered.
+    '''
+    locations = None
+    if station_ids is not None:
+        locations = []
+        for station_id in station_ids:
+            station = db_ops.get_station(station_id)
+            if station is None:
+                raise ValueError(f"Station {station_id} is not registered.")
+            locations.append(station[1])
+    columns = read_columns(db_ops, locations=locations, year_range=year_range)
+    write_snapshot(columns, path, compress=compress)
+    return len(columns["sample_date"])
+
+
+def import_snapshot(db_ops, path, batch_size=None):
+    '''
+    Import a snapshot file through the bulk upsert path. Rows already stored with the
+    same values are left unchanged.
+
+    :param db_ops: DBOperations instance to write through.
+    :param path: Snapshot file written by export_snapshot.
+    :param batch_size: Optional rows per executemany call.
+    :return: Dictionary with the number of rows inserted, updated and unchanged.
+    '''
+    columns = load_snapshot(path)
+    sample_dates = np.datetime_as_string(columns["sample_date"], unit="D")
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
+    options = {"batch_size": batch_size} if batch_size else {}
+    names, codes = np.unique(columns["location"], return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    groups = np.split(order, np.cumsum(np.bincount(codes, minlength=len(names)))[:-1])
+    for location, rows in zip(names.tolist(), groups):
+        values = [[None if value != value else value for value in column]
+                  for column in (columns[name][rows].tolist() for name in VALUE_COLUMNS)]
+        weather_data = {
+            sample_date: {"Min": low, "Max": high, "Mean": mean}
+            for sample_date, low, high, mean in zip(sample_dates[rows].tolist(), *values)
+        }
+        counts = db_ops.upsert_data(weather_data, location=location, **options)
+        for key, count in counts.items():
+            totals[key] += count
+    return totals
+
+
+def main():
+    '''
+    Command line entry point.
+    '''
+    parser = argparse.ArgumentParser(description="Export or import weather snapshots.")
+    parser.add_argument("--db", default="weather_data.db", help="Database file name.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write the weather table to a file.")
+    export_parser.add_argument("path", help="Output file (.npz, or .parquet with pandas).")
+    export_parser.add_argument("--station", type=int, action="append", dest="stations",
+                               help="Station ID to export; repeat for more stations.")
+    export_parser.add_argument("--start-year", type=int, help="First year to export.")
+    export_parser.add_argument("--end-year", type=int, help="Last year to export.")
+    export_parser.add_argument("--uncompressed", action="store_true",
+                               help="Write an uncompressed .npz archive.")
+
+    import_parser = commands.add_parser("import", help="Load a snapshot into the database.")
+    import_parser.add_argument("path", help="Snapshot file.")
+    args = parser.parse_args()
+
+    db_ops = DBOperations(args.db)
+    db_ops.initialize_db()
+    if args.command == "export":
+        year_range = None
+        if args.start_year or args.end_year:
+            year_range = (args.start_year or 1, args.end_year or 9999)
+        rows = export_snapshot(db_ops, args.path, station_ids=args.stations,
+                               year_range=year_range, compress=not args.uncompressed)
+        print(f"Exported {rows} rows to {args.path}")
+    else:
+        counts = import_snapshot(db_ops, args.path)
+        print(f"Imported {args.path}: {counts['inserted']} inserted, "
+              f"{counts['updated']} updated, {counts['unchanged']} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import socket
+import threading
+import unittest
+from adaptive_limiter import AdaptiveLimiter
+from http_pool import HTTPConnectionPool
+from scrape_weather import scrape_weather_data
+from benchmarks.standin_server import start_standin_server
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def saturate(self, limiter, latency=0.01, status=200, count=1):
+        """Fill every slot, then complete them all with the same outcome."""
+        for _ in range(count):
+            slots = limiter.limit
+            for _ in range(slots):
+                limiter.acquire()
+            for _ in range(slots):
+                limiter.release(latency, status)
+
+    def test_additive_increase_while_saturated(self):
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=10)
+        self.saturate(limiter, count=4)
+        self.assertGreater(limiter.limit, 4)
+        self.saturate(limiter, count=40)
+        self.assertEqual(limiter.limit, 10)
+
+    def test_no_increase_when_underused(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(0.01, 200)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_multiplicative_decrease_on_throttling(self):
+        limiter = AdaptiveLimiter(initial_limit=16, min_limit=2)
+        limiter.acquire()
+        limiter.release(0.01, 503)
+        self.assertEqual(limiter.limit, 8)
+        self.assertEqual(limiter.stats()["throttled"], 1)
+
+        for _ in range(10):
+            limiter._last_decrease = 0.0
+            limiter.acquire()
+            limiter.release(0.01, error=True)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.stats()["errors"], 10)
+
+    def test_server_errors_and_timeouts_back_off(self):
+        limiter = AdaptiveLimiter(initial_limit=64, latency_tolerance=100)
+        for status in (500, 502, 504, 408):
+            limiter._last_decrease = 0.0
+            limiter.acquire()
+            limiter.release(0.01, status)
+        self.assertEqual(limiter.limit, 4)
+
+        limiter._last_decrease = 0.0
+        with self.assertRaises(socket.timeout):
+            with limiter.slot():
+                raise socket.timeout("timed out")
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.stats()["errors"], 5)
+
+    def test_latency_spike_backs_off(self):
+        limiter = AdaptiveLimiter(initial_limit=10)
+        limiter.acquire()
+        limiter.release(0.01, 200)
+        limiter._last_decrease = 0.0
+        limiter.acquire()
+        limiter.release(0.5, 200)
+        self.assertEqual(limiter.limit, 9)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        waiter.start()
+        self.assertFalse(acquired.wait(0.1))
+        limiter.release(0.01, 200)
+        self.assertTrue(acquired.wait(1))
+        waiter.join()
+
+    def test_scrape_backs_off_and_retries_throttled_pages(self):
+        server = start_standin_server(error_rate=0.3, error_status=503, seed=1)
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+        try:
+            with HTTPConnectionPool() as pool:
+                data = scrape_weather_data(2024, 2024, 27174, pool=pool,
+                                           base_url=server.base_url, limiter=limiter)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        stats = limiter.stats()
+        self.assertGreater(stats["throttled"], 0)
+        self.assertLess(stats["limit"], 8)
+        self.assertGreaterEqual(len(data), 300)
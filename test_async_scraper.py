@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+from async_scraper import AsyncHTTPClient, scrape_weather_data_async
+from scrape_weather import scrape_weather_data
+from benchmarks.standin_server import MOVED_PATH, PAGE_PATH, start_standin_server
+
+
+class TestAsyncScraper(unittest.TestCase):
+    def setUp(self):
+        self.server = start_standin_server()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_matches_threaded_scrape(self):
+        threaded = scrape_weather_data(2023, 2024, 27174, base_url=self.server.base_url)
+        delegated = scrape_weather_data(2023, 2024, 27174, base_url=self.server.base_url,
+                                        engine="asyncio", concurrency=4)
+
+        self.assertEqual(len(threaded), 731)
+        self.assertEqual(delegated, threaded)
+
+    def test_semaphore_bounds_connections(self):
+        async def scrape():
+            async with AsyncHTTPClient() as client:
+                data = await scrape_weather_data_async(2024, 2024, 27174, concurrency=3,
+                                                       base_url=self.server.base_url,
+                                                       client=client)
+                return data, client.connections_created
+
+        data, connections = asyncio.run(scrape())
+        self.assertEqual(len(data), 366)
+        self.assertLessEqual(connections, 3)
+
+    def test_redirects_are_followed(self):
+        async def fetch(url):
+            async with AsyncHTTPClient() as client:
+                return await client.request(url)
+
+        url = f"{self.server.base_url}?StationID=27174&Year=2024&Month=1"
+        moved = asyncio.run(fetch(url.replace(PAGE_PATH, MOVED_PATH)))
+        self.assertEqual((moved.status, moved.body), (200, asyncio.run(fetch(url)).body))
+
+    def test_corrupt_body_raises_value_error(self):
+        async def handle(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Encoding: deflate\r\n"
+                         b"Content-Length: 7\r\n\r\ngarbage")
+            await writer.drain()
+            writer.close()
+
+        async def fetch():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                async with AsyncHTTPClient() as client:
+                    await client.request(f"http://127.0.0.1:{port}/")
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(fetch())
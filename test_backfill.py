@@ -0,0 +1,107 @@
+import threading
+from datetime import date
+from backfill import enqueue_backfill, run_backfill
+from db_writer import close_writer, shared_writer
+from http_pool import HTTPConnectionPool
+from test_support import TempDatabaseTestCase
+from benchmarks.standin_server import start_standin_server
+
+STATIONS = [(27174, "Winnipeg", 2022, 2023)]
+
+
+class TestBackfill(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pool = HTTPConnectionPool()
+        self.servers = []
+
+    def tearDown(self):
+        self.pool.close()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        close_writer(self.db_ops.db_name)
+
+    def start_server(self, **options):
+        server = start_standin_server(**options)
+        self.servers.append(server)
+        return server
+
+    def backfill(self, server):
+        return run_backfill(self.db_ops, STATIONS, pool=self.pool, base_url=server.base_url,
+                            max_threads=4)
+
+    def test_restart_resumes_interrupted_run(self):
+        enqueue_backfill(self.db_ops, STATIONS)
+        # A previous run claimed ten jobs and finished four of them before dying.
+        claimed = self.db_ops.claim_jobs(10)
+        for job in claimed[:4]:
+            self.db_ops.complete_job(job, {}, "Winnipeg")
+
+        server = self.start_server()
+        stats = self.backfill(server)
+
+        self.assertEqual(server.request_count, 20)
+        self.assertEqual(stats["done"], 20)
+        self.assertEqual(stats["jobs"], {"done": 24})
+
+    def test_failed_jobs_are_retried_on_their_own(self):
+        failing = self.start_server(error_rate=1.0, error_status=500)
+        stats = self.backfill(failing)
+        self.assertEqual(stats["jobs"], {"failed": 24})
+        self.assertEqual(failing.request_count, 24 * 3)
+
+        healthy = self.start_server()
+        stats = self.backfill(healthy)
+        self.assertEqual(healthy.request_count, 24)
+        self.assertEqual(stats["rows"], 730)
+        self.assertEqual(len(self.db_ops.fetch_all_data()), 730)
+        self.assertEqual(shared_writer(self.db_ops).rows_written, 730)
+
+        self.backfill(healthy)
+        self.assertEqual(healthy.request_count, 24)
+
+    def test_open_months_are_requeued(self):
+        stations = [(27174, "Winnipeg", 2024, None)]
+        enqueue_backfill(self.db_ops, stations, today=date(2024, 3, 10))
+        for job in self.db_ops.claim_jobs(10):
+            self.db_ops.complete_job(job, {}, "Winnipeg")
+
+        enqueue_backfill(self.db_ops, stations, today=date(2024, 3, 10))
+        self.assertEqual(self.db_ops.get_job_counts(), {"done": 1, "pending": 2})
+
+    def test_refreshed_job_stores_revised_values(self):
+        self.db_ops.enqueue_jobs(27174, [(2024, 3)])
+        job = self.db_ops.claim_jobs(1)[0]
+        first = {"2024-03-01": {"Max": 1.0, "Min": -5.0, "Mean": -2.0}}
+        self.db_ops.complete_job(job, first, "Winnipeg")
+
+        self.db_ops.enqueue_jobs(27174, [(2024, 3)], refresh=True)
+        job = self.db_ops.claim_jobs(1)[0]
+        revised = {"2024-03-01": {"Max": 3.0, "Min": -5.0, "Mean": -1.0},
+                   "2024-03-02": {"Max": 2.0, "Min": -4.0, "Mean": -1.0}}
+        counts = shared_writer(self.db_ops).complete_job(job, revised, "Winnipeg")
+
+        self.assertEqual(counts, {"inserted": 1, "updated": 1, "unchanged": 0})
+        self.assertEqual(self.db_ops.fetch_all_data()[0][3:], (-5.0, 3.0, -1.0))
+        self.assertEqual(self.db_ops.get_job_counts(), {"done": 1})
+
+    def test_cancelled_run_resumes(self):
+        cancel_event = threading.Event()
+        reports = []
+
+        def progress(months_done, months_total, rows):
+            reports.append((months_done, months_total, rows))
+            cancel_event.set()
+
+        server = self.start_server()
+        stats = run_backfill(self.db_ops, STATIONS, pool=self.pool, base_url=server.base_url,
+                             max_threads=2, progress=progress, cancel_event=cancel_event)
+        self.assertTrue(stats["cancelled"])
+        self.assertLess(stats["done"], 24)
+        self.assertEqual(reports[0][1], 24)
+
+        stats = self.backfill(server)
+        self.assertFalse(stats["cancelled"])
+        self.assertEqual(stats["jobs"], {"done": 24})
+        self.assertEqual(server.request_count, 24)
@@ -0,0 +1,58 @@
+import threading
+import time
+import unittest
+from background_tasks import TaskRunner
+
+
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = TaskRunner()
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def wait_for(self, kind):
+        deadline = time.monotonic() + 5
+        events = []
+        while time.monotonic() < deadline:
+            events.extend(self.runner.poll())
+            if events and events[-1].kind == kind:
+                return events
+            time.sleep(0.01)
+        self.fail(f"No {kind} event")
+
+    def test_progress_is_coalesced_and_result_delivered(self):
+        def task(progress, cancel_event):
+            for month in range(1, 13):
+                progress(month, 12, month * 30)
+            return "finished"
+
+        self.runner.submit("download", task)
+        events = self.wait_for("done")
+        self.assertEqual([event.kind for event in events][-1], "done")
+        self.assertEqual(events[-1].payload, "finished")
+        progress_events = [event for event in events if event.kind == "progress"]
+        self.assertEqual(progress_events[-1].payload[:3], (12, 12, 360))
+        self.assertFalse(self.runner.busy)
+
+    def test_cancel_and_errors(self):
+        started = threading.Event()
+
+        def task(progress, cancel_event):
+            started.set()
+            if not cancel_event.wait(5):
+                return "not cancelled"
+            raise ValueError("stopped")
+
+        self.runner.submit("update", task)
+        started.wait(5)
+        self.assertTrue(self.runner.busy)
+        with self.assertRaises(RuntimeError):
+            self.runner.submit("update", task)
+        self.runner.cancel()
+        event = self.wait_for("error")[-1]
+        self.assertIsInstance(event.payload, ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import unittest
+from batch_render import chart_path, location_slug, plan_render_jobs, render_all
+from test_support import TempDatabaseTestCase
+
+
+class TestBatchRender(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db_ops.add_station(51097, "Brandon A", 2012)
+        for location in ("Winnipeg", "Brandon A"):
+            self.db_ops.save_data({
+                "2023-12-31": {"Max": -10.0, "Min": -20.0, "Mean": -15.0},
+                "2024-01-01": {"Max": -8.0, "Min": -16.0, "Mean": -12.0},
+                "2024-01-02": {"Max": -2.0, "Min": -11.0, "Mean": -6.5},
+                "2024-02-01": {"Max": 0.0, "Min": -9.0, "Mean": -4.5},
+            }, location=location)
+        self.out_dir = os.path.join(self.temp_dir.name, "charts")
+
+    def test_plan_covers_every_month_and_year(self):
+        jobs = plan_render_jobs(self.db_ops, locations=["Winnipeg"])
+        self.assertEqual(jobs, [("line", "Winnipeg", 2023, 12), ("line", "Winnipeg", 2024, 1),
+                                ("line", "Winnipeg", 2024, 2), ("box", "Winnipeg", 2023, None),
+                                ("box", "Winnipeg", 2024, None)])
+        self.assertEqual(len(plan_render_jobs(self.db_ops)), 10)
+
+    def test_render_all_writes_every_format(self):
+        result = render_all(self.db_ops, self.out_dir, formats=("png", "svg"), workers=2,
+                            chunksize=2)
+        self.assertEqual(result["failed"], [])
+        self.assertEqual((result["rendered"], result["files"]), (10, 20))
+        for job in plan_render_jobs(self.db_ops):
+            for file_format in ("png", "svg"):
+                self.assertGreater(os.path.getsize(chart_path(self.out_dir, job, file_format)),
+                                   0)
+        self.assertTrue(os.path.isfile(os.path.join(self.out_dir, "brandon_a",
+                                                    "line_2024_01.png")))
+
+    def test_failing_job_is_recorded(self):
+        bad_job = ("line", "Winnipeg", 2024, None)
+        jobs = [bad_job, ("box", "Winnipeg", 2024, None)]
+        result = render_all(self.db_ops, self.out_dir, jobs=jobs, workers=1)
+        self.assertEqual(result["rendered"], 1)
+        self.assertEqual([job for job, _ in result["failed"]], [bad_job])
+        self.assertIn("TypeError", result["failed"][0][1])
+
+    def test_location_slug(self):
+        self.assertEqual(location_slug("St. John's Intl A"), "st_john_s_intl_a")
+
+
+if __name__ == "__main__":
+    unittest.main()
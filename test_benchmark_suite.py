@@ -0,0 +1,35 @@
+import copy
+import unittest
+from benchmarks.suite import QUICK_CONFIG, SCENARIOS, compare_results, run_suite
+
+TINY_CONFIG = dict(QUICK_CONFIG, parse_seconds=0.05, insert_rows=2000, fetch_sizes=[2000],
+                   fetch_calls=3, plot_rows=2000)
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_every_scenario_reports_metrics(self):
+        results = run_suite(TINY_CONFIG, progress=None)
+        self.assertEqual({entry["scenario"] for entry in results["metrics"]}, set(SCENARIOS))
+        self.assertTrue(all(entry["value"] > 0 for entry in results["metrics"]))
+        self.assertEqual(results["config"]["fetch_sizes"], [2000])
+        self.assertIn("sqlite", results["environment"])
+
+    def test_compare_flags_regressions_in_either_direction(self):
+        baseline = run_suite(TINY_CONFIG, scenarios=["parse", "plot_prep"], progress=None)
+        current = copy.deepcopy(baseline)
+        for entry in current["metrics"]:
+            # Half the parse throughput and double the plot preparation time.
+            entry["value"] *= 0.5 if entry["better"] == "higher" else 2
+        comparison = compare_results(baseline, current, tolerance=0.1)
+        self.assertEqual(len(comparison), 2)
+        self.assertTrue(all(regressed for _, _, _, regressed in comparison))
+        self.assertFalse(any(regressed for _, _, _, regressed in
+                             compare_results(baseline, baseline)))
+
+    def test_unknown_scenario(self):
+        with self.assertRaises(ValueError):
+            run_suite(TINY_CONFIG, scenarios=["render"], progress=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,12 @@
-import unittest
-from db_operations import DBOperations
-
-class TestDBOperations(unittest.TestCase):
-    def setUp(self):
-        # Use an in-memory database for testing
-        self.db_ops = DBOperations(":memory:")
-        self.db_ops.initialize_db()
+import contextlib
+import io
+import sqlite3
+from db_operations import BOXPLOT_QUERY, LINEPLOT_QUERY
+from dbcm import DBCM, get_pool
+from plot_operations import PlotOperations
+from test_support import TempDatabaseTestCase
 
+class TestDBOperations(TempDatabaseTestCase):
     def test_save_and_fetch_data(self):
         # Mock weather data
         weather_data = {
@@ -20,7 +20,7 @@ class TestDBOperations(unittest.TestCase):
         # Fetch data and verify
         rows = self.db_ops.fetch_data()
         self.assertEqual(len(rows), 2)
-        self.assertEqual(rows[0], ("2024-11-01", "Winnipeg", -0.3, 8.0, 3.9))
+        self.assertEqual(rows[0][1:], ("2024-11-01", "Winnipeg", -0.3, 8.0, 3.9))
 
     def test_purge_data(self):
         # Mock weather data
@@ -35,3 +35,205 @@ class TestDBOperations(unittest.TestCase):
         # Fetch data and verify
         rows = self.db_ops.fetch_data()
         self.assertEqual(len(rows), 0)
+
+
+class TestStationRegistry(TempDatabaseTestCase):
+    def test_default_station_is_registered(self):
+        self.assertEqual(self.db_ops.get_stations(), [(27174, "Winnipeg", 2020, None)])
+
+    def test_add_update_and_remove_station(self):
+        self.db_ops.add_station(51097, "Brandon", 2012)
+        self.db_ops.add_station(51097, "Brandon A", 2012, 2023)
+        self.assertEqual(self.db_ops.get_station(51097), (51097, "Brandon A", 2012, 2023))
+
+        self.db_ops.remove_station(51097)
+        self.assertIsNone(self.db_ops.get_station(51097))
+
+
+class TestBulkWrites(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.weather_data = {
+            "2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 3.9},
+            "2024-11-02": {"Max": 9.6, "Min": -4.5, "Mean": 2.5},
+            "2024-11-03": {"Max": 1.2, "Min": -7.0, "Mean": -2.9},
+        }
+
+    def test_save_data_skips_existing_dates(self):
+        self.assertEqual(self.db_ops.save_data(self.weather_data, batch_size=2), 3)
+        changed = {"2024-11-01": {"Max": 20.0, "Min": 10.0, "Mean": 15.0}}
+        self.assertEqual(self.db_ops.save_data(changed), 0)
+        self.assertEqual(self.db_ops.fetch_data()[0][3:], (-0.3, 8.0, 3.9))
+
+    def test_update_data_in_batches(self):
+        self.db_ops.save_data(self.weather_data)
+        changed = {day: {"Max": 0.0, "Min": 0.0, "Mean": 0.0} for day in self.weather_data}
+        self.assertEqual(self.db_ops.update_data(changed, batch_size=2), 3)
+        self.assertEqual({row[3:] for row in self.db_ops.fetch_data()}, {(0.0, 0.0, 0.0)})
+
+    def test_upsert_counts_inserted_updated_and_unchanged(self):
+        counts = self.db_ops.upsert_data(self.weather_data, batch_size=2)
+        self.assertEqual(counts, {"inserted": 3, "updated": 0, "unchanged": 0})
+
+        refreshed = dict(self.weather_data)
+        refreshed["2024-11-02"] = {"Max": 10.1, "Min": -4.5, "Mean": 2.8}
+        refreshed["2024-11-04"] = {"Max": 3.0, "Min": -1.0, "Mean": 1.0}
+        counts = self.db_ops.upsert_data(refreshed, batch_size=2)
+        self.assertEqual(counts, {"inserted": 1, "updated": 1, "unchanged": 2})
+
+        rows = {row[1]: row[3:] for row in self.db_ops.fetch_data()}
+        self.assertEqual(rows["2024-11-02"], (-4.5, 10.1, 2.8))
+        self.assertEqual(len(rows), 4)
+
+    def test_upsert_keeps_locations_apart(self):
+        self.db_ops.upsert_data(self.weather_data)
+        counts = self.db_ops.upsert_data(self.weather_data, location="Brandon")
+        self.assertEqual(counts["inserted"], 3)
+        self.assertEqual(len(self.db_ops.fetch_data()), 6)
+
+    def test_data_version_bumps_only_on_changes(self):
+        self.assertEqual(self.db_ops.get_data_version(), 0)
+        self.db_ops.save_data(self.weather_data)
+        self.assertEqual(self.db_ops.get_data_version(), 1)
+        self.db_ops.save_data(self.weather_data)
+        self.db_ops.upsert_data(self.weather_data)
+        self.assertEqual(self.db_ops.get_data_version(), 1)
+        self.db_ops.update_data({"2024-11-01": {"Max": 0.0, "Min": 0.0, "Mean": 0.0}})
+        self.db_ops.purge_data()
+        self.assertEqual(self.db_ops.get_data_version(), 3)
+
+
+class TestDateIndex(TempDatabaseTestCase):
+    initialize = False
+
+    def query_plan(self, query, params):
+        with DBCM(self.db_ops.db_name) as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+            return " ".join(row[3] for row in cursor.fetchall())
+
+    def test_plot_queries_use_the_index(self):
+        self.db_ops.initialize_db()
+        for query, params in ((BOXPLOT_QUERY, ("Winnipeg", 2020, 2024)),
+                              (LINEPLOT_QUERY, ("Winnipeg", 2024, 11))):
+            plan = self.query_plan(query, params)
+            self.assertIn("USING INDEX idx_weather_location_year_month", plan)
+            self.assertNotIn("SCAN weather", plan)
+
+    def test_existing_database_is_migrated(self):
+        connection = sqlite3.connect(self.db_ops.db_name)
+        connection.execute("""
+            CREATE TABLE weather (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sample_date TEXT NOT NULL,
+                location TEXT NOT NULL,
+                min_temp REAL,
+                max_temp REAL,
+                avg_temp REAL,
+                UNIQUE(sample_date, location)
+            )
+        """)
+        connection.execute("""
+            INSERT INTO weather (sample_date, location, min_temp, max_temp, avg_temp)
+            VALUES ('2024-11-02', 'Winnipeg', -4.5, 9.6, 2.5)
+        """)
+        connection.commit()
+        connection.close()
+
+        self.db_ops.initialize_db()
+        self.db_ops.initialize_db()
+        with DBCM(self.db_ops.db_name) as cursor:
+            cursor.execute("SELECT year, month, day FROM weather")
+            self.assertEqual(cursor.fetchall(), [(2024, 11, 2)])
+        self.assertEqual(self.db_ops.fetch_data(filter_type="lineplot", year="2024", month="11"),
+                         [("02", 2.5)])
+        self.assertEqual(len(self.db_ops.fetch_data()[0]), 6)
+
+    def test_plot_queries_filter_by_location(self):
+        self.db_ops.initialize_db()
+        self.db_ops.save_data({"2024-11-02": {"Max": 9.6, "Min": -4.5, "Mean": 2.5},
+                               "2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 3.9}})
+        self.db_ops.save_data({"2024-11-01": {"Max": 1.0, "Min": -1.0, "Mean": 0.0}},
+                              location="Brandon")
+        self.assertEqual(self.db_ops.fetch_data(filter_type="lineplot", year=2024, month=11),
+                         [("01", 3.9), ("02", 2.5)])
+        self.assertEqual(self.db_ops.fetch_data(filter_type="boxplot", year_range=(2024, 2024),
+                                                location="Brandon"),
+                         [("11", 0.0)])
+
+
+class TestMonthlyStats(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.weather_data = {
+            "2023-11-05": {"Max": 2.0, "Min": -6.0, "Mean": -2.0},
+            "2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 3.9},
+            "2024-11-02": {"Max": 9.6, "Min": -4.5, "Mean": 2.5},
+            "2024-12-01": {"Max": -3.0, "Min": -9.0, "Mean": -6.0},
+        }
+
+    def test_writes_keep_summaries_current(self):
+        self.db_ops.save_data(self.weather_data)
+        self.assertEqual(self.db_ops.fetch_monthly_stats((2024, 2024)), [
+            (2024, 11, 2, 6.4, 2.5, 3.9, [2.5, 3.9]),
+            (2024, 12, 1, -6.0, -6.0, -6.0, [-6.0]),
+        ])
+
+        self.db_ops.update_data({"2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 1.0}})
+        self.db_ops.upsert_data({"2024-11-03": {"Max": 5.0, "Min": 0.0, "Mean": 2.5}})
+        stats = self.db_ops.fetch_monthly_stats((2024, 2024))[0]
+        self.assertEqual(stats[:3], (2024, 11, 3))
+        self.assertEqual(stats[6], [1.0, 2.5, 2.5])
+
+        self.db_ops.purge_data()
+        self.assertEqual(self.db_ops.fetch_monthly_stats((2023, 2024)), [])
+
+    def test_summaries_match_daily_rows(self):
+        self.db_ops.save_data(self.weather_data)
+        plot_ops = PlotOperations()
+        raw = plot_ops.prepare_boxplot_data(
+            self.db_ops.fetch_data(filter_type="boxplot", year_range=(2023, 2024)))
+        arrays = plot_ops.prepare_summary_arrays(
+            self.db_ops.fetch_monthly_stats((2023, 2024)))
+        self.assertEqual({month: temps.tolist() for month, temps in arrays.items()},
+                         {month: sorted(means) for month, means in raw.items()})
+
+    def test_existing_database_is_backfilled(self):
+        self.db_ops.save_data(self.weather_data, location="Brandon")
+        with DBCM(self.db_ops.db_name) as cursor:
+            cursor.execute("DROP TABLE monthly_stats")
+        self.db_ops.initialize_db()
+        stats = self.db_ops.fetch_monthly_stats((2023, 2024), location="Brandon")
+        self.assertEqual([(row[0], row[1], row[2]) for row in stats],
+                         [(2023, 11, 1), (2024, 11, 2), (2024, 12, 1)])
+
+
+class TestStreamingReads(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db_ops.save_data({f"2024-01-{day:02d}": {"Max": day, "Min": -day, "Mean": 0.5}
+                               for day in range(1, 32)})
+
+    def test_iterators_match_fetches(self):
+        self.assertEqual(list(self.db_ops.iter_all_data(arraysize=4)),
+                         self.db_ops.fetch_all_data())
+        self.assertEqual(list(self.db_ops.iter_data(filter_type="lineplot", year=2024,
+                                                    month=1, arraysize=7)),
+                         self.db_ops.fetch_data(filter_type="lineplot", year=2024, month=1))
+        with self.assertRaises(ValueError):
+            self.db_ops.iter_data(filter_type="lineplot")
+
+    def test_batches_have_arraysize_rows(self):
+        sizes = [len(batch) for batch in self.db_ops.iter_all_data(arraysize=10, batches=True)]
+        self.assertEqual(sizes, [10, 10, 10, 1])
+
+    def test_closing_early_returns_the_connection(self):
+        pool = get_pool(self.db_ops.db_name)
+        created = pool.connections_created
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            rows = self.db_ops.iter_all_data(arraysize=5)
+            next(rows)
+            rows.close()
+            self.db_ops.fetch_all_data()
+        self.assertEqual(pool.connections_created, created)
+        self.assertEqual(output.getvalue(), "")
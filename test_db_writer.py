@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+import unittest
+from db_operations import DBOperations
+from db_writer import DBWriter, WriterClient, close_writer, serve, shared_writer
+from test_support import TempDatabaseTestCase
+
+
+def month_data(year, month, days=28, low=0.0):
+    return {f"{year}-{month:02d}-{day:02d}": {"Min": low, "Max": low + 10.0, "Mean": low + 5.0}
+            for day in range(1, days + 1)}
+
+
+class TestDBWriter(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.writer = DBWriter(self.db_ops)
+
+    def tearDown(self):
+        if self.writer.is_alive():
+            self.writer.close()
+
+    def hold_writer(self):
+        """Start the writer and keep it busy in a write listener until released."""
+        release = threading.Event()
+        held = threading.Event()
+
+        def block(location, months):
+            if location == "Hold":
+                held.set()
+                release.wait(10)
+
+        self.db_ops.add_write_listener(block)
+        self.writer.start()
+        self.writer.submit(month_data(2000, 1), "Hold")
+        self.assertTrue(held.wait(10))
+        return release
+
+    def test_groups_queued_requests_into_one_commit(self):
+        release = self.hold_writer()
+        futures = [self.writer.submit(month_data(2024, month), "Winnipeg")
+                   for month in range(1, 7)]
+        release.set()
+
+        self.assertEqual([future.result(timeout=10) for future in futures], [28] * 6)
+        self.assertEqual(self.writer.commits, 2)
+        self.assertEqual(self.writer.rows_written, 196)
+        self.assertEqual(len(self.db_ops.fetch_all_data()), 196)
+        self.assertEqual(self.db_ops.get_data_version(), 7)
+
+    def test_failed_request_does_not_fail_its_group(self):
+        release = self.hold_writer()
+        good = self.writer.submit(month_data(2024, 1), "Winnipeg")
+        bad = self.writer.submit({"2024-02-01": {"Min": 1.0}}, "Winnipeg")
+        also_good = self.writer.submit(month_data(2024, 3), "Winnipeg")
+        release.set()
+
+        self.assertEqual(good.result(timeout=10), 28)
+        self.assertIsInstance(bad.exception(timeout=10), KeyError)
+        self.assertEqual(also_good.result(timeout=10), 28)
+        self.assertEqual(self.writer.commits, 2)
+        self.assertEqual(len(self.db_ops.fetch_all_data()), 28 + 56)
+
+    def test_failing_listener_does_not_stop_the_writer(self):
+        def fail(location, months):
+            raise ValueError("listener failed")
+
+        self.db_ops.add_write_listener(fail)
+        self.writer.start()
+
+        self.assertEqual(self.writer.save_data(month_data(2024, 1)), 28)
+        self.assertEqual(self.writer.save_data(month_data(2024, 2)), 28)
+        self.assertTrue(self.writer.is_alive())
+
+    def test_fatal_error_fails_later_writes(self):
+        self.db_ops.db_name = os.path.join(self.temp_dir.name, "missing", "weather.db")
+        self.writer.start()
+        self.writer.join(10)
+
+        self.assertFalse(self.writer.is_alive())
+        self.assertIsNotNone(self.writer.error)
+        with self.assertRaises(RuntimeError):
+            self.writer.submit(month_data(2024, 1))
+
+    def test_rejects_writes_before_start(self):
+        with self.assertRaises(RuntimeError):
+            self.writer.submit(month_data(2024, 1))
+
+    def test_concurrent_producers(self):
+        release = self.hold_writer()
+        results = []
+
+        def produce(location):
+            for month in range(1, 13):
+                results.append(self.writer.save_data(month_data(2023, month), location))
+
+        producers = [threading.Thread(target=produce, args=(f"Station {number}",))
+                     for number in range(6)]
+        for producer in producers:
+            producer.start()
+        while self.writer.queue.qsize() < 6:
+            time.sleep(0.01)
+        release.set()
+        for producer in producers:
+            producer.join()
+        self.writer.close()
+
+        self.assertEqual(sum(results), 6 * 12 * 28)
+        self.assertEqual(len(self.db_ops.fetch_all_data()), 28 + 6 * 12 * 28)
+        # The six first months queued behind the held write share one commit.
+        self.assertLessEqual(self.writer.commits, 1 + 6 * 12 - 5)
+
+    def test_complete_job_marks_the_job_done(self):
+        self.db_ops.enqueue_jobs(27174, [(2024, 1)])
+        job = self.db_ops.claim_jobs(1)[0]
+        self.writer.start()
+
+        self.assertEqual(self.writer.complete_job(job, month_data(2024, 1), "Winnipeg"),
+                         {"inserted": 28, "updated": 0, "unchanged": 0})
+        self.assertEqual(self.db_ops.get_job_counts(), {"done": 1})
+        with self.assertRaises(ValueError):
+            self.writer.submit(month_data(2024, 2), mode="complete_job")
+
+    def test_shared_writer_is_one_per_database(self):
+        writer = shared_writer(self.db_ops)
+        try:
+            self.assertIs(shared_writer(DBOperations(self.db_ops.db_name)), writer)
+            self.assertEqual(writer.save_data(month_data(2024, 1)), 28)
+        finally:
+            close_writer(self.db_ops.db_name)
+
+        self.assertFalse(writer.running)
+        replacement = shared_writer(self.db_ops)
+        self.assertIsNot(replacement, writer)
+        close_writer(self.db_ops.db_name)
+
+    def test_upsert_notifies_write_listeners(self):
+        writes = []
+        self.db_ops.add_write_listener(lambda location, months: writes.append((location, months)))
+        self.writer.start()
+
+        self.assertEqual(self.writer.save_data(month_data(2024, 5)), 28)
+        counts = self.writer.upsert_data(month_data(2024, 5, low=2.0))
+        self.assertEqual(counts, {"inserted": 0, "updated": 28, "unchanged": 0})
+        self.assertEqual(self.writer.save_data(month_data(2024, 5)), 0)
+
+        self.assertEqual(writes, [("Winnipeg", {(2024, 5)})] * 2)
+
+    def test_rejects_unknown_mode_and_writes_after_close(self):
+        self.writer.start()
+        with self.assertRaises(ValueError):
+            self.writer.submit(month_data(2024, 1), mode="replace")
+        future = self.writer.submit(month_data(2024, 1))
+        self.writer.close()
+
+        self.assertEqual(future.result(timeout=10), 28)
+        with self.assertRaises(RuntimeError):
+            self.writer.submit(month_data(2024, 2))
+
+    def test_client_writes_through_served_writer(self):
+        self.writer.start()
+        listener = serve(self.writer, ("127.0.0.1", 0), b"test")
+        client = WriterClient(listener.address, b"test")
+        try:
+            self.assertEqual(client.save_data(month_data(2024, 1), "Brandon"), 28)
+            self.assertEqual(client.upsert_data(month_data(2024, 1, low=1.0), "Brandon"),
+                             {"inserted": 0, "updated": 28, "unchanged": 0})
+            with self.assertRaises(RuntimeError):
+                client.save_data({"2024-02-01": {"Min": 1.0}}, "Brandon")
+        finally:
+            client.close()
+            listener.close()
+
+        self.assertEqual(self.db_ops.get_latest_date("Brandon"), "2024-01-28")
+
+
+if __name__ == "__main__":
+    unittest.main()
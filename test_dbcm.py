@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+import dbcm
+from dbcm import DBCM, ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.temp_dir.name, "weather.db")
+        self.pool = ConnectionPool(self.db_name, maxsize=2)
+        with DBCM(self.db_name, pool=self.pool) as cursor:
+            cursor.execute("CREATE TABLE readings (value INTEGER)")
+
+    def tearDown(self):
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def test_connections_are_reused_and_tuned(self):
+        for _ in range(5):
+            with DBCM(self.db_name, pool=self.pool) as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                self.assertEqual(cursor.fetchone()[0], "wal")
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)
+                cursor.execute("PRAGMA cache_size")
+                self.assertEqual(cursor.fetchone()[0], -dbcm.CACHE_SIZE_KIB)
+        self.assertEqual(self.pool.connections_created, 1)
+
+    def test_error_rolls_back_and_keeps_connection_usable(self):
+        with self.assertRaises(ValueError):
+            with DBCM(self.db_name, pool=self.pool) as cursor:
+                cursor.execute("INSERT INTO readings VALUES (1)")
+                raise ValueError("boom")
+        with DBCM(self.db_name, pool=self.pool) as cursor:
+            cursor.execute("SELECT COUNT(*) FROM readings")
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(self.pool.connections_created, 1)
+
+    def test_concurrent_threads(self):
+        def insert(start):
+            for value in range(start, start + 50):
+                with DBCM(self.db_name, pool=self.pool) as cursor:
+                    cursor.execute("INSERT INTO readings VALUES (?)", (value,))
+
+        threads = [threading.Thread(target=insert, args=(n * 50,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with DBCM(self.db_name, pool=self.pool) as cursor:
+            cursor.execute("SELECT COUNT(DISTINCT value) FROM readings")
+            self.assertEqual(cursor.fetchone()[0], 200)
+        self.assertLessEqual(self.pool.connections_created, 4)
+
+    def test_close_closes_idle_and_returned_connections(self):
+        idle = self.pool.get()
+        in_use = self.pool.get()
+        self.pool.put(idle)
+        self.pool.close()
+        self.pool.put(in_use)
+        for connection in (idle, in_use):
+            with self.assertRaises(sqlite3.ProgrammingError):
+                connection.execute("SELECT 1")
+
+    def test_close_all_drops_shared_pools(self):
+        pool = dbcm.get_pool(self.db_name)
+        self.assertIs(dbcm.get_pool(self.db_name), pool)
+        dbcm.close_all()
+        self.assertIsNot(dbcm.get_pool(self.db_name), pool)
+
+    def test_close_pool_drops_one_shared_pool(self):
+        pool = dbcm.get_pool(self.db_name)
+        other = dbcm.get_pool(self.db_name + "-other")
+        connection = pool.get()
+        pool.put(connection)
+        dbcm.close_pool(self.db_name)
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+        self.assertIsNot(dbcm.get_pool(self.db_name), pool)
+        self.assertIs(dbcm.get_pool(self.db_name + "-other"), other)
+        dbcm.close_pool(self.db_name)
+        dbcm.close_pool(self.db_name + "-other")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import urllib.error
+from http_pool import HTTPConnectionPool
+from scrape_weather import WeatherScraper
+from benchmarks.standin_server import LOOP_PATH, MOVED_PATH, PAGE_PATH, start_standin_server
+
+
+class TestHTTPConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = start_standin_server()
+        self.pool = HTTPConnectionPool(maxsize=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_is_reused_and_gzip_decoded(self):
+        url = f"{self.server.base_url}?StationID=27174&Year=2024&Month=1"
+        for _ in range(5):
+            response = self.pool.request(url)
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertIn(b"<tbody>", response.body)
+
+        self.assertEqual(self.pool.connections_created, 1)
+        self.assertEqual(self.pool.requests_made, 5)
+
+    def test_scraper_fetches_through_pool(self):
+        scraper = WeatherScraper(pool=self.pool, base_url=self.server.base_url)
+        scraper.fetch_and_parse(2024, 2, 27174)
+
+        self.assertEqual(len(scraper.weather_data), 29)
+        self.assertIn("2024-02-29", scraper.weather_data)
+        self.assertEqual(set(scraper.weather_data["2024-02-01"]), {"Max", "Min", "Mean"})
+
+    def test_redirects_are_followed(self):
+        url = f"{self.server.base_url}?StationID=27174&Year=2024&Month=1"
+        moved = self.pool.request(url.replace(PAGE_PATH, MOVED_PATH))
+        self.assertEqual((moved.status, moved.body), (200, self.pool.request(url).body))
+
+        scraper = WeatherScraper(pool=self.pool,
+                                 base_url=self.server.base_url.replace(PAGE_PATH, LOOP_PATH))
+        scraper.fetch_and_parse(2024, 1, 27174)
+        self.assertIsInstance(scraper.error, urllib.error.HTTPError)
+        self.assertEqual((scraper.error.code, scraper.weather_data), (302, {}))
+
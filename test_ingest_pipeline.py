@@ -0,0 +1,66 @@
+import threading
+from db_writer import close_writer, shared_writer
+from http_pool import HTTPConnectionPool
+from ingest_pipeline import interleave, scrape_stations, stream_weather_data
+from test_support import TempDatabaseTestCase
+from benchmarks.standin_server import start_standin_server
+
+
+class TestIngestPipeline(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = start_standin_server()
+        self.pool = HTTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        close_writer(self.db_ops.db_name)
+
+    def test_streams_rows_in_batches(self):
+        stats = stream_weather_data(2022, 2023, 27174, self.db_ops, batch_size=100,
+                                    queue_size=2, pool=self.pool,
+                                    base_url=self.server.base_url, max_threads=3)
+
+        self.assertEqual(stats["months"], 24)
+        self.assertEqual(stats["rows"], 730)
+        self.assertGreaterEqual(stats["batches"], 5)
+        self.assertEqual(len(self.db_ops.fetch_all_data()), 730)
+        self.assertEqual(self.db_ops.get_latest_date(), "2023-12-31")
+        # Batches are committed by the database's shared writer.
+        self.assertEqual(shared_writer(self.db_ops).rows_written, 730)
+
+    def test_scrape_stations_shares_one_pool(self):
+        self.db_ops.add_station(51097, "Brandon", 2023, 2023)
+        stations = self.db_ops.get_stations()
+        stats = scrape_stations(stations, self.db_ops, start_year=2023, end_year=2024,
+                                pool=self.pool, base_url=self.server.base_url, max_threads=4)
+
+        self.assertEqual(stats["months"], 36)
+        self.assertEqual(self.db_ops.get_latest_date("Winnipeg"), "2024-12-31")
+        self.assertEqual(self.db_ops.get_latest_date("Brandon"), "2023-12-31")
+        self.assertEqual(len(self.db_ops.fetch_all_data()), 731 + 365)
+
+    def test_reports_progress_and_stops_when_cancelled(self):
+        cancel_event = threading.Event()
+        reports = []
+
+        def progress(months_done, months_total, rows):
+            reports.append((months_done, months_total, rows))
+            if months_done == 5:
+                cancel_event.set()
+
+        stats = stream_weather_data(2022, 2023, 27174, self.db_ops, pool=self.pool,
+                                    base_url=self.server.base_url, max_threads=2,
+                                    progress=progress, cancel_event=cancel_event)
+
+        self.assertTrue(stats["cancelled"])
+        self.assertLess(stats["months"], 24)
+        self.assertEqual(reports[0][:2], (1, 24))
+        self.assertEqual(reports[-1][2], stats["rows"])
+        self.assertEqual(len(self.db_ops.fetch_all_data()), stats["rows"])
+
+    def test_interleave_is_round_robin(self):
+        jobs = list(interleave([1, 2, 3], ["a"], [10, 20]))
+        self.assertEqual(jobs, [1, "a", 10, 2, 20, 3])
@@ -0,0 +1,88 @@
+import json
+import os
+import pstats
+import unittest
+import metrics
+from test_support import TempDatabaseTestCase
+
+
+class TestMetrics(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        metrics.disable()
+        metrics.increment("pages")
+        with metrics.timer("block_seconds"):
+            pass
+        metrics.timed("call_seconds")(len)([1])
+        self.assertEqual(metrics.summary(), {"counters": {}, "histograms": {}})
+
+    def test_timers_counters_and_errors(self):
+        metrics.increment("pages", 3)
+        fail = metrics.timed("fail_seconds")(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            fail()
+
+        def numbers():
+            yield from range(3)
+        self.assertEqual(list(metrics.timed("numbers_seconds")(numbers)()), [0, 1, 2])
+
+        def delegate():
+            return numbers()
+        # A function returning a generator is timed once the generator is exhausted.
+        digits = metrics.timed("digits_seconds")(delegate)()
+        self.assertNotIn("digits_seconds", metrics.summary()["histograms"])
+        self.assertEqual(list(digits), [0, 1, 2])
+
+        summary = metrics.summary()
+        self.assertEqual(summary["counters"], {"fail_seconds_errors": 1, "pages": 3})
+        self.assertEqual(summary["histograms"]["fail_seconds"]["count"], 1)
+        self.assertEqual(summary["histograms"]["numbers_seconds"]["count"], 1)
+        self.assertEqual(summary["histograms"]["digits_seconds"]["count"], 1)
+
+    def test_db_methods_are_instrumented(self):
+        self.db_ops.save_data({"2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 3.9}})
+        self.db_ops.fetch_data()
+        list(self.db_ops.iter_all_data())
+        summary = metrics.summary()
+        for name in ("db_save_data_seconds", "db_fetch_data_seconds",
+                     "db_iter_all_data_seconds"):
+            self.assertEqual(summary["histograms"][name]["count"], 1, name)
+        self.assertEqual(summary["counters"]["db_rows_inserted"], 1)
+
+        self.db_ops.update_data({"2024-11-01": {"Max": 9.0, "Min": -0.3, "Mean": 4.4}})
+        self.assertEqual(metrics.summary()["counters"]["db_rows_updated"], 1)
+
+    def test_exports(self):
+        metrics.increment("pages", 2)
+        metrics.observe("parse_seconds", 0.003)
+        metrics.observe("parse_seconds", 2.0)
+        metrics.write_reports(self.temp_dir.name)
+
+        with open(os.path.join(self.temp_dir.name, "metrics.prom"), encoding="utf-8") as f:
+            text = f.read()
+        self.assertIn("# TYPE weatherinsight_pages counter\nweatherinsight_pages 2\n", text)
+        self.assertIn('weatherinsight_parse_seconds_bucket{le="0.005"} 1\n', text)
+        self.assertIn('weatherinsight_parse_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn("weatherinsight_parse_seconds_count 2\n", text)
+
+        with open(os.path.join(self.temp_dir.name, "metrics.json"), encoding="utf-8") as f:
+            histogram = json.load(f)["histograms"]["parse_seconds"]
+        self.assertEqual(histogram["max"], 2.0)
+
+    def test_profile_writes_stats(self):
+        path = os.path.join(self.temp_dir.name, "call.prof")
+        with metrics.profile(path):
+            sorted(range(1000), reverse=True)
+        self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from plot_cache import PlotCache, plot_key
+
+
+class TestPlotCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = PlotCache(self.temp_dir.name, max_bytes=1000)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_changes_with_data_version(self):
+        key = plot_key("line", {"year": 2024, "month": 1}, "Winnipeg", 3)
+        self.assertEqual(key, plot_key("line", {"month": 1, "year": 2024}, "Winnipeg", 3))
+        self.assertNotEqual(key, plot_key("line", {"year": 2024, "month": 1}, "Winnipeg", 4))
+        self.assertNotEqual(key, plot_key("line", {"year": 2024, "month": 1}, "Brandon", 3))
+
+    def test_put_and_get(self):
+        key = plot_key("box", {"year_range": [2020, 2024]}, "Winnipeg", 1)
+        self.assertIsNone(self.cache.get(key))
+        path = self.cache.put(key, b"image")
+        self.assertEqual(self.cache.get(key), path)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"image")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        keys = [plot_key("line", {"month": month}, "Winnipeg", 1) for month in range(3)]
+        for number, key in enumerate(keys[:2]):
+            path = self.cache.put(key, b"x" * 400)
+            os.utime(path, ns=(number, number))
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], b"x" * 400)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        self.assertLessEqual(self.cache.total_bytes, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
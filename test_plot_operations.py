@@ -0,0 +1,71 @@
+import io
+import unittest
+from unittest import mock
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib import cbook
+from plot_operations import PlotOperations, label_numbers
+
+
+class TestPlotOperations(unittest.TestCase):
+    def setUp(self):
+        self.plot_ops = PlotOperations()
+        self.raw_data = [("01", -7.9), ("02", -7.1), ("01", -20.5), ("12", None),
+                         ("02", 1.0), ("01", 3.0)]
+
+    def test_rows_to_arrays(self):
+        labels, temps = self.plot_ops.rows_to_arrays(self.raw_data)
+        self.assertEqual(labels.tolist(), [1, 2, 1, 12, 2, 1])
+        self.assertTrue(np.isnan(temps[3]))
+        self.assertEqual(len(self.plot_ops.rows_to_arrays([])[0]), 0)
+
+    def test_label_numbers(self):
+        self.assertEqual(label_numbers(["1", "12", "03", "31"]).tolist(), [1, 12, 3, 31])
+        self.assertEqual(label_numbers(np.array([4, 5])).tolist(), [4, 5])
+        with self.assertRaises(ValueError):
+            label_numbers(["1a"])
+
+    def test_array_grouping_matches_record_loop(self):
+        grouped = self.plot_ops.prepare_boxplot_arrays(*self.plot_ops.rows_to_arrays(
+            [record for record in self.raw_data if record[1] is not None]))
+        expected = self.plot_ops.prepare_boxplot_data(
+            [record for record in self.raw_data if record[1] is not None])
+        self.assertEqual({month: values.tolist() for month, values in grouped.items()},
+                         {month: sorted(values) for month, values in expected.items()})
+
+    def test_nan_only_month_is_dropped(self):
+        grouped = self.plot_ops.prepare_boxplot_arrays(*self.plot_ops.rows_to_arrays(
+            self.raw_data))
+        self.assertEqual(sorted(grouped), [1, 2])
+
+    def test_boxplot_stats_match_matplotlib(self):
+        rng = np.random.default_rng(7)
+        for values in (np.array([4.0]), rng.normal(0, 5, 31),
+                       np.concatenate((rng.normal(0, 5, 500), [35.0, -40.0]))):
+            values = np.sort(values)
+            stats = self.plot_ops.boxplot_stats(values)
+            expected = cbook.boxplot_stats(values)[0]
+            for key in ("med", "q1", "q3", "whislo", "whishi", "mean"):
+                self.assertAlmostEqual(stats[key], expected[key])
+            self.assertEqual(sorted(stats["fliers"]), sorted(expected["fliers"]))
+
+    def test_generate_boxplot_draws_precomputed_boxes(self):
+        with mock.patch("matplotlib.axes.Axes.bxp") as bxp, \
+                mock.patch("matplotlib.pyplot.show"):
+            self.plot_ops.generate_boxplot(self.raw_data, year_range=(2020, 2024))
+        stats = bxp.call_args[0][0]
+        self.assertEqual([box["label"] for box in stats], ["1", "2"])
+
+    def test_saved_image_can_be_shown_again(self):
+        image = io.BytesIO()
+        with mock.patch("matplotlib.pyplot.show"):
+            self.plot_ops.generate_lineplot([("01", -7.9), ("02", -7.1)], 2024, 1,
+                                            save_to=image)
+            image.seek(0)
+            self.plot_ops.show_image(image)
+        self.assertTrue(image.getvalue().startswith(b"\x89PNG"))
+
+
+if __name__ == "__main__":
+    unittest.main()
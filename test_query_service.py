@@ -0,0 +1,97 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from dbcm import DBCM
+from query_service import ResultCache, start_query_service
+from test_support import TempDatabaseTestCase
+
+
+class TestQueryService(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db_ops.save_data({
+            "2024-01-01": {"Max": -5.0, "Min": -15.0, "Mean": -10.0},
+            "2024-01-02": {"Max": -3.0, "Min": -11.0, "Mean": -7.0},
+            "2024-02-01": {"Max": 1.0, "Min": -9.0, "Mean": -4.0},
+        })
+        self.service = start_query_service(self.db_ops)
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.service.server_close()
+
+    def get(self, path):
+        with urllib.request.urlopen(self.service.base_url + path, timeout=5) as response:
+            return json.loads(response.read())
+
+    def test_lineplot_and_boxplot(self):
+        line = self.get("/lineplot?year=2024&month=1")
+        self.assertEqual((line["days"], line["mean"]), ([1, 2], [-10.0, -7.0]))
+
+        box = self.get("/boxplot?start_year=2024&end_year=2024")
+        self.assertEqual([month["month"] for month in box["months"]], [1, 2])
+        self.assertEqual(box["months"][0]["count"], 2)
+        self.assertEqual(box["months"][0]["med"], -8.5)
+
+    def test_raw_rows_are_streamed(self):
+        rows = self.get("/raw?location=Winnipeg&start_year=2024&end_year=2024")
+        self.assertEqual(sorted(row["sample_date"] for row in rows),
+                         ["2024-01-01", "2024-01-02", "2024-02-01"])
+        self.assertEqual(self.get("/raw?location=Brandon"), [])
+
+    def test_cache_is_invalidated_by_writes(self):
+        self.get("/lineplot?year=2024&month=1")
+        self.get("/lineplot?year=2024&month=1")
+        self.assertEqual(self.service.cache.hits, 1)
+
+        self.db_ops.save_data({"2024-01-03": {"Max": 0.0, "Min": -4.0, "Mean": -2.0}})
+        line = self.get("/lineplot?year=2024&month=1")
+        self.assertEqual(line["days"], [1, 2, 3])
+
+    def test_bad_requests(self):
+        for path, status in (("/lineplot?year=2024", 400), ("/lineplot?year=x&month=1", 400),
+                             ("/nothing", 404)):
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                self.get(path)
+            self.assertEqual(context.exception.code, status, path)
+
+    def test_query_errors_are_a_clean_500(self):
+        with DBCM(self.db_ops.db_name) as cursor:
+            cursor.execute("DROP TABLE weather")
+        for path in ("/raw", "/lineplot?year=2024&month=1", "/lineplot?year=2024&month=1"):
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                self.get(path)
+            self.assertEqual(context.exception.code, 500, path)
+            self.assertIn("Database error", json.loads(context.exception.read())["error"])
+        self.assertEqual(self.service.cache.hits, 0)
+
+    def test_concurrent_clients(self):
+        results = []
+
+        def client():
+            results.append(self.get("/boxplot?start_year=2024&end_year=2024"))
+
+        threads = [threading.Thread(target=client) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_result_cache_evicts_least_recently_used(self):
+        cache = ResultCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.get(key, 1)
+            cache.put(key, 1, key.encode())
+        cache.get("a", 1)
+        cache.put("c", 1, b"c")
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("a", 1), b"a")
+        self.assertIsNone(cache.get("a", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
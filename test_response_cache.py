@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock
+from http_pool import HTTPConnectionPool
+from response_cache import ResponseCache
+from scrape_weather import WeatherScraper, scrape_weather_data
+from benchmarks.standin_server import start_standin_server
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.temp_dir.name, today=lambda: date(2024, 6, 15))
+        self.server = start_standin_server()
+        self.pool = HTTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def scrape(self):
+        return scrape_weather_data(2024, 2024, 27174, pool=self.pool,
+                                   base_url=self.server.base_url, cache=self.cache)
+
+    def test_closed_months_replay_and_open_months_revalidate(self):
+        first = self.scrape()
+        self.assertEqual(self.cache.misses, 12)
+        self.assertEqual(self.server.request_count, 12)
+
+        second = self.scrape()
+        self.assertEqual(second, first)
+        # January-April are closed; May-December are revalidated and come back 304.
+        self.assertEqual(self.cache.hits, 4)
+        self.assertEqual(self.cache.revalidated, 8)
+        self.assertEqual(self.server.request_count, 20)
+
+    def test_is_closed(self):
+        self.assertTrue(self.cache.is_closed(2024, 4))
+        self.assertFalse(self.cache.is_closed(2024, 5))
+        self.assertFalse(self.cache.is_closed(2024, 6))
+        january = ResponseCache(self.temp_dir.name, today=lambda: date(2025, 1, 3))
+        self.assertTrue(january.is_closed(2024, 11))
+        self.assertFalse(january.is_closed(2024, 12))
+
+    def test_page_stored_while_open_is_revalidated(self):
+        self.scrape()
+        # April's page was stored on April 20th, while the month was still open.
+        _, meta_path = self.cache._paths(27174, 2024, 4)  # pylint: disable=protected-access
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["stored_at"] = datetime(2024, 4, 20).timestamp()
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        entry = self.cache.get(27174, 2024, 4)
+        self.assertFalse(self.cache.is_final(entry, 2024, 4))
+
+        self.scrape()
+        # January-March are replayed; April is revalidated along with May-December.
+        self.assertEqual(self.cache.hits, 3)
+        self.assertEqual(self.cache.revalidated, 9)
+        # The 304 confirmed the page after the grace period, so it is final now.
+        self.assertTrue(self.cache.is_final(self.cache.get(27174, 2024, 4), 2024, 4))
+
+    def test_only_200_pages_are_stored(self):
+        pool = MagicMock()
+        pool.request.return_value = MagicMock(status=203, body=b"<p>Partial</p>", headers={})
+        WeatherScraper(pool=pool, cache=self.cache).fetch_and_parse(2024, 1, 27174)
+
+        self.assertEqual(self.cache.misses, 1)
+        self.assertIsNone(self.cache.get(27174, 2024, 1))
+
+    def test_size_based_eviction(self):
+        cache = ResponseCache(self.temp_dir.name, max_bytes=6000)
+        for month in range(1, 13):
+            cache.put(27174, 2000, month, os.urandom(900).hex())
+
+        self.assertLessEqual(cache.total_bytes, 6000)
+        self.assertIsNone(cache.get(27174, 2000, 1))
+        self.assertIsNotNone(cache.get(27174, 2000, 12))
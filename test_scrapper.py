@@ -1,37 +1,91 @@
+import os
+import re
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 from scrape_weather import WeatherScraper
 
+MOCK_HTML = """
+<table class="table table-striped">
+    <tbody>
+        <tr>
+            <th scope="row"><abbr title="November 1, 2024">01</abbr></th>
+            <td>8.0</td>
+            <td>-0.3</td>
+            <td>3.9</td>
+        </tr>
+        <tr>
+            <th scope="row"><abbr title="November 2, 2024">02</abbr></th>
+            <td>9.6</td>
+            <td>-4.5</td>
+            <td>2.5</td>
+        </tr>
+    </tbody>
+</table>
+"""
+
+
+def mock_pool(html):
+    pool = MagicMock()
+    pool.request.return_value = MagicMock(status=200, body=html.encode("utf-8"), headers={})
+    return pool
+
+
 class TestWeatherScraper(unittest.TestCase):
     def setUp(self):
-        self.scraper = WeatherScraper()
-
-    @patch("urllib.request.urlopen")
-    def test_scrape_valid_html(self, mock_urlopen):
-        # Mock HTML response
-        mock_html = """
-        <table class="data-table">
-            <tbody>
-                <tr>
-                    <th>2024-11-01</th>
-                    <td>8.0</td>
-                    <td>-0.3</td>
-                    <td>3.9</td>
-                </tr>
-            </tbody>
-        </table>
-        """
-        mock_response = MagicMock()
-        mock_response.read.return_value = mock_html.encode("utf-8")
-        mock_urlopen.return_value = mock_response
-
-        # Call scraper
-        url = "http://example.com"
-        self.scraper.fetch_data(url)
-
-        # Debugging prints
-        print(f"Scraped data: {self.scraper.data}")
-
-        # Assert that data was scraped correctly
-        self.assertIn("2024-11-01", self.scraper.data)
-        self.assertEqual(self.scraper.data["2024-11-01"], {"Max": 8.0, "Min": -0.3, "Mean": 3.9})
+        self.pool = mock_pool(MOCK_HTML)
+        self.scraper = WeatherScraper(pool=self.pool)
+
+    def test_scrape_valid_html(self):
+        self.scraper.fetch_and_parse(2024, 11, 27174)
+
+        self.pool.request.assert_called_once()
+        self.assertIn("Year=2024", self.pool.request.call_args[0][0])
+        self.assertIsNone(self.scraper.error)
+        self.assertIn("2024-11-01", self.scraper.weather_data)
+        self.assertEqual(self.scraper.weather_data["2024-11-01"],
+                         {"Max": 8.0, "Min": -0.3, "Mean": 3.9})
+
+
+class TestFastParser(unittest.TestCase):
+    FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures")
+
+    def parse_both(self, content):
+        fast = WeatherScraper(fast_parse=True)
+        fast.parse_page(content, 2024, 3)
+        slow = WeatherScraper(fast_parse=False)
+        slow.parse_page(content, 2024, 3)
+        return fast, slow
+
+    def test_fixture_pages_match_htmlparser(self):
+        for name in sorted(os.listdir(self.FIXTURES)):
+            with open(os.path.join(self.FIXTURES, name), encoding="utf-8") as f:
+                content = f.read()
+            fast, slow = self.parse_both(content)
+            self.assertTrue(slow.weather_data, name)
+            self.assertEqual(fast.weather_data, slow.weather_data, name)
+
+    def test_fast_path_handles_flags_entities_and_summary_rows(self):
+        with open(os.path.join(self.FIXTURES, "daily_data_edge_cases.html"),
+                  encoding="utf-8") as f:
+            content = f.read()
+        # Without the comment and script the page takes the fast path.
+        content = re.sub(r"<!--.*?-->|<script>.*?</script>", "", content)
+        scraper = WeatherScraper()
+        scraper.current_year, scraper.current_month = 2024, 3
+        self.assertTrue(scraper.parse_tbody(content))
+
+        fast, slow = self.parse_both(content)
+        self.assertEqual(fast.weather_data, slow.weather_data)
+        self.assertEqual(fast.weather_data["2024-03-01"], {"Max": 2.5, "Min": -6.1, "Mean": -1.8})
+
+    def test_falls_back_when_tbody_is_hidden(self):
+        content = "<!-- <tbody><tr><td>01</td></tr></tbody> --><p>No data</p>"
+        self.assertFalse(WeatherScraper().parse_tbody(content))
+        self.assertFalse(WeatherScraper().parse_tbody("<table><tr><td>01</td></tr></table>"))
+
+    def test_falls_back_on_unterminated_hidden_markup(self):
+        for opener in ("<!-- ", "<script>", "<![CDATA[ "):
+            content = opener + MOCK_HTML
+            self.assertFalse(WeatherScraper().parse_tbody(content), opener)
+            fast, slow = self.parse_both(content)
+            self.assertEqual(fast.weather_data, slow.weather_data, opener)
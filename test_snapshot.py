@@ -0,0 +1,57 @@
+import importlib.util
+import os
+import unittest
+from snapshot import export_snapshot, import_snapshot, load_snapshot
+from test_support import TempDatabaseTestCase
+
+
+class TestSnapshot(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.db_ops
+        self.source.add_station(51097, "Brandon", 2012)
+        self.source.save_data({
+            "1999-12-31": {"Max": -10.0, "Min": -20.0, "Mean": -15.0},
+            "2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 3.9},
+            "2024-11-02": {"Max": 9.6, "Min": None, "Mean": None},
+        })
+        self.source.save_data({"2024-11-01": {"Max": 1.0, "Min": -1.0, "Mean": 0.0}},
+                              location="Brandon")
+        self.target = self.open_database("target.db")
+
+    def stored(self, db_ops):
+        return sorted(row[1:] for row in db_ops.fetch_all_data())
+
+    def round_trip(self, file_name):
+        path = os.path.join(self.temp_dir.name, file_name)
+        self.assertEqual(export_snapshot(self.source, path), 4)
+        counts = import_snapshot(self.target, path)
+        self.assertEqual(counts, {"inserted": 4, "updated": 0, "unchanged": 0})
+        self.assertEqual(self.stored(self.target), self.stored(self.source))
+        self.assertEqual(import_snapshot(self.target, path)["unchanged"], 4)
+
+    def test_npz_round_trip(self):
+        self.round_trip("weather.npz")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow")
+                         or importlib.util.find_spec("fastparquet"), "no Parquet engine")
+    def test_parquet_round_trip(self):
+        self.round_trip("weather.parquet")
+
+    def test_export_filters_by_station_and_year(self):
+        path = os.path.join(self.temp_dir.name, "brandon.snapshot")
+        self.assertEqual(export_snapshot(self.source, path, station_ids=[51097]), 1)
+        self.assertEqual(load_snapshot(path)["location"].tolist(), ["Brandon"])
+
+        self.assertEqual(export_snapshot(self.source, path, station_ids=[27174],
+                                         year_range=(2024, 2024), compress=False), 2)
+        columns = load_snapshot(path)
+        self.assertEqual(str(columns["sample_date"].dtype), "datetime64[D]")
+        self.assertEqual(columns["max_temp"].tolist(), [8.0, 9.6])
+
+        with self.assertRaises(ValueError):
+            export_snapshot(self.source, path, station_ids=[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,13 @@
+import unittest
+from benchmarks.bench_startup import STARTUP_BUDGET_MS, deferred_imports, measure_startup
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_stays_within_budget(self):
+        total, times = measure_startup(runs=3)
+        self.assertEqual(deferred_imports(times), [])
+        self.assertLess(total, STARTUP_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+from db_operations import DBOperations
+from dbcm import close_pool
+
+
+class TempDatabaseTestCase(unittest.TestCase):
+    """
+    Base class of tests that use a database in a temporary directory. setUp opens
+    self.db_ops on weather.db, initialized unless initialize is False. After tearDown,
+    the pools of every database opened here are closed and the directory is removed.
+    """
+    initialize = True
+
+    def setUp(self):
+        # DBOperations opens a file per connection, so use a throwaway file, not :memory:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.db_ops = self.open_database("weather.db", self.initialize)
+
+    def open_database(self, file_name, initialize=True):
+        db_ops = DBOperations(os.path.join(self.temp_dir.name, file_name))
+        # Cleanups run last in, first out, so the pool closes before the directory goes.
+        self.addCleanup(close_pool, db_ops.db_name)
+        if initialize:
+            db_ops.initialize_db()
+        return db_ops
@@ -0,0 +1,36 @@
+from datetime import date
+from test_support import TempDatabaseTestCase
+from update_planner import plan_update, plan_missing_months
+
+
+class TestUpdatePlanner(TempDatabaseTestCase):
+    initialize = False
+
+    def test_nightly_update_fetches_current_month_only(self):
+        counts = {(2024, 11): 30, (2024, 12): 8}
+        pages = plan_update("2024-12-08", counts, today=date(2024, 12, 10))
+        self.assertEqual(pages, [(2024, 12)])
+
+    def test_current_month_stored_through_yesterday_is_up_to_date(self):
+        counts = {(2024, 11): 30, (2024, 12): 9}
+        self.assertEqual(plan_update("2024-12-09", counts, today=date(2024, 12, 10)), [])
+
+    def test_first_of_month_refetches_previous_month(self):
+        counts = {(2024, 11): 29}
+        pages = plan_update("2024-11-29", counts, today=date(2024, 12, 1))
+        self.assertEqual(pages, [(2024, 11)])
+
+    def test_complete_months_and_future_months_are_skipped(self):
+        counts = {(2023, 12): 31}
+        pages = plan_update("2023-12-31", counts, today=date(2024, 3, 5))
+        self.assertEqual(pages, [(2024, 1), (2024, 2), (2024, 3)])
+
+    def test_plan_from_database(self):
+        self.db_ops.initialize_db()
+        self.db_ops.save_data({f"2024-02-{day:02d}": {"Max": 1.0, "Min": -1.0, "Mean": 0.0}
+                               for day in range(1, 30)})
+        self.db_ops.save_data({"2024-03-01": {"Max": 1.0, "Min": -1.0, "Mean": 0.0}})
+
+        self.assertEqual(self.db_ops.get_month_counts(since="2024-03-01"), {(2024, 3): 1})
+        self.assertEqual(plan_missing_months(self.db_ops, today=date(2024, 3, 3)), [(2024, 3)])
+        self.assertIsNone(plan_missing_months(self.db_ops, location="Brandon"))
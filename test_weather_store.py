@@ -0,0 +1,95 @@
+import unittest
+from test_support import TempDatabaseTestCase
+from weather_store import WeatherStore
+
+
+class TestWeatherStore(TempDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db_ops.save_data({
+            "1872-06-01": {"Max": 20.0, "Min": 10.0, "Mean": 15.0},
+            "2023-11-05": {"Max": 2.0, "Min": -6.0, "Mean": -2.0},
+            "2024-11-02": {"Max": 9.6, "Min": -4.5, "Mean": 2.5},
+            "2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 3.9},
+            "2024-12-01": {"Max": -3.0, "Min": None, "Mean": None},
+        })
+        self.db_ops.save_data({"2024-11-01": {"Max": 1.0, "Min": -1.0, "Mean": 0.0}},
+                              location="Brandon")
+        self.store = WeatherStore(self.db_ops).load()
+
+    def tearDown(self):
+        self.store.close()
+
+    def assert_matches_database(self):
+        for options in ({"filter_type": "raw"},
+                        {"filter_type": "boxplot", "year_range": (2023, 2024)},
+                        {"filter_type": "boxplot", "year_range": (1800, 2100)},
+                        {"filter_type": "lineplot", "year": 1872, "month": 6},
+                        {"filter_type": "boxplot", "year_range": ("2024", "2024"),
+                         "location": "Brandon"},
+                        {"filter_type": "lineplot", "year": 2024, "month": 11},
+                        {"filter_type": "lineplot", "year": "2024", "month": "12"}):
+            expected = self.db_ops.fetch_data(**options)
+            if options["filter_type"] == "boxplot":
+                expected = sorted(expected)
+                self.assertEqual(sorted(self.store.query(**options)), expected)
+            else:
+                self.assertEqual(self.store.query(**options), expected)
+
+    def test_load_matches_fetch_data(self):
+        self.assertEqual(len(self.store), 6)
+        self.assert_matches_database()
+
+    def test_follows_writes(self):
+        self.db_ops.save_data({"2024-11-03": {"Max": 5.0, "Min": 0.0, "Mean": 2.5}})
+        self.db_ops.update_data({"2024-11-01": {"Max": 8.0, "Min": -0.3, "Mean": 1.0}})
+        self.db_ops.upsert_data({"2025-01-01": {"Max": -20.0, "Min": -30.0, "Mean": -25.0}},
+                                location="Thompson")
+        self.assertEqual(len(self.store), 8)
+        self.assert_matches_database()
+        self.assertEqual(self.store.query(filter_type="lineplot", year=2025, month=1,
+                                          location="Thompson"), [("01", -25.0)])
+
+        self.db_ops.purge_data()
+        self.assertEqual(self.store.query(), [])
+
+    def test_writes_are_applied_on_the_next_query(self):
+        reads = []
+        fetch_rows = self.db_ops.fetch_rows
+        self.db_ops.fetch_rows = lambda *args: reads.append(args) or fetch_rows(*args)
+        for day in range(3, 13):
+            self.db_ops.save_data({f"2024-11-{day:02d}": {"Max": 5.0, "Min": 0.0,
+                                                          "Mean": 2.5}})
+        self.assertEqual(reads, [])
+
+        self.assertEqual(len(self.store), 16)
+        self.assertEqual(reads, [("Winnipeg", (2024, 2024))])
+        self.assert_matches_database()
+
+        self.db_ops.purge_data()
+        self.db_ops.save_data({"2023-01-01": {"Max": 1.0, "Min": -1.0, "Mean": 0.0}})
+        self.assertEqual(self.store.query(), self.db_ops.fetch_data())
+
+    def test_write_during_load_is_applied(self):
+        self.store.close()
+        iter_all_data = self.db_ops.iter_all_data
+
+        def read_then_write(*args, **kwargs):
+            yield from iter_all_data(*args, **kwargs)
+            self.db_ops.save_data({"2024-11-03": {"Max": 5.0, "Min": 0.0, "Mean": 2.5}})
+
+        self.db_ops.iter_all_data = read_then_write
+        self.store = WeatherStore(self.db_ops).load()
+        self.assertEqual(len(self.store), 7)
+        self.assert_matches_database()
+
+    def test_select_returns_typed_columns(self):
+        selected = self.store.select(year_range=(2024, 2024))
+        self.assertEqual(selected["day"].tolist(), [1, 2, 1])
+        self.assertEqual(selected["month"].tolist(), [11, 11, 12])
+        self.assertEqual(selected["mean"].dtype.name, "float64")
+        self.assertEqual(len(self.store.select(location="Nowhere")["id"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+'''
+update_planner.py
+
+Description: Works out which month pages an incremental update still has to fetch.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.1
+'''
+
+import calendar
+from datetime import date, datetime
+
+
+def plan_update(latest_date, month_counts, today=None):
+    '''
+    Compute the (year, month) pages that are missing or incomplete, from the month of
+    the latest stored date up to the current month. A past month is complete when
+    every day is stored; the current month is complete once yesterday is stored, since
+    today's row is not published until the day is over.
+
+    :param latest_date: Latest stored date (date or YYYY-MM-DD string).
+    :param month_counts: Dictionary mapping (year, month) to the number of stored days.
+    :param today: Today's date. Default is date.today().
+    :return: Sorted list of (year, month) tuples to fetch.
+    '''
+    if isinstance(latest_date, str):
+        latest_date = datetime.strptime(latest_date, "%Y-%m-%d").date()
+    today = today or date.today()
+
+    pages = []
+    year, month = latest_date.year, latest_date.month
+    while (year, month) <= (today.year, today.month):
+        if (year, month) == (today.year, today.month):
+            expected = today.day - 1
+        else:
+            expected = calendar.monthrange(year, month)[1]
+        if month_counts.get((year, month), 0) < expected:
+            pages.append((year, month))
+        year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+    return pages
+
+
+def plan_missing_months(db_ops, location="Winnipeg", today=None):
+    '''
+    Plan an incremental update for a location from what is already in the database.
+
+    :param db_ops: DBOperations instance.
+    :param location: Location name (default: Winnipeg)
+    :param today: Today's date. Default is date.today().
+    :return: Sorted list of (year, month) tuples to fetch, or None if nothing is stored.
+    '''
+    latest_date = db_ops.get_latest_date(location)
+    if not latest_date:
+        return None
+    month_counts = db_ops.get_month_counts(location, since=latest_date)
+    return plan_update(latest_date, month_counts, today)
@@ -3,17 +3,23 @@ weather_processor.py
 Description: Combined script for managing and visualizing weather data via a GUI.
 Author: Phillip Bridgeman
 Date: December 3, 2024
-Last Modified: December 3, 2024
-Version: 2.0
+Last Modified: October 17, 2026
+Version: 2.7
 Copyright: (c) 2024 Phillip Bridgeman
 """
 
+import io
+import sqlite3
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import date, datetime
-from scrape_weather import scrape_weather_data
+from datetime import date
+from background_tasks import POLL_INTERVAL_MS, TaskRunner
 from db_operations import DBOperations
-from plot_operations import PlotOperations
+from plot_cache import plot_key
+
+# The scraper, plotting (matplotlib, NumPy) and cache modules are imported on first use,
+# so the window can appear before they load.
 
 
 class WeatherProcessor:
@@ -25,11 +31,55 @@ class WeatherProcessor:
         """Initialize the WeatherApp class."""
         self.root = main_root
         self.db_ops = DBOperations()
-        self.plot_ops = PlotOperations()
-
-        self.db_ops.initialize_db()
+        self.plot_ops = None
+        self.response_cache = None
+        self.plot_cache = None
+        self.weather_store = None
+        self.tasks = TaskRunner()
+        self.task_handlers = None
+        self.database_ready = threading.Event()
+        self.database_error = None
 
         self.setup_ui()
+        # Create or migrate the tables in the background once the window is up.
+        threading.Thread(target=self.initialize_database, name="weather-db-init",
+                         daemon=True).start()
+
+    def initialize_database(self):
+        """Run DBOperations.initialize_db and signal database_ready, even on failure."""
+        try:
+            self.db_ops.initialize_db()
+        except sqlite3.Error as e:
+            self.database_error = e
+        finally:
+            self.database_ready.set()
+
+    def wait_for_database(self):
+        """Block until the database is initialized; raise its error if it failed."""
+        self.database_ready.wait()
+        if self.database_error is not None:
+            raise ValueError(f"Database could not be opened: {self.database_error}")
+
+    def get_plot_ops(self):
+        """Import the plotting layer (matplotlib) on first use."""
+        if self.plot_ops is None:
+            from plot_operations import PlotOperations  # pylint: disable=import-outside-toplevel
+            self.plot_ops = PlotOperations()
+        return self.plot_ops
+
+    def get_response_cache(self):
+        """Open the scraper's response cache on first use."""
+        if self.response_cache is None:
+            from response_cache import ResponseCache  # pylint: disable=import-outside-toplevel
+            self.response_cache = ResponseCache()
+        return self.response_cache
+
+    def get_plot_cache(self):
+        """Open the rendered plot cache on first use."""
+        if self.plot_cache is None:
+            from plot_cache import PlotCache  # pylint: disable=import-outside-toplevel
+            self.plot_cache = PlotCache()
+        return self.plot_cache
 
     def setup_ui(self):
         """Setup the main GUI layout."""
@@ -37,63 +87,155 @@ class WeatherProcessor:
         self.root.geometry("800x600")
         frame = tk.Frame(self.root)
         frame.pack(fill="both", expand=True, padx=20, pady=20)
-        tk.Button(frame, text="Download Full Data", command=self.download_data).pack(pady=10)
-        tk.Button(frame, text="Update Data", command=self.update_data).pack(pady=10)
+        self.task_buttons = [
+            tk.Button(frame, text="Download Full Data", command=self.download_data),
+            tk.Button(frame, text="Update Data", command=self.update_data),
+        ]
+        for button in self.task_buttons:
+            button.pack(pady=10)
+        self.cancel_button = tk.Button(frame, text="Cancel", command=self.cancel_task,
+                                       state="disabled")
+        self.cancel_button.pack(pady=10)
         tk.Button(frame, text="Generate Box Plot", command=self.generate_box_plot_gui).pack(pady=10)
         tk.Button(frame, text="Generate Line Plot", command=self.generate_line_plot_gui
                   ).pack(pady=10)
-        tk.Button(frame, text="Exit", command=self.root.quit).pack(pady=10)
+        tk.Button(frame, text="Exit", command=self.exit).pack(pady=10)
+        self.root.protocol("WM_DELETE_WINDOW", self.exit)
 
         self.status_label = tk.Label(frame, text="Status: Ready")
         self.status_label.pack(pady=10)
 
     def download_data(self):
         """Download the full weather dataset for a predefined range of years."""
-        try:
-            self.status_label.config(text="Status: Downloading data...")
-            current_year = date.today().year
-            weather_data = scrape_weather_data(start_year=2020,
-                                               end_year=current_year,
-                                               station_id=27174,
-                                               debug=False)
-            self.db_ops.save_data(weather_data)
-            self.status_label.config(text="Status: Data downloaded successfully!")
-            messagebox.showinfo("Success", "Data downloaded and saved successfully!")
-        except (ConnectionError, ValueError) as e:
-            self.status_label.config(text="Status: Error downloading data.")
-            messagebox.showerror("Error", f"An error occurred: {e}")
+        self.start_task("Downloading data", self.run_download, self.download_finished,
+                        "Error downloading data.")
+
+    def run_download(self, progress, cancel_event):
+        """Run the resumable backfill up to the current year. Runs in the background."""
+        from backfill import run_backfill  # pylint: disable=import-outside-toplevel
+        self.wait_for_database()
+        return run_backfill(self.db_ops,
+                            end_year=date.today().year,
+                            debug=False,
+                            cache=self.get_response_cache(),
+                            progress=progress,
+                            cancel_event=cancel_event)
+
+    def download_finished(self, result):
+        """Report a finished download."""
+        if result["cancelled"]:
+            self.status_label.config(
+                text="Status: Download cancelled. Download again to resume.")
+            return
+        self.status_label.config(text="Status: Data downloaded successfully!")
+        messagebox.showinfo("Success", "Data downloaded and saved successfully!")
 
     def update_data(self):
-        """Update weather data from the latest available date to today."""
-        try:
-            self.status_label.config(text="Status: Updating data...")
-            last_date = self.db_ops.get_latest_date()
-            if not last_date:
-                self.status_label.config(
-                    text="Status: No data found. Please download the full dataset first."
-                    )
-                messagebox.showwarning("Warning",
-                                       "No data found. Please download the full dataset first."
-                                       )
-                return
+        """Update weather data for every registered station from its latest date to today."""
+        self.start_task("Updating data", self.run_update, self.update_finished,
+                        "Error updating data.")
 
-            last_date = datetime.strptime(last_date, "%Y-%m-%d").date()
-            current_date = date.today()
-            if last_date >= current_date:
-                self.status_label.config(text="Status: Data is already up to date.")
-                messagebox.showinfo("Info", "Weather data is already up to date.")
-                return
+    def run_update(self, progress, cancel_event):
+        """
+        Plan and scrape the missing months of every station. Runs in the background.
+        :return: Pipeline result, or "no_data" / "up_to_date" if nothing was scraped.
+        """
+        # pylint: disable=import-outside-toplevel
+        from ingest_pipeline import scrape_stations
+        from update_planner import plan_missing_months
+        self.wait_for_database()
+        stations = self.db_ops.get_stations()
+        current_date = date.today()
+        plans = {}
+        for station_id, location, _, _ in stations:
+            pages = plan_missing_months(self.db_ops, location=location, today=current_date)
+            if pages is not None:
+                plans[station_id] = pages
+        if not plans:
+            return "no_data"
+        if not any(plans.values()):
+            return "up_to_date"
+        return scrape_stations(stations,
+                               db_ops=self.db_ops,
+                               months=plans,
+                               debug=False,
+                               cache=self.get_response_cache(),
+                               progress=progress,
+                               cancel_event=cancel_event)
 
-            weather_data = scrape_weather_data(start_year=last_date.year,
-                                               end_year=current_date.year,
-                                               station_id=27174,
-                                               debug=False)
-            self.db_ops.save_data(weather_data)
+    def update_finished(self, result):
+        """Report a finished update."""
+        if result == "no_data":
+            self.status_label.config(
+                text="Status: No data found. Please download the full dataset first."
+                )
+            messagebox.showwarning("Warning",
+                                   "No data found. Please download the full dataset first."
+                                   )
+        elif result == "up_to_date":
+            self.status_label.config(text="Status: Data is already up to date.")
+            messagebox.showinfo("Info", "Weather data is already up to date.")
+        elif result["cancelled"]:
+            self.status_label.config(text="Status: Update cancelled.")
+        else:
             self.status_label.config(text="Status: Data updated successfully!")
             messagebox.showinfo("Success", "Weather data updated successfully!")
-        except (ConnectionError, ValueError) as e:
-            self.status_label.config(text="Status: Error updating data.")
-            messagebox.showerror("Error", f"An error occurred: {e}")
+
+    def start_task(self, label, task, on_done, error_status):
+        """
+        Run a long operation on the background runner and poll it from the Tk loop.
+        :param label: Status text shown while the task runs.
+        :param task: Callable run as task(progress, cancel_event) in the background.
+        :param on_done: Called on the Tk thread with the task's result.
+        :param error_status: Status text shown if the task raises.
+        """
+        if self.tasks.busy:
+            messagebox.showinfo("Info", "Another operation is still running.")
+            return
+        self.task_handlers = (label, on_done, error_status)
+        self.status_label.config(text=f"Status: {label}...")
+        self.tasks.submit(label, task)
+        self.set_busy(True)
+        self.root.after(POLL_INTERVAL_MS, self.poll_tasks)
+
+    def poll_tasks(self):
+        """Apply the background task's events on the Tk thread; reschedule while it runs."""
+        label, on_done, error_status = self.task_handlers
+        finished = False
+        for event in self.tasks.poll():
+            if event.kind == "progress":
+                done, total, rows, rate = event.payload
+                months = f"{done}/{total}" if total else f"{done}"
+                self.status_label.config(text=f"Status: {label}... {months} months, "
+                                              f"{rows} rows ({rate:.0f} rows/s)")
+            elif event.kind == "done":
+                finished = True
+                self.set_busy(False)
+                on_done(event.payload)
+            else:
+                finished = True
+                self.set_busy(False)
+                self.status_label.config(text=f"Status: {error_status}")
+                messagebox.showerror("Error", f"An error occurred: {event.payload}")
+        if not finished:
+            self.root.after(POLL_INTERVAL_MS, self.poll_tasks)
+
+    def set_busy(self, busy):
+        """Enable Cancel and disable the data buttons while a task runs, or the reverse."""
+        self.cancel_button.config(state="normal" if busy else "disabled")
+        for button in self.task_buttons:
+            button.config(state="disabled" if busy else "normal")
+
+    def cancel_task(self):
+        """Stop the running download or update after the months already in flight."""
+        self.tasks.cancel()
+        self.cancel_button.config(state="disabled")
+        self.status_label.config(text="Status: Cancelling...")
+
+    def exit(self):
+        """Cancel any running task and close the application."""
+        self.tasks.shutdown()
+        self.root.quit()
 
     def generate_box_plot_gui(self):
         """GUI for generating a box plot."""
@@ -149,15 +291,35 @@ class WeatherProcessor:
 
         tk.Button(plot_window, text="Generate", command=submit).pack(pady=10)
 
+    def cached_plot_key(self, plot_type, params, location="Winnipeg"):
+        """Return the plot cache key of a plot of the current data."""
+        plot_ops = self.get_plot_ops()
+        params = dict(params, figsize=list(plot_ops.figsize), grid=plot_ops.grid)
+        return plot_key(plot_type, params, location, self.db_ops.get_data_version())
+
+    def show_cached_plot(self, key, label):
+        """Show a cached plot image; return False if the plot is not cached."""
+        path = self.get_plot_cache().get(key)
+        if path is None:
+            return False
+        self.status_label.config(text=f"Status: {label} shown from cache.")
+        self.get_plot_ops().show_image(path)
+        return True
+
     def generate_box_plot(self, start_year, end_year):
         """Generate a box plot for the specified year range."""
         try:
             self.status_label.config(text="Status: Generating box plot...")
-            boxplot_data = self.db_ops.fetch_data(filter_type="boxplot",
-                                                  year_range=(start_year, end_year)
-                                                  )
-            if boxplot_data:
-                self.plot_ops.generate_boxplot(boxplot_data, year_range=(start_year, end_year))
+            self.wait_for_database()
+            key = self.cached_plot_key("box", {"year_range": [int(start_year), int(end_year)]})
+            if self.show_cached_plot(key, "Box plot"):
+                return
+            summaries = self.db_ops.fetch_monthly_stats(year_range=(start_year, end_year))
+            if summaries:
+                image = io.BytesIO()
+                self.get_plot_ops().generate_boxplot(None, year_range=(start_year, end_year),
+                                                     summaries=summaries, save_to=image)
+                self.get_plot_cache().put(key, image.getvalue())
                 self.status_label.config(text="Status: Box plot generated successfully!")
             else:
                 self.status_label.config(text="Status: No data for selected range.")
@@ -166,13 +328,41 @@ class WeatherProcessor:
             self.status_label.config(text="Status: Error generating box plot.")
             messagebox.showerror("Error", f"An error occurred: {e}")
 
+    def load_weather_store(self, progress, cancel_event):  # pylint: disable=unused-argument
+        """Load the in-memory weather store; it then follows every write. Runs in the background."""
+        from weather_store import WeatherStore  # pylint: disable=import-outside-toplevel
+        self.wait_for_database()
+        return WeatherStore(self.db_ops).load()
+
     def generate_line_plot(self, year, month):
         """Generate a line plot for the specified month and year."""
         try:
             self.status_label.config(text="Status: Generating line plot...")
-            lineplot_data = self.db_ops.fetch_data(filter_type="lineplot", year=year, month=month)
+            self.wait_for_database()
+            key = self.cached_plot_key("line", {"year": int(year), "month": int(month)})
+            if self.show_cached_plot(key, "Line plot"):
+                return
+            if self.weather_store is None and not self.tasks.busy:
+                # Load the store on the background runner, then draw this plot.
+                def store_loaded(store):
+                    self.weather_store = store
+                    self.generate_line_plot(year, month)
+
+                self.start_task("Loading weather data", self.load_weather_store, store_loaded,
+                                "Error loading weather data.")
+                return
+            if self.weather_store is None:
+                # A download or update holds the runner; read this month from the database.
+                lineplot_data = self.db_ops.fetch_data(filter_type="lineplot", year=year,
+                                                       month=month)
+            else:
+                lineplot_data = self.weather_store.query(filter_type="lineplot", year=year,
+                                                         month=month)
             if lineplot_data:
-                self.plot_ops.generate_lineplot(lineplot_data, year=int(year), month=int(month))
+                image = io.BytesIO()
+                self.get_plot_ops().generate_lineplot(lineplot_data, year=int(year),
+                                                      month=int(month), save_to=image)
+                self.get_plot_cache().put(key, image.getvalue())
                 self.status_label.config(text="Status: Line plot generated successfully!")
             else:
                 self.status_label.config(text="Status: No data for selected month and year.")
@@ -0,0 +1,277 @@
+'''
+weather_store.py
+
+Description: An optional in-memory columnar copy of the weather table. Rows are held in
+typed NumPy arrays and the raw, boxplot and lineplot filters of DBOperations.fetch_data
+are answered with vectorised masks instead of a database round-trip. The store follows
+every DBOperations write through a write listener, so it stays in sync without
+reloading the table: written months are marked dirty and re-read in one pass on the
+next query.
+Author: Phillip Bridgeman
+Date: October 17, 2026
+Last Modified: October 17, 2026
+Version: 1.2
+'''
+
+import threading
+import numpy as np
+
+COLUMN_TYPES = {
+    "key": np.int64,        # sort key, see location_key()
+    "id": np.int64,
+    "date": np.int32,       # days since 1970-01-01
+    "location": np.int32,   # index into WeatherStore.locations
+    "min": np.float64,
+    "max": np.float64,
+    "mean": np.float64,
+    "year": np.int16,
+    "month": np.int8,
+    "day": np.int8,
+}
+# Rows read per batch while loading the table.
+LOAD_BATCH_SIZE = 50000
+# Zero-padded labels, as returned by the month and day columns of fetch_data.
+LABELS = np.array([f"{number:02d}" for number in range(32)])
+
+
+def empty_columns():
+    '''
+    Return a set of empty store columns.
+    '''
+    return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMN_TYPES.items()}
+
+
+def location_key(code, dates):
+    '''
+    Return the sort key of dates (days since 1970-01-01) at a location code. Dates are
+    offset to be non-negative, so pre-1970 days still sort before later ones.
+    '''
+    return (np.int64(code) << 32) + (np.asarray(dates, dtype=np.int64) + 2 ** 31)
+
+
+def date_number(year, month=1):
+    '''
+    Return the first day of a month as days since 1970-01-01.
+    '''
+    first_month = np.datetime64(f"{int(year):04d}-01", "M") + (int(month) - 1)
+    return int(first_month.astype("datetime64[D]").astype(np.int64))
+
+
+def nullable_list(values):
+    '''
+    Convert a float array to a list, turning NaN back into None as SQLite returns it.
+    '''
+    result = values.tolist()
+    if np.isnan(values).any():
+        result = [None if value != value else value for value in result]
+    return result
+
+
+class WeatherStore:  # pylint: disable=too-many-instance-attributes
+    '''
+    WeatherStore keeps the weather table in memory as one NumPy array per column,
+    sorted by location and date, so a query is two binary searches and a slice.
+    Updates build new arrays and swap them in, so readers never see a partial update.
+    '''
+    def __init__(self, db_ops):
+        '''
+        Initialize the WeatherStore class.
+        :param db_ops: DBOperations instance to load from and follow.
+        '''
+        self.db_ops = db_ops
+        self.locations = []
+        self._codes = {}
+        self._columns = empty_columns()
+        self._lock = threading.Lock()
+        # Months written since the last query, by location, and whether the table was
+        # purged since; guarded by _dirty_lock so the write listener never waits on a
+        # refresh.
+        self._dirty = {}
+        self._purged = False
+        self._dirty_lock = threading.Lock()
+        self.loaded = False
+
+    def __len__(self):
+        self._apply_writes()
+        return len(self._columns["id"])
+
+    def _location_code(self, location):
+        code = self._codes.get(location)
+        if code is None:
+            code = self._codes[location] = len(self.locations)
+            self.locations.append(location)
+        return code
+
+    def _build_columns(self, rows, sort=True):
+        '''
+        Build store columns from (id, sample_date, location, min, max, avg) rows.
+        :param sort: If False, leave the columns in row order.
+        '''
+        if not rows:
+            return empty_columns()
+        ids, sample_dates, locations, mins, maxes, means = zip(*rows)
+        days = np.array(sample_dates, dtype="datetime64[D]")
+        months = days.astype("datetime64[M]")
+        month_numbers = months.astype(np.int64)
+        dates = days.astype(np.int64)
+        codes = np.array([self._location_code(location) for location in locations],
+                         dtype=np.int64)
+        day_numbers = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+        keys = location_key(codes, dates)
+        columns = {
+            "key": keys,
+            "id": np.array(ids, dtype=np.int64),
+            "date": dates.astype(np.int32),
+            "location": codes.astype(np.int32),
+            "min": np.array(mins, dtype=np.float64),
+            "max": np.array(maxes, dtype=np.float64),
+            "mean": np.array(means, dtype=np.float64),
+            "year": (month_numbers // 12 + 1970).astype(np.int16),
+            "month": (month_numbers % 12 + 1).astype(np.int8),
+            "day": day_numbers.astype(np.int8),
+        }
+        if not sort:
+            return columns
+        order = np.argsort(keys, kind="stable")
+        return {name: values[order] for name, values in columns.items()}
+
+    def load(self):
+        '''
+        Read the whole weather table into memory and start following writes. Rows are
+        streamed in batches, so only the arrays are ever held in full.
+        :return: The store, so WeatherStore(db_ops).load() can be assigned directly.
+        '''
+        if not self.loaded:
+            # Follow writes before reading, so a write committed while the table streams
+            # in is marked dirty and applied by the next query instead of being missed.
+            self.db_ops.add_write_listener(self.on_write)
+            self.loaded = True
+        with self._lock:
+            with self._dirty_lock:
+                self._dirty = {}
+                self._purged = False
+            self.locations = []
+            self._codes = {}
+            parts = [self._build_columns(rows, sort=False) for rows in
+                     self.db_ops.iter_all_data(arraysize=LOAD_BATCH_SIZE, batches=True)]
+            if parts:
+                order = np.argsort(np.concatenate([part["key"] for part in parts]),
+                                   kind="stable")
+                self._columns = {name: np.concatenate([part[name] for part in parts])[order]
+                                 for name in COLUMN_TYPES}
+            else:
+                self._columns = empty_columns()
+        return self
+
+    def close(self):
+        '''
+        Stop following writes.
+        '''
+        if self.loaded:
+            self.db_ops.remove_write_listener(self.on_write)
+            self.loaded = False
+
+    def on_write(self, location, months):
+        '''
+        Write listener: mark the written months of one location dirty. They are re-read
+        by the next query, so a run of small writes costs one refresh, and the writer
+        never waits on the store. A (None, None) call, made by purge_data, empties it.
+        '''
+        with self._dirty_lock:
+            if location is None or months is None:
+                self._dirty = {}
+                self._purged = True
+            else:
+                self._dirty.setdefault(location, set()).update(months)
+
+    def _apply_writes(self):
+        '''
+        Bring the columns up to date with the writes recorded by on_write: re-read the
+        dirty months of each location and merge them in with one copy of the columns.
+        '''
+        if not self._dirty and not self._purged:
+            return
+        with self._lock:
+            with self._dirty_lock:
+                dirty, purged = self._dirty, self._purged
+                self._dirty, self._purged = {}, False
+            columns = empty_columns() if purged else self._columns
+            drop = np.zeros(len(columns["id"]), dtype=bool)
+            table_months = columns["year"].astype(np.int32) * 100 + columns["month"]
+            fresh_parts = []
+            for location, months in dirty.items():
+                years = [year for year, _ in months]
+                month_keys = np.array([year * 100 + month for year, month in months])
+                drop |= ((columns["location"] == self._codes.get(location, -1))
+                         & np.isin(table_months, month_keys))
+                fresh = self._build_columns(
+                    self.db_ops.fetch_rows(location, (min(years), max(years))), sort=False)
+                fresh_months = fresh["year"].astype(np.int32) * 100 + fresh["month"]
+                add = np.isin(fresh_months, month_keys)
+                fresh_parts.append({name: values[add] for name, values in fresh.items()})
+            kept = {name: values[~drop] for name, values in columns.items()}
+            added = {name: np.concatenate([part[name] for part in fresh_parts])
+                     for name in COLUMN_TYPES} if fresh_parts else empty_columns()
+            order = np.argsort(added["key"], kind="stable")
+            added = {name: values[order] for name, values in added.items()}
+            # Both sides are sorted, so inserting at the search positions keeps the order.
+            positions = np.searchsorted(kept["key"], added["key"])
+            self._columns = {name: np.insert(kept[name], positions, added[name])
+                             for name in COLUMN_TYPES}
+
+    def select(self, location="Winnipeg", year_range=None, year=None, month=None):
+        '''
+        Return the columns of the matching rows of one location, ordered by date.
+        Either year_range, or year with an optional month, selects the dates.
+
+        :param location: Location name (default: Winnipeg)
+        :param year_range: Optional tuple (start_year, end_year).
+        :param year: Optional year.
+        :param month: Optional month (1-12).
+        :return: Dictionary of read-only NumPy array views keyed like COLUMN_TYPES.
+        '''
+        self._apply_writes()
+        columns = self._columns
+        code = self._codes.get(location)
+        if code is None:
+            return empty_columns()
+        if year_range:
+            start, end = date_number(year_range[0]), date_number(int(year_range[1]) + 1)
+        elif year is not None and month is not None:
+            start = date_number(year, month)
+            end = date_number(int(year) + int(month) // 12, int(month) % 12 + 1)
+        elif year is not None:
+            start, end = date_number(year), date_number(int(year) + 1)
+        else:
+            start, end = -2 ** 31, 2 ** 31 - 1
+        low, high = np.searchsorted(columns["key"], location_key(code, [start, end]))
+        selected = {name: values[low:high] for name, values in columns.items()}
+        for values in selected.values():
+            values.flags.writeable = False
+        return selected
+
+    def query(self, filter_type="raw", year_range=None, year=None, month=None,
+              location="Winnipeg"):
+        '''
+        Answer a DBOperations.fetch_data call from memory, with the same result rows.
+        '''
+        if filter_type == "raw":
+            self._apply_writes()
+            columns = self._columns
+            order = np.argsort(columns["id"], kind="stable")
+            sample_dates = np.datetime_as_string(
+                columns["date"][order].astype("datetime64[D]")).tolist()
+            names = [self.locations[code] for code in columns["location"][order].tolist()]
+            return list(zip(columns["id"][order].tolist(), sample_dates, names,
+                            nullable_list(columns["min"][order]),
+                            nullable_list(columns["max"][order]),
+                            nullable_list(columns["mean"][order])))
+        if filter_type == "boxplot" and year_range:
+            selected = self.select(location, year_range=year_range)
+            return list(zip(LABELS[selected["month"]].tolist(),
+                            nullable_list(selected["mean"])))
+        if filter_type == "lineplot" and year and month:
+            selected = self.select(location, year=year, month=month)
+            return list(zip(LABELS[selected["day"]].tolist(), nullable_list(selected["mean"])))
+        print("Invalid filter type or missing parameters.")
+        return None